@@ -6,10 +6,18 @@ from .src.types.plugins import PluginOptions
 
 from .src.core.request import Request
 from .src.core.reply import Reply
+from .src.core.websocket import WebSocket, BroadcastGroup
 
 from .src.classes.mailer import Mailer, create_message
-from .src.classes.template_render import render_template
+from .src.classes.mail_queue import MailQueue
+from .src.classes.template_render import (
+    render_template,
+    render_template_async,
+    stream_template,
+)
 from .src.classes.json_database import Database
+from .src.classes.sse import EventChannel, ServerSentEvent
+from .src.classes.allocations import assert_allocations, measure_allocations
 
 from .src.constants.http_status_code import Status
 
@@ -23,10 +31,19 @@ __all__ = [
     "PluginOptions",
     "Request",
     "Reply",
+    "WebSocket",
+    "BroadcastGroup",
     "Mailer",
     "create_message",
+    "MailQueue",
     "render_template",
+    "render_template_async",
+    "stream_template",
     "Database",
+    "EventChannel",
+    "ServerSentEvent",
+    "assert_allocations",
+    "measure_allocations",
     "Status",
     "ExceptionHandler",
     "TestClient",
@@ -0,0 +1,528 @@
+import asyncio, io, linecache, tracemalloc
+from collections import Counter
+from typing import Dict, Mapping, Optional, Tuple
+
+from .metrics import PhaseTimer
+
+# Allocations made by tracemalloc itself, the tracker and the import system are noise
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class AllocationProbe(PhaseTimer):
+    """
+    Phase timer that also measures the memory allocated in each phase of a request, as
+    the tracemalloc peak reached above the memory in use when the previous phase ended.
+
+    Requests handled concurrently share the tracemalloc counters, so the numbers are
+    exact when the requests don't overlap and an upper bound otherwise.
+    """
+
+    __slots__ = ("allocations", "snapshot", "_memory", "_initial")
+
+    def __init__(self, snapshot: bool = False) -> None:
+        """
+        Initialize the AllocationProbe object.
+
+        Args:
+            snapshot (bool, optional): Take a snapshot before the request, to find the allocation sites of the memory it retains. Defaults to False.
+        """
+        super().__init__()
+        self.allocations: Dict[str, int] = {}
+        # After the probe's own allocations, they aren't retained by the request
+        self.snapshot = tracemalloc.take_snapshot() if snapshot else None
+
+        tracemalloc.reset_peak()
+        self._memory = self._initial = tracemalloc.get_traced_memory()[0]
+
+    def lap(self, phase: str) -> None:
+        """
+        Add the time elapsed and the memory allocated since the last lap to a phase.
+
+        Args:
+            phase (str): The phase that just ended.
+        """
+        super().lap(phase)
+
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocations[phase] = self.allocations.get(phase, 0) + max(
+            0, peak - self._memory
+        )
+        tracemalloc.reset_peak()
+        self._memory = current
+
+    def retained(self, bookkeeping: int = 0) -> int:
+        """
+        Get the memory still allocated since the probe was created. Memory allocated
+        before the request and freed during it isn't a negative retention, so the result
+        is at least 0.
+
+        Args:
+            bookkeeping (int, optional): Memory allocated meanwhile that isn't retained by the request. Defaults to 0.
+        """
+        return max(0, tracemalloc.get_traced_memory()[0] - self._initial - bookkeeping)
+
+
+class RouteAllocations:
+    """
+    Memory allocated by the requests of a route, per phase.
+    """
+
+    __slots__ = ("requests", "phases", "peaks", "retained", "snapshots", "sites")
+
+    def __init__(self) -> None:
+        """
+        Initialize the RouteAllocations object.
+        """
+        self.requests = 0
+        self.phases: Dict[str, int] = {}
+        self.peaks: Dict[str, int] = {}
+        self.retained = 0
+        self.snapshots = 0
+        self.sites: Counter = Counter()
+
+    def mean(self, phase: Optional[str] = None) -> float:
+        """
+        Get the mean memory allocated per request, in bytes.
+
+        Args:
+            phase (Optional[str], optional): The phase. Defaults to None (every phase).
+        """
+        if not self.requests:
+            return 0.0
+        if phase is None:
+            return sum(self.phases.values()) / self.requests
+        return self.phases.get(phase, 0) / self.requests
+
+    def mean_retained(self) -> float:
+        """
+        Get the mean memory still allocated after a request finished, in bytes.
+        """
+        return max(0.0, self.retained / self.requests) if self.requests else 0.0
+
+
+class AllocationTracker:
+    """
+    Diagnostic mode measuring, with tracemalloc, the memory allocated in each phase of the
+    requests of every route (Request construction, body load, form parse, serialization...)
+    and the memory they retain, with the allocation sites of that retained memory.
+
+    Tracing slows every allocation down: enable it to investigate, not in production.
+    """
+
+    def __init__(self, frames: int = 1, snapshot_every: int = 100) -> None:
+        """
+        Initialize the AllocationTracker object.
+
+        Args:
+            frames (int, optional): Number of frames stored per allocation, more frames give allocation sites with their callers. Defaults to 1.
+            snapshot_every (int, optional): Take tracemalloc snapshots around one request out of this number, to find the allocation sites of the retained memory (0 disables it). Defaults to 100.
+        """
+        self._frames = frames
+        self._snapshot_every = snapshot_every
+        self._countdown = snapshot_every
+        self._started = False
+        self._routes: Dict[Tuple[str, str], RouteAllocations] = {}
+
+    @property
+    def routes(self) -> Dict[Tuple[str, str], RouteAllocations]:
+        """
+        Get the allocations of each route, keyed by (method, route path).
+        """
+        return self._routes
+
+    def start(self) -> None:
+        """
+        Start tracing the allocations, if tracemalloc isn't already tracing.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._started = True
+
+    def stop(self) -> None:
+        """
+        Stop tracing the allocations, if the tracing was started by this tracker.
+        """
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def probe(self) -> AllocationProbe:
+        """
+        Create the probe of a new request, starting the tracing if needed.
+
+        Returns:
+            AllocationProbe: The probe.
+        """
+        if not tracemalloc.is_tracing():
+            self.start()
+
+        snapshot = False
+        if self._snapshot_every:
+            self._countdown -= 1
+            if self._countdown <= 0:
+                self._countdown = self._snapshot_every
+                snapshot = True
+
+        return AllocationProbe(snapshot)
+
+    def finish(self, method: str, route: str, probe: AllocationProbe) -> None:
+        """
+        Record a finished request on the next loop iteration, once the request and reply
+        objects are released.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path pattern.
+            probe (AllocationProbe): The probe of the request.
+        """
+        asyncio.get_running_loop().call_soon(self.record, method, route, probe)
+
+    def record(self, method: str, route: str, probe: AllocationProbe) -> None:
+        """
+        Record a finished request. Call it once the request and reply objects are released,
+        otherwise they are counted as retained.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path pattern.
+            probe (AllocationProbe): The probe of the request.
+        """
+        # Neither the tracker's bookkeeping nor the probe's is memory retained by the
+        # request: the first is measured and subtracted, the second is freed
+        memory = tracemalloc.get_traced_memory()[0]
+
+        allocations = self._routes.get((method, route))
+        if allocations is None:
+            allocations = self._routes[(method, route)] = RouteAllocations()
+
+        allocations.requests += 1
+
+        phases, peaks = allocations.phases, allocations.peaks
+        for phase, size in probe.allocations.items():
+            phases[phase] = phases.get(phase, 0) + size
+            peaks[phase] = max(size, peaks.get(phase, 0))
+        bookkeeping = tracemalloc.get_traced_memory()[0] - memory
+
+        probe.allocations.clear()
+        probe.phases.clear()
+        allocations.retained += probe.retained(bookkeeping)
+
+        if probe.snapshot is not None and tracemalloc.is_tracing():
+            # Taken before filtering, which fills the caches of fnmatch and re
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            before = probe.snapshot.filter_traces(_SNAPSHOT_FILTERS)
+            probe.snapshot = None
+
+            allocations.snapshots += 1
+            key_type = "traceback" if self._frames > 1 else "lineno"
+            for difference in after.compare_to(before, key_type):
+                if difference.size_diff > 0:
+                    allocations.sites[_format_traceback(difference.traceback)] += (
+                        difference.size_diff
+                    )
+
+    def get(self, method: str, route: str) -> Optional[RouteAllocations]:
+        """
+        Get the allocations of a route.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path pattern (e.g. '/users/:id').
+
+        Returns:
+            Optional[RouteAllocations]: The allocations, or None if no request was recorded.
+        """
+        return self._routes.get((method, route))
+
+    def reset(self) -> None:
+        """
+        Remove all the recorded allocations.
+        """
+        self._routes.clear()
+        self._countdown = self._snapshot_every
+
+    def report(self, route: Optional[str] = None, limit: int = 10) -> str:
+        """
+        Get a text report of the allocations per route, with the top allocation sites of
+        the retained memory.
+
+        Args:
+            route (Optional[str], optional): Only report the routes containing this path. Defaults to None (every route).
+            limit (int, optional): Maximum number of allocation sites per route. Defaults to 10.
+
+        Returns:
+            str: The report.
+        """
+        output = io.StringIO()
+        for (method, path), allocations in sorted(self._routes.items()):
+            if route is not None and route not in path:
+                continue
+
+            output.write(
+                f"=== {method} {path} ({allocations.requests} requests) ===\n"
+                f"{'phase':<16}{'mean':>12}{'max':>12}\n"
+            )
+            for phase in allocations.phases:
+                output.write(
+                    f"{phase:<16}{_format_size(allocations.mean(phase)):>12}"
+                    f"{_format_size(allocations.peaks[phase]):>12}\n"
+                )
+            output.write(
+                f"{'total':<16}{_format_size(allocations.mean()):>12}\n"
+                f"{'retained':<16}{_format_size(allocations.mean_retained()):>12}\n"
+            )
+
+            if allocations.snapshots:
+                output.write(
+                    f"top allocation sites of the retained memory "
+                    f"({allocations.snapshots} snapshots):\n"
+                )
+                for site, size in allocations.sites.most_common(limit):
+                    output.write(
+                        f"{_format_size(size / allocations.snapshots):>12}  {site}\n"
+                    )
+            output.write("\n")
+
+        return output.getvalue()
+
+
+class _SequentialTracker(AllocationTracker):
+    """
+    Tracker of requests sent one at a time, recording each request as soon as it
+    returns: waiting for the next loop iteration allocates a callback that would count as
+    retained.
+    """
+
+    def __init__(self, frames: int = 1, snapshot_every: int = 100) -> None:
+        super().__init__(frames, snapshot_every)
+        # Attributes rather than a tuple, storing them doesn't allocate
+        self._method: Optional[str] = None
+        self._route: Optional[str] = None
+        self._probe: Optional[AllocationProbe] = None
+
+    def finish(self, method: str, route: str, probe: AllocationProbe) -> None:
+        self._method, self._route, self._probe = method, route, probe
+
+    def flush(self) -> None:
+        """
+        Record the request that just returned.
+        """
+        if self._probe is not None:
+            probe, self._probe = self._probe, None
+            self.record(self._method, self._route, probe)
+
+
+def measure_allocations(
+    app,
+    method: str,
+    path: str,
+    requests: int = 100,
+    warmup: int = 10,
+    body: bytes = b"",
+    headers: Mapping[str, str] = {},
+) -> RouteAllocations:
+    """
+    Send requests to an application in-process and measure the memory they allocate, the
+    application doesn't need the "allocations" option.
+
+    Args:
+        app (Fastipy): The application.
+        method (str): The HTTP method.
+        path (str): The request path, with the query string (e.g. '/users/1?full=1').
+        requests (int, optional): Number of requests measured. Defaults to 100.
+        warmup (int, optional): Number of requests sent before measuring, to fill the caches. Defaults to 10.
+        body (bytes, optional): The request body. Defaults to b"".
+        headers (Mapping[str, str], optional): The request headers. Defaults to {}.
+
+    Raises:
+        AssertionError: If the path doesn't match any route.
+
+    Returns:
+        RouteAllocations: The allocations of the route.
+    """
+    return asyncio.run(
+        _measure_allocations(app, method, path, requests, warmup, body, headers)
+    )
+
+
+def assert_allocations(
+    app,
+    method: str,
+    path: str,
+    max_bytes: Optional[int] = None,
+    max_phase_bytes: Mapping[str, int] = {},
+    max_retained: Optional[int] = None,
+    requests: int = 100,
+    body: bytes = b"",
+    headers: Mapping[str, str] = {},
+) -> RouteAllocations:
+    """
+    Assert that the requests to a route stay under an allocation budget, to catch memory
+    regressions in a test suite.
+
+        assert_allocations(app, "GET", "/users/1", max_bytes=16_384, max_retained=64)
+
+    Args:
+        app (Fastipy): The application.
+        method (str): The HTTP method.
+        path (str): The request path, with the query string.
+        max_bytes (Optional[int], optional): Maximum mean memory allocated per request, in bytes. Defaults to None.
+        max_phase_bytes (Mapping[str, int], optional): Maximum mean memory allocated per request in some phases (e.g. {"request": 2048}). Defaults to {}.
+        max_retained (Optional[int], optional): Maximum mean memory retained per request, in bytes. Defaults to None.
+        requests (int, optional): Number of requests measured. Defaults to 100.
+        body (bytes, optional): The request body. Defaults to b"".
+        headers (Mapping[str, str], optional): The request headers. Defaults to {}.
+
+    Raises:
+        AssertionError: If a budget is exceeded, with the allocation report.
+
+    Returns:
+        RouteAllocations: The allocations of the route.
+    """
+    allocations = measure_allocations(
+        app, method, path, requests, body=body, headers=headers
+    )
+
+    errors = []
+    if max_bytes is not None and allocations.mean() > max_bytes:
+        errors.append(
+            f"{_format_size(allocations.mean())} allocated per request "
+            f"(max {_format_size(max_bytes)})"
+        )
+    for phase, limit in max_phase_bytes.items():
+        if allocations.mean(phase) > limit:
+            errors.append(
+                f"{_format_size(allocations.mean(phase))} allocated per request "
+                f"in {phase} (max {_format_size(limit)})"
+            )
+    if max_retained is not None and allocations.mean_retained() > max_retained:
+        errors.append(
+            f"{_format_size(allocations.mean_retained())} retained per request "
+            f"(max {_format_size(max_retained)})"
+        )
+
+    if errors:
+        tracker = AllocationTracker()
+        tracker.routes[(method, path)] = allocations
+        raise AssertionError(
+            f"{method} {path}: " + ", ".join(errors) + "\n" + tracker.report()
+        )
+
+    return allocations
+
+
+async def _measure_allocations(
+    app,
+    method: str,
+    path: str,
+    requests: int,
+    warmup: int,
+    body: bytes,
+    headers: Mapping[str, str],
+) -> RouteAllocations:
+    path, _, query = path.partition("?")
+    raw_headers = [
+        (b"host", b"testserver"),
+        (b"content-length", str(len(body)).encode()),
+        *(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ),
+    ]
+
+    async def request() -> None:
+        received = False
+        # The disconnect only comes once the response is sent, as with a real client
+        response_sent = asyncio.Event()
+
+        async def receive() -> dict:
+            nonlocal received
+            if received:
+                await response_sent.wait()
+                return {"type": "http.disconnect"}
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_sent.set()
+
+        # The scope and the application coroutine are created before the request
+        # starts, freeing them would count as a negative retention, so they are kept
+        # until it is recorded. The request stores parsed values in the scope (headers,
+        # params...), freed along with it by a server, so they are left out
+        request_scope = scope()
+        initial_scope = dict(request_scope)
+        call = app(request_scope, receive, send)
+        await call
+        request_scope.clear()
+        request_scope.update(initial_scope)
+        tracker.flush()
+
+    def scope() -> dict:
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": list(raw_headers),
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+
+    previous = app._allocations
+    tracker = app._allocations = _SequentialTracker(
+        snapshot_every=max(1, requests // 10)
+    )
+    tracker.start()
+    try:
+        for _ in range(warmup):
+            await request()
+        tracker.reset()
+
+        for _ in range(requests):
+            await request()
+    finally:
+        tracker.stop()
+        app._allocations = previous
+
+    route, _ = app._router.find_route(method, path, return_params=True)
+    if route is None:
+        raise AssertionError(f"{method} {path} doesn't match any route")
+    allocations = tracker.get(method, route["raw_path"])
+    if allocations is None:
+        raise AssertionError(f"{method} {path} wasn't recorded")
+    return allocations
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> str:
+    """
+    Format an allocation traceback, from the allocation site to its callers.
+    """
+    return " <- ".join(
+        f"{frame.filename}:{frame.lineno}" for frame in reversed(traceback)
+    )
+
+
+def _format_size(size: float) -> str:
+    """
+    Format a size in bytes with a binary unit.
+    """
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024 or unit == "MiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
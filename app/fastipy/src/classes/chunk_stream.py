@@ -0,0 +1,232 @@
+import asyncio, threading
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Union
+
+Chunk = Union[str, bytes]
+
+
+class ChunkStream:
+    """
+    Streams the chunks yielded by a generator as few large body messages.
+
+    The chunks are produced into a buffer by a task for async generators, or by a worker
+    thread for sync generators, so a slow sync generator doesn't block the event loop.
+    The buffer is written when it reaches `buffer_size` bytes, when `flush_interval`
+    seconds passed, when flush() is called or when the generator ends. The producer waits
+    when `max_buffered` bytes are waiting, so a slow client slows the generator down. With
+    a `heartbeat`, a chunk is written when nothing was written for that long.
+    """
+
+    def __init__(
+        self,
+        source: Union[Iterator[Chunk], AsyncIterator[Chunk]],
+        write: Callable[[bytes], Awaitable[None]],
+        buffer_size: int = 16384,
+        flush_interval: Optional[float] = 0.05,
+        max_buffered: Optional[int] = None,
+        heartbeat: Optional[float] = None,
+        heartbeat_chunk: bytes = b"",
+    ) -> None:
+        """
+        Initialize the ChunkStream object.
+
+        Args:
+            source (Union[Iterator[Chunk], AsyncIterator[Chunk]]): The generator, yielding str (encoded in UTF-8) or bytes.
+            write (Callable[[bytes], Awaitable[None]]): Coroutine function writing a body message.
+            buffer_size (int, optional): Bytes buffered before writing them, 0 writes every chunk as soon as possible. Defaults to 16384.
+            flush_interval (Optional[float], optional): Maximum seconds a chunk stays in the buffer, None to only write full buffers. Defaults to 0.05.
+            max_buffered (Optional[int], optional): Bytes buffered before the producer waits. Defaults to 4 times the buffer size (64 KiB at least).
+            heartbeat (Optional[float], optional): Seconds without writing before `heartbeat_chunk` is written, to keep idle connections open. Defaults to None.
+            heartbeat_chunk (bytes, optional): The chunk written when the stream is idle. Defaults to b"".
+        """
+        self._source = source
+        self._write = write
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._max_buffered = max_buffered or max(buffer_size * 4, 65536)
+        self._heartbeat = heartbeat
+        self._heartbeat_chunk = heartbeat_chunk
+
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._signaled = False
+        self._done = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._async_drained: Optional[asyncio.Event] = None
+
+    @property
+    def closed(self) -> bool:
+        """
+        Check if the stream is finished or was stopped.
+        """
+        return self._closed
+
+    async def run(self) -> None:
+        """
+        Produce and write the chunks until the generator ends.
+
+        Raises:
+            BaseException: The exception raised by the generator, after the chunks it yielded before are written.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._ready = asyncio.Event()
+
+        if hasattr(self._source, "__anext__"):
+            self._async_drained = asyncio.Event()
+            producer = asyncio.create_task(self._produce_async())
+        else:
+            producer = self._loop.run_in_executor(None, self._produce_sync)
+
+        timeout = min(
+            (t for t in (self._flush_interval, self._heartbeat) if t is not None),
+            default=None,
+        )
+        last_write = self._loop.time()
+
+        try:
+            while True:
+                if not self._ready.is_set():
+                    try:
+                        await asyncio.wait_for(self._ready.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                self._ready.clear()
+
+                with self._lock:
+                    chunks, self._chunks = self._chunks, []
+                    self._size = 0
+                    self._signaled = False
+                    done, error = self._done, self._error
+                    self._drained.notify_all()
+                if self._async_drained is not None:
+                    self._async_drained.set()
+
+                if chunks:
+                    await self._write(
+                        chunks[0] if len(chunks) == 1 else b"".join(chunks)
+                    )
+                    if self._heartbeat is not None:
+                        last_write = self._loop.time()
+                elif (
+                    self._heartbeat is not None
+                    and not done
+                    and self._loop.time() - last_write >= self._heartbeat
+                ):
+                    await self._write(self._heartbeat_chunk)
+                    last_write = self._loop.time()
+                if done:
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            self.close()
+            if isinstance(producer, asyncio.Task):
+                producer.cancel()
+            # A sync producer stops after its current chunk, it can't be interrupted
+
+    def flush(self) -> None:
+        """
+        Write the buffered chunks as soon as possible. Can be called from the generator,
+        including a sync generator running in the worker thread.
+        """
+        with self._lock:
+            signal = bool(self._chunks) and not self._signaled
+            if signal:
+                self._signaled = True
+        if signal:
+            self._signal()
+
+    def close(self) -> None:
+        """
+        Stop the stream, the producer stops at its next chunk.
+        """
+        with self._lock:
+            self._closed = True
+            self._drained.notify_all()
+        if self._async_drained is not None:
+            self._async_drained.set()
+
+    def _signal(self) -> None:
+        """
+        Wake the writer up, from the event loop or from the worker thread.
+        """
+        if threading.get_ident() == self._loop_thread:
+            self._ready.set()
+        else:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def _produce_sync(self) -> None:
+        """
+        Iterate a sync generator in the worker thread.
+        """
+        source = self._source
+        try:
+            for chunk in source:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                with self._lock:
+                    while self._size >= self._max_buffered and not self._closed:
+                        self._drained.wait()
+                    if self._closed:
+                        break
+
+                    self._chunks.append(data)
+                    self._size += len(data)
+                    signal = self._size >= self._buffer_size and not self._signaled
+                    if signal:
+                        self._signaled = True
+                if signal:
+                    self._signal()
+        except BaseException as e:
+            self._error = e
+        finally:
+            if self._closed and hasattr(source, "close"):
+                source.close()
+            self._finish()
+
+    async def _produce_async(self) -> None:
+        """
+        Iterate an async generator in a task.
+        """
+        source = self._source
+        try:
+            async for chunk in source:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                with self._lock:
+                    self._chunks.append(data)
+                    self._size += len(data)
+                    size = self._size
+                if size >= self._buffer_size:
+                    self._ready.set()
+                    # Let the writer send the buffer, a generator that never awaits
+                    # would otherwise fill it up to max_buffered first
+                    await asyncio.sleep(0)
+
+                while self._size >= self._max_buffered and not self._closed:
+                    self._async_drained.clear()
+                    await self._async_drained.wait()
+                if self._closed:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            self._error = e
+        finally:
+            if self._closed and hasattr(source, "aclose"):
+                await source.aclose()
+            self._finish()
+
+    def _finish(self) -> None:
+        """
+        Mark the generator as ended and wake the writer up.
+        """
+        with self._lock:
+            self._done = True
+        if not self._closed:
+            self._signal()
@@ -0,0 +1,195 @@
+import asyncio, json
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .response_cache import CachedResponse
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the requests handled at the same time (a bulkhead). Requests over the limit
+    wait in a bounded queue, in arrival order, and are shed with a 503 Service Unavailable
+    when the queue is full or they waited too long, so an overloaded route answers
+    quickly instead of slowing everything down.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int = 0,
+        queue_timeout: Optional[float] = None,
+        retry_after: int = 1,
+    ) -> None:
+        """
+        Initialize the ConcurrencyLimiter object.
+
+        Args:
+            max_in_flight (int): Maximum number of requests handled at the same time.
+            max_queue (int, optional): Maximum number of requests waiting, the next ones are shed. Defaults to 0.
+            queue_timeout (Optional[float], optional): Maximum seconds a request waits before it is shed. Defaults to None, waiting until a request ends.
+            retry_after (int, optional): Seconds sent in the Retry-After header of the 503 responses. Defaults to 1.
+        """
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._queued = 0
+        self._shed = 0
+        self._timed_out = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+        # Encoded once, shedding must cost less than handling the request
+        self._rejection = CachedResponse(
+            503,
+            [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(retry_after).encode("utf-8")),
+            ],
+            json.dumps({"error": "Service unavailable"}).encode("utf-8"),
+        )
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the requests in flight and waiting, and the counts of requests admitted,
+        queued, shed (including the ones timed out in the queue) and timed out, with the
+        average and maximum seconds waited by the queued requests.
+        """
+        return {
+            "in_flight": self._in_flight,
+            "queue_length": len(self._waiters),
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "shed": self._shed,
+            "timed_out": self._timed_out,
+            "average_wait": self._wait_time / self._queued if self._queued else 0.0,
+            "max_wait": self._max_wait,
+        }
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot without waiting, if one is free and no request is waiting.
+
+        Returns:
+            bool: True if the slot was taken.
+        """
+        if self._in_flight < self._max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._admitted += 1
+            return True
+        return False
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if none is free.
+
+        Returns:
+            bool: True if the slot was taken, False if the request is shed.
+        """
+        if self.try_acquire():
+            return True
+
+        if len(self._waiters) >= self._max_queue:
+            self._shed += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        start = loop.time()
+        timer = (
+            loop.call_later(self._queue_timeout, self._expire, waiter)
+            if self._queue_timeout is not None
+            else None
+        )
+
+        try:
+            admitted = await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                # The slot was handed over just before the cancellation
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        waited = loop.time() - start
+        self._wait_time += waited
+        if waited > self._max_wait:
+            self._max_wait = waited
+
+        if not admitted:
+            self._timed_out += 1
+            self._shed += 1
+            return False
+
+        self._admitted += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Free a slot, handing it over to the first request waiting.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot stays taken, by the waiter
+                waiter.set_result(True)
+                return
+
+        self._in_flight -= 1
+
+    async def reject(self, send, cors: Dict[str, str] = {}) -> int:
+        """
+        Send the 503 Service Unavailable response of a shed request.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+            cors (Dict[str, str], optional): The CORS headers. Defaults to {}.
+
+        Returns:
+            int: The status code sent.
+        """
+        rejection = self._rejection
+        if cors:
+            rejection = CachedResponse(
+                rejection.status,
+                rejection.headers + _encode_headers(cors),
+                rejection.body,
+            )
+        return await rejection.send(send)
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        """
+        Shed a request that waited too long.
+        """
+        if not waiter.done():
+            self._remove(waiter)
+            waiter.set_result(False)
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        """
+        Remove a request from the queue.
+        """
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+def _encode_headers(headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
+    """
+    Encode response headers.
+    """
+    return [
+        (key.encode("utf-8"), value.encode("utf-8")) for key, value in headers.items()
+    ]
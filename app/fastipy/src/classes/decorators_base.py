@@ -1,3 +1,6 @@
+from typing import Mapping
+
+
 class DecoratorsBase:
     """Base class for decorators."""
 
@@ -14,3 +17,47 @@ class DecoratorsBase:
             self._instance_decorators[real_name] = value
             return
         super().__setattr__(name, value)
+
+
+class AppAttributes:
+    """
+    Mixin reading the attributes set as "app_<name>" (e.g. `request.app_user = user` in
+    a hook) back as `<name>`. They are stored in the instance __dict__, so they belong to
+    one request and setting them costs nothing more than a plain attribute.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name) -> any:
+        # Only called when the normal lookup fails
+        try:
+            return self.__dict__["app_" + name]
+        except KeyError:
+            raise AttributeError(
+                f'Attribute "{name}" does not exist in {self.__class__.__name__}'
+            ) from None
+
+
+def decorated_class(cls: type, decorators: Mapping[str, any]) -> type:
+    """
+    Create a subclass exposing decorators as class attributes, so they are read with a
+    native attribute lookup instead of a __getattr__ fallback.
+
+    Values are wrapped in staticmethod, so functions are returned as they were registered
+    instead of being bound to the instance.
+
+    Args:
+        cls (type): The class to decorate (e.g. Request or Reply).
+        decorators (Mapping[str, any]): The decorators, by name.
+
+    Returns:
+        type: The subclass, or the class itself if there is no decorator.
+    """
+    if not decorators:
+        return cls
+
+    namespace = {name: staticmethod(value) for name, value in decorators.items()}
+    namespace["__slots__"] = ()
+    namespace["__module__"] = cls.__module__
+    namespace["__qualname__"] = cls.__qualname__
+    return type(cls.__name__, (cls,), namespace)
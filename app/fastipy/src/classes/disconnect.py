@@ -0,0 +1,230 @@
+import asyncio
+from typing import Callable, Coroutine, Dict, Optional
+
+
+class DisconnectWatcher:
+    """
+    Watches the ASGI receive channel of a request for the client disconnecting.
+
+    The request body is read through `receive`, and once it is read the next message can
+    only be "http.disconnect", so a task waits for it. The task only starts when watching
+    is needed: when `is_disconnected()` or `wait()` are called, when a stream starts, or
+    when the request runs longer than a delay (see DisconnectMonitor). On disconnect the
+    armed task (the task handling the request) is cancelled.
+    """
+
+    __slots__ = (
+        "_receive",
+        "_body_read",
+        "_disconnected",
+        "_watching",
+        "_stopped",
+        "_watcher",
+        "_event",
+        "_task",
+    )
+
+    def __init__(self, receive: Callable[[], Coroutine]) -> None:
+        """
+        Initialize the DisconnectWatcher object.
+
+        Args:
+            receive (Callable[[], Coroutine]): The coroutine function to receive messages from the client.
+        """
+        self._receive = receive
+        self._body_read = False
+        self._disconnected = False
+        self._watching = False
+        self._stopped = False
+        self._watcher: Optional[asyncio.Task] = None
+        self._event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def disconnected(self) -> bool:
+        """
+        Check if the client disconnected, as far as the watcher knows.
+        """
+        return self._disconnected
+
+    @property
+    def armed(self) -> bool:
+        """
+        Check if a task is cancelled when the client disconnects.
+        """
+        return self._task is not None
+
+    async def receive(self) -> dict:
+        """
+        Receive a message from the client, used to read the request body.
+
+        Returns:
+            dict: The ASGI message.
+        """
+        message = await self._receive()
+        if message["type"] == "http.disconnect":
+            self._set_disconnected()
+        elif not message.get("more_body", False):
+            self._body_read = True
+            if self._watching:
+                self._start()
+        return message
+
+    def arm(self, task: asyncio.Task) -> None:
+        """
+        Cancel a task when the client disconnects, once watching.
+
+        Args:
+            task (asyncio.Task): The task cancelled on disconnect.
+        """
+        self._task = task
+
+    def watch(self) -> None:
+        """
+        Start watching, as soon as the request body is read.
+        """
+        if self._stopped:
+            return
+        self._watching = True
+        if self._body_read:
+            self._start()
+
+    async def is_disconnected(self) -> bool:
+        """
+        Check if the client disconnected. Before the request body is read, only a
+        disconnect seen while reading it is reported.
+
+        Returns:
+            bool: True if the client disconnected.
+        """
+        if not self._disconnected and self._watcher is None:
+            self.watch()
+            if self._watcher is not None:
+                # Lets the watcher receive a disconnect already waiting
+                await asyncio.sleep(0)
+        return self._disconnected
+
+    async def wait(self) -> None:
+        """
+        Wait until the client disconnects, or until the response is sent.
+        """
+        if self._disconnected or self._stopped:
+            return
+        if self._event is None:
+            self._event = asyncio.Event()
+        self.watch()
+        await self._event.wait()
+
+    def stop(self) -> None:
+        """
+        Stop watching and disarm. Called once the response is sent, the server reports
+        every sent response as a disconnect.
+        """
+        self._stopped = True
+        self._task = None
+        self._watching = False
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self._event is not None:
+            self._event.set()
+
+    def _start(self) -> None:
+        """
+        Start the watcher task, once.
+        """
+        if self._watcher is None and not self._disconnected:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def _watch(self) -> None:
+        """
+        Wait for the "http.disconnect" message. Any other message breaks the ASGI
+        contract (the body is read), so watching stops instead of receiving again.
+        """
+        message = await self._receive()
+        self._watcher = None
+        if message["type"] != "http.disconnect":
+            self._watching = False
+            self._stopped = True
+            return
+
+        self._set_disconnected()
+        if self._task is not None:
+            self._task.cancel()
+
+    def _set_disconnected(self) -> None:
+        """
+        Mark the client as disconnected and wake the waiters up.
+        """
+        self._disconnected = True
+        if self._event is not None:
+            self._event.set()
+
+
+class DisconnectMonitor:
+    """
+    Starts watching the requests of an application that run longer than a delay.
+
+    A single timer checks the requests in flight, in the order they started, instead of a
+    timer per request, so the requests ending before the delay cost a dict insertion.
+    """
+
+    __slots__ = ("_delay", "_requests", "_loop", "_timer")
+
+    def __init__(self, delay: float = 0.1) -> None:
+        """
+        Initialize the DisconnectMonitor object.
+
+        Args:
+            delay (float, optional): Seconds a request runs before it is watched. Defaults to 0.1.
+        """
+        self._delay = delay
+        self._requests: Dict[DisconnectWatcher, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, watcher: DisconnectWatcher) -> None:
+        """
+        Add a request in flight, armed with the current task.
+
+        Args:
+            watcher (DisconnectWatcher): The watcher of the request.
+        """
+        loop = asyncio.get_running_loop()
+        watcher.arm(asyncio.current_task(loop))
+        if self._delay <= 0:
+            watcher.watch()
+            return
+
+        self._requests[watcher] = loop.time()
+        if self._timer is None or self._loop is not loop:
+            self._loop = loop
+            self._timer = loop.call_later(self._delay, self._check)
+
+    def discard(self, watcher: DisconnectWatcher) -> None:
+        """
+        Remove a request that ended.
+
+        Args:
+            watcher (DisconnectWatcher): The watcher of the request.
+        """
+        self._requests.pop(watcher, None)
+
+    def _check(self) -> None:
+        """
+        Start watching the requests older than the delay, and check again when the
+        oldest remaining request reaches it.
+        """
+        self._timer = None
+        now = self._loop.time()
+        requests = self._requests
+        while requests:
+            watcher, started = next(iter(requests.items()))
+            if now - started < self._delay:
+                self._timer = self._loop.call_later(
+                    started + self._delay - now, self._check
+                )
+                return
+
+            del requests[watcher]
+            watcher.watch()
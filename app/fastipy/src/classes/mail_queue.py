@@ -0,0 +1,317 @@
+import asyncio, smtplib
+from email.mime.multipart import MIMEMultipart
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Self, Set
+from uvicorn.main import logger
+
+from ..exceptions import MailQueueFullException
+
+from .mailer import Mailer
+from .smtp_pool import is_connection_error
+
+if TYPE_CHECKING:
+    from ..core.fastipy import Fastipy
+
+
+class QueuedMessage:
+    """
+    A message waiting in the mail queue, with its delivery attempts.
+    """
+
+    __slots__ = ("message", "attempts", "enqueued_at")
+
+    def __init__(self, message: MIMEMultipart) -> None:
+        """
+        Initialize the QueuedMessage object.
+
+        Args:
+            message (MIMEMultipart): The email message.
+        """
+        self.message = message
+        self.attempts = 0
+        self.enqueued_at = perf_counter()
+
+
+class MailQueue:
+    """
+    Background outbound mail queue.
+
+    Handlers enqueue messages and return immediately, while a pool of workers sends them
+    in batches over the mailer's pooled connections, retrying transient failures with
+    exponential backoff. The queue is bounded, so bursts can't grow memory unboundedly.
+    """
+
+    def __init__(
+        self,
+        mailer: Mailer,
+        max_size: int = 1000,
+        workers: int = 2,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """
+        Initialize the MailQueue object.
+
+        Args:
+            mailer (Mailer): The mailer used to send the messages.
+            max_size (int, optional): Maximum number of messages waiting in the queue. Defaults to 1000.
+            workers (int, optional): Number of workers sending messages concurrently. Defaults to 2.
+            batch_size (int, optional): Maximum number of messages sent by a worker at once. Defaults to 20.
+            max_retries (int, optional): Maximum number of retries of a message after a transient failure. Defaults to 3.
+            retry_backoff (float, optional): Seconds before the first retry, doubled on each attempt. Defaults to 1.0.
+            max_backoff (float, optional): Maximum seconds between retries. Defaults to 60.0.
+        """
+        self._mailer = mailer
+        self._queue: asyncio.Queue[QueuedMessage] = asyncio.Queue(max_size)
+        self._workers_count = workers
+        self._batch_size = batch_size
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._max_backoff = max_backoff
+
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._rejected = 0
+        self._send_time = 0.0
+        self._max_send_latency = 0.0
+        self._delivery_time = 0.0
+
+    @property
+    def size(self) -> int:
+        """
+        Get the number of messages waiting in the queue.
+        """
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        """
+        Check if the workers are running.
+        """
+        return bool(self._workers)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the queue counters.
+
+        Returns:
+            Dict[str, float]: Queue length, sent, failed, retried and rejected messages,
+            average and maximum send latency per message and average delivery latency
+            (from enqueue to sent), in seconds.
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "retrying": len(self._retries),
+            "sent": self._sent,
+            "failed": self._failed,
+            "retried": self._retried,
+            "rejected": self._rejected,
+            "avg_send_latency": self._send_time / self._sent if self._sent else 0.0,
+            "max_send_latency": self._max_send_latency,
+            "avg_delivery_latency": (
+                self._delivery_time / self._sent if self._sent else 0.0
+            ),
+        }
+
+    def register(self, app: "Fastipy") -> Self:
+        """
+        Start the workers on the application startup and drain the queue on shutdown.
+
+        Args:
+            app (Fastipy): The application.
+        """
+        app.add_event("startup", self.start)
+        app.add_event("shutdown", self.stop)
+        return self
+
+    def enqueue(self, message: MIMEMultipart) -> None:
+        """
+        Add a message to the queue without waiting.
+
+        Args:
+            message (MIMEMultipart): The email message, like the ones built by create_message.
+
+        Raises:
+            MailQueueFullException: If the queue is full.
+        """
+        try:
+            self._queue.put_nowait(QueuedMessage(message))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise MailQueueFullException(
+                "Failed to enqueue email >> Mail queue is full", logger.warning
+            )
+
+    async def put(self, message: MIMEMultipart) -> None:
+        """
+        Add a message to the queue, waiting for free space if it is full.
+
+        Args:
+            message (MIMEMultipart): The email message, like the ones built by create_message.
+        """
+        await self._queue.put(QueuedMessage(message))
+
+    async def start(self) -> None:
+        """
+        Start the workers.
+        """
+        if self._workers:
+            return
+
+        self._workers = [
+            asyncio.create_task(self.__worker()) for _ in range(self._workers_count)
+        ]
+
+    async def stop(self, drain: bool = True, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop the workers and close the mailer connections.
+
+        Messages still queued or waiting for a retry when the workers stop are counted as failed.
+
+        Args:
+            drain (bool, optional): Whether to wait for the queued messages, and the ones waiting for a retry, to be sent. Defaults to True.
+            timeout (Optional[float], optional): Maximum seconds to wait for the queue to drain. Defaults to 30.0.
+        """
+        if drain and self._workers:
+            try:
+                await asyncio.wait_for(self.__drain(), timeout)
+            except asyncio.TimeoutError:
+                # What is left is counted as failed below
+                pass
+
+        # Waiting for their backoff, so they aren't in the queue
+        retrying = sum(not task.done() for task in self._retries)
+        if retrying:
+            self._failed += retrying
+            logger.error(
+                f"Mail queue stopped with {retrying} messages waiting for a retry >> Not sent"
+            )
+
+        for task in [*self._workers, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+
+        self._workers = []
+        self._retries.clear()
+
+        # Not drained, or the drain timed out
+        queued = 0
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+            queued += 1
+        if queued:
+            self._failed += queued
+            logger.error(f"Mail queue stopped with {queued} messages queued >> Not sent")
+
+        await asyncio.to_thread(self._mailer.close)
+
+    async def __drain(self) -> None:
+        """
+        Wait until the queue is empty and no message is waiting for a retry.
+        """
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            # The retries put their messages back in the queue
+            await asyncio.wait(set(self._retries))
+
+    async def __worker(self) -> None:
+        """
+        Take batches of messages from the queue and send them.
+        """
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await self.__send_batch(batch)
+            except Exception as e:
+                self._failed += len(batch)
+                logger.error(f"Mail queue failed to send a batch >> {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def __send_batch(self, batch: List[QueuedMessage]) -> None:
+        """
+        Send a batch, scheduling the retry of messages that failed transiently.
+
+        Args:
+            batch (List[QueuedMessage]): The messages to send.
+        """
+        start = perf_counter()
+        failures = await self._mailer.send_batch_async(
+            [queued.message for queued in batch]
+        )
+        end = perf_counter()
+
+        failed = {id(message): error for message, error in failures}
+        send_latency = (end - start) / len(batch)
+
+        for queued in batch:
+            error = failed.get(id(queued.message))
+            if error is None:
+                self._sent += 1
+                self._send_time += send_latency
+                self._delivery_time += end - queued.enqueued_at
+                self._max_send_latency = max(self._max_send_latency, send_latency)
+                continue
+
+            queued.attempts += 1
+            if queued.attempts > self._max_retries or not is_transient_error(error):
+                self._failed += 1
+                logger.error(
+                    f"Failed to send email to '{queued.message['To']}' >> {error}"
+                )
+                continue
+
+            self._retried += 1
+            delay = min(
+                self._retry_backoff * 2 ** (queued.attempts - 1), self._max_backoff
+            )
+            task = asyncio.create_task(self.__retry(queued, delay))
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+
+    async def __retry(self, queued: QueuedMessage, delay: float) -> None:
+        """
+        Put a message back in the queue after a delay.
+
+        Args:
+            queued (QueuedMessage): The message to retry.
+            delay (float): Seconds to wait before retrying.
+        """
+        await asyncio.sleep(delay)
+        await self._queue.put(queued)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check if a sending error may succeed on retry: connection failures, timeouts and 4xx SMTP replies.
+
+    Args:
+        error (Exception): The error raised while sending.
+
+    Returns:
+        bool: True if the message should be retried, False otherwise.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, ValueError):
+        return False
+    return is_connection_error(error)
@@ -1,11 +1,12 @@
-import smtplib
-from email import encoders
-from email.mime.base import MIMEBase
+import asyncio, smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formatdate
 from typing import Dict, List, Tuple, Union
 
+from .mime_stream import FileAttachment, has_file_attachments, iter_message
+from .smtp_pool import SMTPConnectionPool, is_connection_error
+
 
 def create_message(
     subject: str,
@@ -31,7 +32,7 @@ def create_message(
         bcc (Union[str, List[str], None], optional): The BCC recipient's email address or list of addresses. Defaults to None.
         reply_to (Union[str, List[str], None], optional): The email address to reply to or list of addresses. Defaults to None.
         headers (Dict[str, str], optional): Additional headers for the email. Defaults to None.
-        attachments (List[str], optional): List of file paths to attach to the email. Defaults to None.
+        attachments (List[str], optional): List of file paths to attach to the email. The files are read and encoded only when the email is sent. Defaults to None.
         alternatives (List[Tuple[str, str]], optional): List of alternative content (text, mimetype) for the email. Defaults to None.
 
     Returns:
@@ -67,22 +68,13 @@ def create_message(
 
     if attachments:
         for attachment_path in attachments:
-            with open(attachment_path, "rb") as attachment_file:
-                attachment = MIMEBase("application", "octet-stream")
-                attachment.set_payload(attachment_file.read())
-
-            encoders.encode_base64(attachment)
-            attachment.add_header(
-                "Content-Disposition",
-                f'attachment; filename="{attachment_path.split("/")[-1]}"',
-            )
-            message.attach(attachment)
+            message.attach(FileAttachment(attachment_path))
 
     return message
 
 
 class Mailer:
-    """A class to send emails using SMTP."""
+    """A class to send emails using SMTP, over a pool of persistent connections."""
 
     def __init__(
         self,
@@ -93,6 +85,8 @@ class Mailer:
         ssl: bool = True,
         tls: bool = False,
         timeout: int = 10,
+        pool_size: int = 4,
+        keep_alive: float = 60.0,
     ) -> None:
         """
         Initialize the Mailer object.
@@ -105,6 +99,8 @@ class Mailer:
             ssl (bool, optional): Whether to use SSL for SMTP connection. Defaults to True.
             tls (bool, optional): Whether to use TLS for SMTP connection. Defaults to False.
             timeout (int, optional): Connection timeout in seconds. Defaults to 10.
+            pool_size (int, optional): Maximum number of open SMTP connections. Defaults to 4.
+            keep_alive (float, optional): Seconds an idle connection is kept open for reuse. Defaults to 60.0.
         """
         self._smtp_host = smtp_host
         self._smtp_port = smtp_port
@@ -113,6 +109,9 @@ class Mailer:
         self._timeout = timeout
         self._ssl = ssl
         self._tls = tls
+        self._pool = SMTPConnectionPool(
+            self._connect, max_size=pool_size, keep_alive=keep_alive
+        )
 
     @property
     def host(self):
@@ -149,6 +148,13 @@ class Mailer:
         """
         return self._timeout
 
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        """
+        Get the SMTP connection pool.
+        """
+        return self._pool
+
     def send_email(
         self,
         message: Union[MIMEMultipart, List[MIMEMultipart]],
@@ -156,32 +162,17 @@ class Mailer:
     ):
         """
         Send a single email message.
+        A pooled connection is reused and reopened automatically if the server dropped it.
 
         Args:
             message (Union[MIMEMultipart, List[MIMEMultipart]]): The email message or list of messages to send.
             raise_exceptions (bool, optional): Whether to raise exceptions on failure. Defaults to False.
         """
         try:
-            if self.ssl:
-                smtp_conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
-            elif self.tls:
-                smtp_conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
-                smtp_conn.starttls()
-            else:
-                if raise_exceptions:
-                    raise ValueError("Either SSL or TLS should be enabled.")
-
-            smtp_conn.login(self._auth_user, self._auth_password)
-
             if not isinstance(message, list):
                 message = [message]
 
-            for message_data in message:
-                smtp_conn.sendmail(
-                    message_data["From"], message_data["To"], message_data.as_string()
-                )
-
-            smtp_conn.quit()
+            self._deliver(message)
         except Exception as e:
             if raise_exceptions:
                 raise e
@@ -197,3 +188,184 @@ class Mailer:
             raise_exceptions (bool, optional): Whether to raise exceptions on failure. Defaults to False.
         """
         self.send_email(messages, raise_exceptions)
+
+    async def send_email_async(
+        self,
+        message: Union[MIMEMultipart, List[MIMEMultipart]],
+        raise_exceptions: bool = False,
+    ):
+        """
+        Send a single email message without blocking the event loop.
+
+        Args:
+            message (Union[MIMEMultipart, List[MIMEMultipart]]): The email message or list of messages to send.
+            raise_exceptions (bool, optional): Whether to raise exceptions on failure. Defaults to False.
+        """
+        await asyncio.to_thread(self.send_email, message, raise_exceptions)
+
+    async def send_emails_async(
+        self, messages: List[MIMEMultipart], raise_exceptions: bool = False
+    ):
+        """
+        Send multiple email messages without blocking the event loop.
+
+        Args:
+            messages (List[MIMEMultipart]): The list of email messages to send.
+            raise_exceptions (bool, optional): Whether to raise exceptions on failure. Defaults to False.
+        """
+        await asyncio.to_thread(self.send_email, messages, raise_exceptions)
+
+    def send_batch(
+        self, messages: List[MIMEMultipart]
+    ) -> List[Tuple[MIMEMultipart, Exception]]:
+        """
+        Send messages over pooled connections, continuing after failures.
+
+        Args:
+            messages (List[MIMEMultipart]): The messages to send.
+
+        Returns:
+            List[Tuple[MIMEMultipart, Exception]]: The messages that failed, with their errors.
+        """
+        failures = []
+        smtp_conn = None
+        try:
+            for message_data in messages:
+                try:
+                    if smtp_conn is None:
+                        smtp_conn = self._pool.acquire()
+                    self._send(smtp_conn, message_data)
+                except Exception as e:
+                    failures.append((message_data, e))
+                    if smtp_conn is not None and is_connection_error(e):
+                        self._pool.release(smtp_conn, discard=True)
+                        smtp_conn = None
+        finally:
+            if smtp_conn is not None:
+                self._pool.release(smtp_conn)
+
+        return failures
+
+    async def send_batch_async(
+        self, messages: List[MIMEMultipart]
+    ) -> List[Tuple[MIMEMultipart, Exception]]:
+        """
+        Send messages over pooled connections without blocking the event loop.
+
+        Args:
+            messages (List[MIMEMultipart]): The messages to send.
+
+        Returns:
+            List[Tuple[MIMEMultipart, Exception]]: The messages that failed, with their errors.
+        """
+        return await asyncio.to_thread(self.send_batch, messages)
+
+    def close(self) -> None:
+        """
+        Close the idle SMTP connections of the pool.
+        """
+        self._pool.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open and authenticate a new SMTP connection.
+
+        Returns:
+            smtplib.SMTP: The connection.
+        """
+        if self.ssl:
+            smtp_conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        elif self.tls:
+            smtp_conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp_conn.starttls()
+        else:
+            raise ValueError("Either SSL or TLS should be enabled.")
+
+        if self._auth_user:
+            smtp_conn.login(self._auth_user, self._auth_password)
+
+        return smtp_conn
+
+    def _deliver(self, messages: List[MIMEMultipart]) -> None:
+        """
+        Send messages over a pooled connection, retrying once on a fresh connection
+        if the server dropped the current one.
+
+        Args:
+            messages (List[MIMEMultipart]): The messages to send.
+        """
+        smtp_conn = self._pool.acquire()
+        try:
+            for message_data in messages:
+                try:
+                    self._send(smtp_conn, message_data)
+                except smtplib.SMTPServerDisconnected:
+                    self._pool.release(smtp_conn, discard=True)
+                    smtp_conn = None
+                    smtp_conn = self._pool.acquire()
+                    self._send(smtp_conn, message_data)
+        except BaseException as e:
+            if smtp_conn is not None:
+                self._pool.release(smtp_conn, discard=is_connection_error(e))
+            raise
+        else:
+            self._pool.release(smtp_conn)
+
+    def _send(self, smtp_conn: smtplib.SMTP, message: MIMEMultipart) -> None:
+        """
+        Send a message over an open connection.
+
+        Args:
+            smtp_conn (smtplib.SMTP): The connection.
+            message (MIMEMultipart): The message to send.
+        """
+        if not has_file_attachments(message):
+            smtp_conn.sendmail(message["From"], message["To"], message.as_string())
+            return
+
+        self._stream(smtp_conn, message)
+
+    def _stream(self, smtp_conn: smtplib.SMTP, message: MIMEMultipart) -> None:
+        """
+        Send a message writing it to the SMTP data stream chunk by chunk,
+        so the attachments are never fully encoded in memory.
+
+        Args:
+            smtp_conn (smtplib.SMTP): The connection.
+            message (MIMEMultipart): The message to send.
+        """
+        from_addr = message["From"]
+        to_addrs = message["To"]
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        smtp_conn.ehlo_or_helo_if_needed()
+
+        code, response = smtp_conn.mail(from_addr)
+        if code != 250:
+            smtp_conn._rset()
+            raise smtplib.SMTPSenderRefused(code, response, from_addr)
+
+        refused = {}
+        for to_addr in to_addrs:
+            code, response = smtp_conn.rcpt(to_addr)
+            if code not in (250, 251):
+                refused[to_addr] = (code, response)
+
+        if len(refused) == len(to_addrs):
+            smtp_conn._rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, response = smtp_conn.docmd("data")
+        if code != 354:
+            smtp_conn._rset()
+            raise smtplib.SMTPDataError(code, response)
+
+        for chunk in iter_message(message):
+            smtp_conn.send(chunk)
+        smtp_conn.send(b".\r\n")
+
+        code, response = smtp_conn.getreply()
+        if code != 250:
+            smtp_conn._rset()
+            raise smtplib.SMTPDataError(code, response)
@@ -0,0 +1,272 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PHASES = (
+    "routing",
+    "request",
+    "middlewares",
+    "onRequest",
+    "body",
+    "form",
+    "preHandler",
+    "handler",
+    "serialization",
+    "send",
+    "onResponse",
+)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets, so recording a value is a binary search and an increment.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the Histogram object.
+
+        Args:
+            buckets (Sequence[float], optional): Sorted upper bounds of the buckets in seconds. Defaults to DEFAULT_BUCKETS.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value (float): The value in seconds.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile from the buckets, as the upper bound of the bucket where it falls.
+
+        Args:
+            q (float): The quantile, between 0 and 1 (e.g. 0.99).
+
+        Returns:
+            float: The estimated value in seconds, or infinity if it falls above the last bucket.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and cumulative:
+                return (
+                    self.buckets[index] if index < len(self.buckets) else float("inf")
+                )
+        return 0.0
+
+
+class RouteMetrics:
+    """
+    Request counters and latency histograms of a route.
+    """
+
+    __slots__ = ("statuses", "latency", "phases")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the RouteMetrics object.
+
+        Args:
+            buckets (Sequence[float], optional): Upper bounds of the histogram buckets in seconds. Defaults to DEFAULT_BUCKETS.
+        """
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram(buckets)
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+
+    @property
+    def requests(self) -> int:
+        """
+        Get the number of requests handled by the route.
+        """
+        return self.latency.count
+
+
+class PhaseTimer:
+    """
+    Measures the time spent in each phase of a request, as laps since the previous phase ended.
+    """
+
+    __slots__ = ("phases", "start", "_last")
+
+    def __init__(self) -> None:
+        """
+        Initialize the PhaseTimer object.
+        """
+        self.phases: Dict[str, float] = {}
+        self.start = self._last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        Add the time elapsed since the last lap to a phase.
+
+        Args:
+            phase (str): The phase that just ended.
+        """
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def elapsed(self) -> float:
+        """
+        Get the time elapsed since the timer started.
+
+        Returns:
+            float: The elapsed time in seconds.
+        """
+        return self._last - self.start
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics of an application, keyed by method and route path pattern
+    (e.g. '/users/:id'), never by the concrete path, so the number of series stays bounded.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the MetricsRegistry object.
+
+        Args:
+            buckets (Sequence[float], optional): Upper bounds of the histogram buckets in seconds. Defaults to DEFAULT_BUCKETS.
+        """
+        self._buckets = tuple(buckets)
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    @property
+    def routes(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        """
+        Get the metrics of each route, keyed by (method, route path).
+        """
+        return self._routes
+
+    def record(self, method: str, route: str, status: int, timer: PhaseTimer) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path pattern.
+            status (int): The response status code.
+            timer (PhaseTimer): The timer of the request.
+        """
+        metrics = self._routes.get((method, route))
+        if metrics is None:
+            metrics = self._routes[(method, route)] = RouteMetrics(self._buckets)
+
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(timer.elapsed())
+
+        phases = metrics.phases
+        for phase, duration in timer.phases.items():
+            phases[phase].observe(duration)
+
+    def clear(self) -> None:
+        """
+        Remove all the recorded metrics.
+        """
+        self._routes.clear()
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = [
+            "# HELP fastipy_requests_total Number of HTTP requests handled.",
+            "# TYPE fastipy_requests_total counter",
+        ]
+        for (method, route), metrics in self._routes.items():
+            labels = _labels(method=method, route=route)
+            for status, count in metrics.statuses.items():
+                lines.append(
+                    f'fastipy_requests_total{{{labels},status="{status}"}} {count}'
+                )
+
+        lines.append(
+            "# HELP fastipy_request_duration_seconds Time to handle an HTTP request."
+        )
+        lines.append("# TYPE fastipy_request_duration_seconds histogram")
+        for (method, route), metrics in self._routes.items():
+            _render_histogram(
+                lines,
+                "fastipy_request_duration_seconds",
+                _labels(method=method, route=route),
+                metrics.latency,
+            )
+
+        lines.append(
+            "# HELP fastipy_request_phase_duration_seconds Time spent in each phase of an HTTP request."
+        )
+        lines.append("# TYPE fastipy_request_phase_duration_seconds histogram")
+        for (method, route), metrics in self._routes.items():
+            for phase, histogram in metrics.phases.items():
+                if histogram.count:
+                    _render_histogram(
+                        lines,
+                        "fastipy_request_phase_duration_seconds",
+                        _labels(method=method, route=route, phase=phase),
+                        histogram,
+                    )
+
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _labels(**labels: str) -> str:
+    """
+    Format Prometheus labels, escaping their values.
+    """
+    return ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+
+
+def _render_histogram(
+    lines: List[str], name: str, labels: str, histogram: Histogram
+) -> None:
+    """
+    Append the Prometheus series of a histogram, with cumulative buckets.
+    """
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
@@ -0,0 +1,231 @@
+import io, os, re, threading
+from base64 import b64encode
+from collections import OrderedDict
+from email.generator import Generator
+from email.mime.base import MIMEBase
+from email.message import Message
+from typing import Dict, Iterator, Optional, Tuple
+
+# Base64 lines are 76 characters long, which is 57 bytes of input
+_LINE_INPUT_SIZE = 57
+_CHUNK_LINES = 1024
+_CHUNK_SIZE = _LINE_INPUT_SIZE * _CHUNK_LINES
+_CRLF = b"\r\n"
+
+_MARKER = re.compile("\x00([0-9]+)\x00")
+_LEADING_PERIOD = re.compile(r"(?m)^\.")
+
+
+class FileAttachment(MIMEBase):
+    """
+    A base64 attachment read from disk only when the message is sent.
+
+    The file is streamed chunk by chunk by `iter_message`. Calling `get_payload` or
+    `as_string` still works, encoding the whole file in memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        filename: Optional[str] = None,
+        maintype: str = "application",
+        subtype: str = "octet-stream",
+    ) -> None:
+        """
+        Initialize the FileAttachment object.
+
+        Args:
+            path (str): The path to the file.
+            filename (Optional[str], optional): The file name shown to the recipient. Defaults to the file name of the path.
+            maintype (str, optional): The main MIME type. Defaults to "application".
+            subtype (str, optional): The MIME subtype. Defaults to "octet-stream".
+        """
+        super().__init__(maintype, subtype)
+        self.path = path
+        self["Content-Transfer-Encoding"] = "base64"
+        self.add_header(
+            "Content-Disposition",
+            f'attachment; filename="{filename or os.path.basename(path)}"',
+        )
+
+    def get_payload(self, i=None, decode=False):
+        if self._payload is None:
+            self._payload = b"".join(iter_attachment(self)).decode("ascii")
+        return super().get_payload(i, decode)
+
+
+class AttachmentCache:
+    """
+    Process-wide cache of encoded attachments, bounded by its total size in bytes,
+    so a file sent to many recipients is read and encoded only once.
+    """
+
+    def __init__(
+        self, max_bytes: int = 32 * 1024 * 1024, max_entry_bytes: int = 8 * 1024 * 1024
+    ) -> None:
+        """
+        Initialize the AttachmentCache object.
+
+        Args:
+            max_bytes (int, optional): Maximum size of all the cached attachments. Defaults to 32 MiB.
+            max_entry_bytes (int, optional): Maximum size of a single cached attachment. Larger files are always streamed from disk. Defaults to 8 MiB.
+        """
+        self._entries: OrderedDict[Tuple[str, int, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = max_entry_bytes
+
+    @property
+    def size(self) -> int:
+        """
+        Get the size of the cached attachments in bytes.
+        """
+        return self._size
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[bytes]:
+        """
+        Get an encoded attachment.
+
+        Args:
+            key (Tuple[str, int, int]): The path, modification time and size of the file.
+
+        Returns:
+            Optional[bytes]: The encoded attachment, or None if it is not cached.
+        """
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def accepts(self, size: int) -> bool:
+        """
+        Check if a file of the given size can be cached once encoded.
+
+        Args:
+            size (int): The size of the file in bytes.
+        """
+        return size * 4 // 3 <= min(self._max_entry_bytes, self._max_bytes)
+
+    def set(self, key: Tuple[str, int, int], content: bytes) -> None:
+        """
+        Cache an encoded attachment, evicting the least recently used ones to make room.
+
+        Args:
+            key (Tuple[str, int, int]): The path, modification time and size of the file.
+            content (bytes): The encoded attachment.
+        """
+        with self._lock:
+            if key in self._entries:
+                return
+
+            self._entries[key] = content
+            self._size += len(content)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        """
+        Remove all the cached attachments.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+attachment_cache = AttachmentCache()
+
+
+class _StreamingGenerator(Generator):
+    """
+    Generator that writes a marker instead of the body of file attachments,
+    so they can be streamed separately.
+    """
+
+    def _dispatch(self, msg: Message) -> None:
+        if isinstance(msg, FileAttachment):
+            self._fp.write(f"\x00{id(msg)}\x00")
+        else:
+            super()._dispatch(msg)
+
+
+def iter_attachment(attachment: FileAttachment) -> Iterator[bytes]:
+    """
+    Encode a file attachment to base64 lines chunk by chunk, using the attachment cache.
+
+    Args:
+        attachment (FileAttachment): The attachment.
+
+    Yields:
+        bytes: Chunks of base64 lines separated by CRLF, without a trailing line break.
+    """
+    stat = os.stat(attachment.path)
+    key = (attachment.path, stat.st_mtime_ns, stat.st_size)
+
+    content = attachment_cache.get(key)
+    if content is not None:
+        yield content
+        return
+
+    chunks = [] if attachment_cache.accepts(stat.st_size) else None
+    with io.open(attachment.path, "rb") as file:
+        separator = b""
+        while chunk := file.read(_CHUNK_SIZE):
+            encoded = _CRLF.join(
+                b64encode(chunk[i : i + _LINE_INPUT_SIZE])
+                for i in range(0, len(chunk), _LINE_INPUT_SIZE)
+            )
+            if chunks is not None:
+                chunks.append(separator + encoded)
+            yield separator + encoded
+            separator = _CRLF
+
+    if chunks is not None:
+        attachment_cache.set(key, b"".join(chunks))
+
+
+def iter_message(message: Message) -> Iterator[bytes]:
+    """
+    Serialize a message to SMTP DATA content with CRLF line endings and dot-stuffing,
+    streaming the file attachments instead of building the whole message in memory.
+
+    Args:
+        message (Message): The message.
+
+    Yields:
+        bytes: Chunks of the message, ending with CRLF.
+    """
+    attachments: Dict[str, FileAttachment] = {
+        str(id(part)): part
+        for part in message.walk()
+        if isinstance(part, FileAttachment)
+    }
+
+    buffer = io.StringIO()
+    _StreamingGenerator(buffer, mangle_from_=False).flatten(message, linesep="\r\n")
+
+    segments = _MARKER.split(buffer.getvalue())
+    last = b""
+    for index, segment in enumerate(segments):
+        if index % 2:
+            for chunk in iter_attachment(attachments[segment]):
+                yield chunk
+                last = chunk
+        elif segment:
+            last = _LEADING_PERIOD.sub("..", segment).encode("ascii")
+            yield last
+
+    if not last.endswith(_CRLF):
+        yield _CRLF
+
+
+def has_file_attachments(message: Message) -> bool:
+    """
+    Check if a message has attachments that can be streamed.
+
+    Args:
+        message (Message): The message.
+    """
+    return any(isinstance(part, FileAttachment) for part in message.walk())
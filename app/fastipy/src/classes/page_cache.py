@@ -0,0 +1,85 @@
+import io, os
+from typing import Dict
+
+from ..helpers.etag import generate_etag
+
+
+class CachedPage:
+    """
+    An HTML page kept in memory already encoded, with its validators.
+    """
+
+    def __init__(self, content: bytes, mtime: int, size: int) -> None:
+        """
+        Initialize the CachedPage object.
+
+        Args:
+            content (bytes): The encoded page content.
+            mtime (int): The modification time of the file in nanoseconds.
+            size (int): The size of the file in bytes.
+        """
+        self.content = content
+        self.length = len(content)
+        self.etag = generate_etag(content)
+        self.mtime = mtime
+        self.size = size
+
+
+class PageCache:
+    """
+    Process-wide cache of HTML pages, invalidated when the file changes on disk.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """
+        Initialize the PageCache object.
+
+        Args:
+            max_entries (int, optional): Maximum number of pages kept in memory. Defaults to 256.
+        """
+        self._pages: Dict[str, CachedPage] = {}
+        self._max_entries = max_entries
+
+    def get(self, path: str, use_cache: bool = True) -> CachedPage:
+        """
+        Get a page, reading it from disk only when it is not cached or has changed.
+
+        Args:
+            path (str): The path to the HTML page file.
+            use_cache (bool, optional): Whether to use the cache. If False, the page is always read from disk. Defaults to True.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+
+        Returns:
+            CachedPage: The page.
+        """
+        stat = os.stat(path)
+
+        page = self._pages.get(path)
+        if (
+            use_cache
+            and page is not None
+            and page.mtime == stat.st_mtime_ns
+            and page.size == stat.st_size
+        ):
+            return page
+
+        with io.open(path, "rb") as file:
+            page = CachedPage(file.read(), stat.st_mtime_ns, stat.st_size)
+
+        if use_cache:
+            if path not in self._pages and len(self._pages) >= self._max_entries:
+                del self._pages[next(iter(self._pages))]
+            self._pages[path] = page
+
+        return page
+
+    def clear(self) -> None:
+        """
+        Remove all the cached pages.
+        """
+        self._pages.clear()
+
+
+page_cache = PageCache()
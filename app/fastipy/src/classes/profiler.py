@@ -0,0 +1,268 @@
+import cProfile, io, os, pstats, random, re, sys, threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Coroutine, Dict, Iterable, List, Optional
+
+from ..types.profiler import profilerModeType
+
+
+class _SteppedCoroutine:
+    """
+    Awaitable that drives a coroutine step by step, calling `enter` before and `exit`
+    after each step, so only the time the coroutine actually runs is profiled and not
+    the other requests executed by the event loop while it is suspended.
+    """
+
+    def __init__(self, coroutine: Coroutine, enter, exit) -> None:
+        self._coroutine = coroutine
+        self._enter = enter
+        self._exit = exit
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self._enter()
+            try:
+                if error is None:
+                    future = self._coroutine.send(value)
+                else:
+                    future = self._coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._exit()
+
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                value, error = None, e
+
+
+class Profiler:
+    """
+    Opt-in request profiler, sampling a fraction of the requests (or the ones matching
+    a route or a header) with cProfile or a wall-clock stack sampler, and aggregating
+    the results per route.
+
+    A single request is profiled at a time, so a burst can't multiply the overhead.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        routes: Iterable[str] = (),
+        header: Optional[str] = None,
+        mode: profilerModeType = "cprofile",
+        interval: float = 0.005,
+        dump_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the Profiler object.
+
+        Args:
+            sample_rate (float, optional): Fraction of the requests profiled, between 0 and 1. Defaults to 0.01.
+            routes (Iterable[str], optional): Routes always profiled, as "METHOD /path/:param" or "/path/:param" for every method. Defaults to ().
+            header (Optional[str], optional): Request header forcing a request to be profiled. Any client sending it is profiled, so only set it behind a proxy stripping the header from untrusted requests. Defaults to None.
+            mode (profilerModeType, optional): "cprofile" for deterministic function stats, "wall" for sampled wall-clock stacks. Defaults to "cprofile".
+            interval (float, optional): Seconds between two stack samples in "wall" mode. CPU-bound code is sampled at most once per thread switch interval (sys.getswitchinterval()). Defaults to 0.005.
+            dump_dir (Optional[str], optional): Directory where the stats are written by dump(). Defaults to None.
+        """
+        if mode not in ("cprofile", "wall"):
+            raise ValueError(f"Profiler mode '{mode}' is not supported")
+
+        self._sample_rate = sample_rate
+        self._routes = set(routes)
+        self._header = header.lower() if header else None
+        self._mode = mode
+        self._interval = interval
+        self._dump_dir = dump_dir
+
+        self._busy = False
+        self._requests: Counter = Counter()
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._stacks: Dict[str, Counter] = {}
+
+    @property
+    def mode(self) -> profilerModeType:
+        """
+        Get the profiling mode.
+        """
+        return self._mode
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        """
+        Get the number of profiled requests per route.
+        """
+        return dict(self._requests)
+
+    def should_profile(self, method: str, route: str, headers: Dict[str, str]) -> bool:
+        """
+        Check if a request must be profiled.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path pattern.
+            headers (Dict[str, str]): The request headers.
+
+        Returns:
+            bool: True if the request must be profiled, False otherwise.
+        """
+        if self._busy:
+            return False
+
+        return (
+            (self._header is not None and self._header in headers)
+            or route in self._routes
+            or f"{method} {route}" in self._routes
+            or random.random() < self._sample_rate
+        )
+
+    async def profile(self, key: str, coroutine: Coroutine) -> Any:
+        """
+        Run a coroutine under the profiler and add its stats to the given key.
+
+        Args:
+            key (str): The key the stats are aggregated by, usually "METHOD /route".
+            coroutine (Coroutine): The coroutine to profile.
+
+        Returns:
+            Any: The result of the coroutine.
+        """
+        self._busy = True
+        try:
+            if self._mode == "cprofile":
+                return await self.__profile_cprofile(key, coroutine)
+            return await self.__profile_wall(key, coroutine)
+        finally:
+            self._requests[key] += 1
+            self._busy = False
+
+    async def __profile_cprofile(self, key: str, coroutine: Coroutine) -> Any:
+        profile = cProfile.Profile()
+        try:
+            return await _SteppedCoroutine(coroutine, profile.enable, profile.disable)
+        finally:
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+    async def __profile_wall(self, key: str, coroutine: Coroutine) -> Any:
+        stacks = self._stacks.setdefault(key, Counter())
+        thread_id = threading.get_ident()
+        running = threading.Event()
+        stop = threading.Event()
+
+        def sample() -> None:
+            while not stop.wait(self._interval):
+                if running.is_set():
+                    frame = sys._current_frames().get(thread_id)
+                    if frame is not None and running.is_set():
+                        stacks[_fold_stack(frame)] += 1
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            return await _SteppedCoroutine(coroutine, running.set, running.clear)
+        finally:
+            stop.set()
+            sampler.join()
+
+    def report(self, route: Optional[str] = None, limit: int = 30) -> str:
+        """
+        Get a text report of the aggregated stats.
+
+        Args:
+            route (Optional[str], optional): Only report the keys containing this route. Defaults to None (every route).
+            limit (int, optional): Maximum number of functions or stacks per route. Defaults to 30.
+
+        Returns:
+            str: The report.
+        """
+        output = io.StringIO()
+        for key in self._keys(route):
+            output.write(f"=== {key} ({self._requests[key]} requests) ===\n")
+
+            if key in self._stats:
+                stats = self._stats[key]
+                stats.stream = output
+                stats.sort_stats("cumulative").print_stats(limit)
+                continue
+
+            stacks = self._stacks[key].copy()
+            total = sum(stacks.values()) or 1
+            for stack, count in stacks.most_common(limit):
+                output.write(f"{count / total:7.2%} {count:7d}  {stack}\n")
+            output.write("\n")
+
+        return output.getvalue()
+
+    def dump(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Write the aggregated stats to disk, one file per route: pstats files (.prof) in
+        "cprofile" mode, folded stacks (.folded, for flame graphs) in "wall" mode.
+
+        Args:
+            directory (Optional[str], optional): The output directory. Defaults to the "dump_dir" option.
+
+        Raises:
+            ValueError: If no directory is given nor configured.
+
+        Returns:
+            List[str]: The paths of the written files.
+        """
+        directory = directory or self._dump_dir
+        if not directory:
+            raise ValueError("No directory to dump the profiler stats")
+
+        os.makedirs(directory, exist_ok=True)
+
+        paths = []
+        for key in self._keys():
+            name = re.sub(r"[^a-zA-Z0-9]+", "_", key).strip("_")
+
+            if key in self._stats:
+                path = os.path.join(directory, f"{name}.prof")
+                self._stats[key].dump_stats(path)
+            else:
+                path = os.path.join(directory, f"{name}.folded")
+                with io.open(path, "w", encoding="utf-8") as file:
+                    for stack, count in self._stacks[key].copy().items():
+                        file.write(f"{stack} {count}\n")
+
+            paths.append(path)
+
+        return paths
+
+    def reset(self) -> None:
+        """
+        Remove all the aggregated stats.
+        """
+        self._requests.clear()
+        self._stats.clear()
+        self._stacks.clear()
+
+    def _keys(self, route: Optional[str] = None) -> List[str]:
+        """
+        Get the keys with stats, optionally filtered by route.
+        """
+        keys = [*self._stats, *self._stacks]
+        if route is not None:
+            keys = [key for key in keys if route in key]
+        return sorted(keys)
+
+
+def _fold_stack(frame: FrameType) -> str:
+    """
+    Format a stack in the folded format, from the outermost frame to the innermost.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(names))
@@ -0,0 +1,176 @@
+import json, math
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Dict, Hashable, Optional
+
+TOO_MANY_REQUESTS = json.dumps({"error": "Too many requests"}).encode("utf-8")
+
+
+class RateLimiter:
+    """
+    Limits the requests of each client with a token bucket: a client can send `burst`
+    requests at once, and the bucket refills at `rate` requests per second.
+
+    Each bucket is a single float, the time at which it will be full again (the generic
+    cell rate algorithm, equivalent to a token bucket), kept in an OrderedDict ordered by
+    last use, so a check is a few dict operations. Full buckets are swept from the front
+    of the dict periodically, and when `max_keys` clients are tracked the least recently
+    seen one is evicted, so memory stays bounded when clients spray keys.
+
+    Must be used from the event loop thread.
+    """
+
+    __slots__ = (
+        "_interval",
+        "_tolerance",
+        "_key",
+        "_header",
+        "_max_keys",
+        "_sweep_interval",
+        "_next_sweep",
+        "_buckets",
+        "_allowed",
+        "_limited",
+        "_evicted",
+    )
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        key: Optional[Callable[..., Hashable]] = None,
+        header: Optional[str] = None,
+        max_keys: int = 100_000,
+        sweep_interval: float = 10.0,
+    ) -> None:
+        """
+        Initialize the RateLimiter object.
+
+        Args:
+            rate (float): Requests per second allowed to each client, on average.
+            burst (Optional[int], optional): Requests a client can send at once. Defaults to the rate, at least 1.
+            key (Optional[Callable[..., Hashable]], optional): Function of the Request returning the client key. Defaults to the client IP.
+            header (Optional[str], optional): Request header used as the client key (e.g. "x-api-key"), instead of the client IP. Defaults to None.
+            max_keys (int, optional): Maximum number of clients tracked. Defaults to 100000.
+            sweep_interval (float, optional): Seconds between two sweeps of the full buckets. Defaults to 10.0.
+        """
+        burst = burst if burst is not None else max(1, math.ceil(rate))
+        self._interval = 1.0 / rate
+        # A bucket with less than one token left is "full" this far in the future
+        self._tolerance = self._interval * (burst - 1)
+        self._key = key
+        self._header = header.lower() if header is not None else None
+        self._max_keys = max_keys
+        self._sweep_interval = sweep_interval
+        self._next_sweep = monotonic() + sweep_interval
+        self._buckets: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._allowed = 0
+        self._limited = 0
+        self._evicted = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the requests allowed and limited, the clients tracked, and the clients
+        evicted because `max_keys` was reached.
+        """
+        return {
+            "allowed": self._allowed,
+            "limited": self._limited,
+            "keys": len(self._buckets),
+            "evicted": self._evicted,
+        }
+
+    def key(self, request) -> Hashable:
+        """
+        Get the client key of a request.
+
+        Args:
+            request (Request): The Request object.
+
+        Returns:
+            Hashable: The key.
+        """
+        if self._key is not None:
+            return self._key(request)
+        if self._header is not None:
+            return request.headers.get(self._header)
+
+        try:
+            client = request.client
+        except KeyError:
+            return None
+        return client[0] if client else None
+
+    def hit(self, key: Hashable) -> float:
+        """
+        Take a token from the bucket of a client.
+
+        Args:
+            key (Hashable): The client key.
+
+        Returns:
+            float: 0.0 if the request is allowed, otherwise the seconds until it would be.
+        """
+        now = monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        buckets = self._buckets
+        full_at = buckets.get(key)
+        if full_at is None:
+            if len(buckets) >= self._max_keys:
+                buckets.popitem(last=False)
+                self._evicted += 1
+            full_at = now
+        else:
+            # Kept ordered by last use
+            buckets.move_to_end(key)
+            if full_at < now:
+                full_at = now
+
+        wait = full_at - self._tolerance - now
+        if wait > 0:
+            self._limited += 1
+            return wait
+
+        buckets[key] = full_at + self._interval
+        self._allowed += 1
+        return 0.0
+
+    async def reject(self, send, wait: float, cors: Dict[str, str] = {}) -> int:
+        """
+        Send the 429 Too Many Requests response of a limited request.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+            wait (float): Seconds until the client can send a request again.
+            cors (Dict[str, str], optional): The CORS headers. Defaults to {}.
+
+        Returns:
+            int: The status code sent.
+        """
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"retry-after", str(math.ceil(wait)).encode("utf-8")),
+        ]
+        for key, value in cors.items():
+            headers.append((key.encode("utf-8"), value.encode("utf-8")))
+
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": TOO_MANY_REQUESTS})
+        return 429
+
+    def _sweep(self, now: float) -> None:
+        """
+        Remove the full buckets, a missing bucket is full. The least recently used
+        buckets come first, so the sweep stops at the first bucket still refilling.
+        """
+        self._next_sweep = now + self._sweep_interval
+        buckets = self._buckets
+        while buckets:
+            key, full_at = buckets.popitem(last=False)
+            if full_at > now:
+                buckets[key] = full_at
+                buckets.move_to_end(key, last=False)
+                return
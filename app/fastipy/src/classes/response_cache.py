@@ -0,0 +1,446 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Coroutine, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ..helpers.etag import etag_matches
+
+# Requests carrying credentials are only shared when the key tells them apart
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+class CachedResponse:
+    """
+    A complete response, as sent: status, encoded headers and body.
+    """
+
+    __slots__ = ("status", "headers", "body", "expires")
+
+    def __init__(
+        self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes
+    ) -> None:
+        """
+        Initialize the CachedResponse object.
+
+        Args:
+            status (int): The status code.
+            headers (List[Tuple[bytes, bytes]]): The encoded headers.
+            body (bytes): The body.
+        """
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires = 0.0
+
+    async def send(self, send: Coroutine, if_none_match: Optional[str] = None) -> int:
+        """
+        Send the response, or a 304 Not Modified if it has an ETag matching the
+        If-None-Match header of the request.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+            if_none_match (Optional[str], optional): The If-None-Match header of the request. Defaults to None.
+
+        Returns:
+            int: The status code sent.
+        """
+        status, body = self.status, self.body
+        if if_none_match and status == 200:
+            for header, value in self.headers:
+                if header.lower() == b"etag":
+                    if etag_matches(if_none_match, value.decode("utf-8")):
+                        status, body = 304, b""
+                    break
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": self.headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+        return status
+
+    def shareable(self) -> bool:
+        """
+        Check if the response can be sent to other clients: it isn't a 304 Not Modified
+        (which depends on the request), doesn't set cookies and isn't marked private or
+        no-store.
+
+        Returns:
+            bool: True if the response can be shared.
+        """
+        if self.status == 304:
+            return False
+
+        for header, value in self.headers:
+            header = header.lower()
+            if header == b"set-cookie":
+                return False
+            if header == b"cache-control" and (
+                b"no-store" in value or b"private" in value
+            ):
+                return False
+        return True
+
+
+class ResponseRecorder:
+    """
+    Wraps the ASGI send function of a request to keep a copy of the response sent, so it
+    can be cached or sent to other requests.
+    """
+
+    __slots__ = (
+        "_send",
+        "_extra_headers",
+        "_status",
+        "_headers",
+        "_chunks",
+        "_size",
+        "_max_size",
+        "_complete",
+    )
+
+    def __init__(
+        self,
+        send: Coroutine,
+        max_size: int = 1024 * 1024,
+        extra_headers: List[Tuple[bytes, bytes]] = [],
+    ) -> None:
+        """
+        Initialize the ResponseRecorder object.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+            max_size (int, optional): Maximum body size recorded, larger responses are only sent. Defaults to 1 MiB.
+            extra_headers (List[Tuple[bytes, bytes]], optional): Encoded headers added to the response. Defaults to [].
+        """
+        self._send = send
+        self._extra_headers = extra_headers
+        self._status = 0
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._chunks: Optional[List[bytes]] = []
+        self._size = 0
+        self._max_size = max_size
+        self._complete = False
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            if self._extra_headers:
+                message = {
+                    **message,
+                    "headers": [*message["headers"], *self._extra_headers],
+                }
+            self._status = message["status"]
+            self._headers = message["headers"]
+        elif message["type"] == "http.response.body" and self._chunks is not None:
+            body = message.get("body", b"")
+            self._size += len(body)
+            if self._size > self._max_size:
+                self._chunks = None
+            else:
+                self._chunks.append(body)
+                self._complete = not message.get("more_body", False)
+
+        await self._send(message)
+
+    def response(self) -> Optional[CachedResponse]:
+        """
+        Get the recorded response.
+
+        Returns:
+            Optional[CachedResponse]: The response, or None if it wasn't completely sent or is too large.
+        """
+        if not self._complete or self._chunks is None:
+            return None
+
+        body = self._chunks[0] if len(self._chunks) == 1 else b"".join(self._chunks)
+        return CachedResponse(self._status, self._headers, body)
+
+
+class RequestCoalescer:
+    """
+    Coalesces identical concurrent requests of a route (single-flight): the first one
+    runs the handler and the ones arriving meanwhile wait for its response, receiving a
+    copy of it. Nothing is kept once the response is sent.
+
+    Shared responses skip the hooks and middlewares of the route, and the default key
+    has no credentials, so requests carrying an Authorization or Cookie header are never
+    shared unless the route passes its own `key`.
+    """
+
+    def __init__(
+        self,
+        key: Optional[Callable[..., Hashable]] = None,
+        max_size: int = 1024 * 1024,
+    ) -> None:
+        """
+        Initialize the RequestCoalescer object.
+
+        Args:
+            key (Optional[Callable[..., Hashable]], optional): Function of the Request returning its key. Defaults to the method, path and query string.
+            max_size (int, optional): Maximum body size of a response shared with the waiting requests. Defaults to 1 MiB.
+        """
+        self._key = key
+        self._max_size = max_size
+        self._credentials = CREDENTIAL_HEADERS if key is None else ()
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the handler executions, the requests that waited for the response of
+        another one, and the number of executions in flight.
+        """
+        return {
+            "executions": self._executions,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._flights),
+        }
+
+    def key(self, request) -> Hashable:
+        """
+        Get the key of a request, identical requests have the same key.
+
+        Args:
+            request (Request): The Request object.
+
+        Returns:
+            Hashable: The key.
+        """
+        if self._key is not None:
+            return self._key(request)
+        return (request.method, request.path, request.raw_query)
+
+    def shares(self, request) -> bool:
+        """
+        Check if a request can share a response: it carries no credentials the key
+        ignores.
+
+        Args:
+            request (Request): The Request object.
+
+        Returns:
+            bool: True if the request can share a response.
+        """
+        if not self._credentials:
+            return True
+        headers = request.headers
+        return not any(header in headers for header in self._credentials)
+
+    async def lookup(self, key: Hashable) -> Tuple[Optional[CachedResponse], bool]:
+        """
+        Wait for the response of the identical request running the handler, if any.
+
+        Args:
+            key (Hashable): The request key.
+
+        Returns:
+            Tuple[Optional[CachedResponse], bool]: The response, or None if the request runs the handler, and whether its response is shared with the requests arriving meanwhile.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._coalesced += 1
+            # Shielded, a waiter cancelled by its client disconnecting doesn't cancel the others
+            response = await asyncio.shield(flight)
+            if response is not None:
+                return response, False
+            # The response can't be shared, the request runs the handler by itself
+            self._executions += 1
+            return None, False
+
+        self._executions += 1
+        self._flights[key] = asyncio.get_running_loop().create_future()
+        return None, True
+
+    def recorder(self, send: Coroutine) -> ResponseRecorder:
+        """
+        Wrap the send function of the request running the handler.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+
+        Returns:
+            ResponseRecorder: The send function recording the response.
+        """
+        return ResponseRecorder(send, self._max_size)
+
+    def complete(self, key: Hashable, response: Optional[CachedResponse]) -> None:
+        """
+        Send the response of the request that ran the handler to the requests waiting
+        for it, if it can be shared.
+
+        Args:
+            key (Hashable): The request key.
+            response (Optional[CachedResponse]): The recorded response, None if it wasn't completely sent.
+        """
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight.done():
+            flight.set_result(
+                response if response is not None and response.shareable() else None
+            )
+
+
+class ResponseCache(RequestCoalescer):
+    """
+    In-memory LRU cache of the responses of a route.
+
+    A request is served from the cache before any hook or middleware runs. On a miss, the
+    first request runs the handler and the identical requests arriving meanwhile wait
+    for its response (single-flight), so a miss under load runs the handler once.
+
+    The `vary` headers are part of the key and are sent in the Vary header of the
+    responses. A credential header in `vary` no longer prevents caching.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        vary: Sequence[str] = (),
+        key: Optional[Callable[..., Hashable]] = None,
+        max_entries: int = 1024,
+        max_size: int = 1024 * 1024,
+        statuses: Sequence[int] = (200,),
+    ) -> None:
+        """
+        Initialize the ResponseCache object.
+
+        Args:
+            ttl (float, optional): Seconds a response is kept. Defaults to 60.0.
+            vary (Sequence[str], optional): Request headers whose values are part of the key. Defaults to ().
+            key (Optional[Callable[..., Hashable]], optional): Function of the Request returning its key. Defaults to the method, path and query string.
+            max_entries (int, optional): Maximum number of responses kept, the least recently used are evicted. Defaults to 1024.
+            max_size (int, optional): Maximum body size of a cached response. Defaults to 1 MiB.
+            statuses (Sequence[int], optional): Status codes of the responses cached. Defaults to (200,).
+        """
+        super().__init__(key, max_size)
+        self._ttl = ttl
+        self._vary = tuple(header.lower() for header in vary)
+        self._credentials = tuple(
+            header for header in self._credentials if header not in self._vary
+        )
+        self._vary_headers = (
+            [(b"vary", ", ".join(self._vary).encode("latin-1"))] if self._vary else []
+        )
+        self._max_entries = max_entries
+        self._statuses = frozenset(statuses)
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._hits = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the hits (including the requests that waited for a response being cached),
+        misses, coalesced requests, evictions and number of cached responses.
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._executions,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "size": len(self._entries),
+        }
+
+    def key(self, request) -> Hashable:
+        """
+        Get the cache key of a request.
+
+        Args:
+            request (Request): The Request object.
+
+        Returns:
+            Hashable: The key.
+        """
+        key = super().key(request)
+        if self._vary:
+            headers = request.headers
+            key = (key, *(headers.get(header) for header in self._vary))
+        return key
+
+    async def lookup(self, key: Hashable) -> Tuple[Optional[CachedResponse], bool]:
+        """
+        Get the cached response of a key, waiting for it if another request is running
+        the handler.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Tuple[Optional[CachedResponse], bool]: The response, or None on a miss, and whether the request runs the handler to fill the cache.
+        """
+        response = self._get(key)
+        if response is None:
+            response, fill = await super().lookup(key)
+            if response is None:
+                return None, fill
+
+        self._hits += 1
+        return response, False
+
+    def recorder(self, send: Coroutine) -> ResponseRecorder:
+        """
+        Wrap the send function of the request running the handler, adding the Vary
+        header to its response.
+
+        Args:
+            send (Coroutine): The coroutine function to send the response.
+
+        Returns:
+            ResponseRecorder: The send function recording the response.
+        """
+        return ResponseRecorder(send, self._max_size, self._vary_headers)
+
+    def complete(self, key: Hashable, response: Optional[CachedResponse]) -> None:
+        """
+        Cache the response of the request that ran the handler, if it can be cached, and
+        send it to the requests waiting for it.
+
+        Args:
+            key (Hashable): The cache key.
+            response (Optional[CachedResponse]): The recorded response, None if it wasn't completely sent.
+        """
+        if response is not None and (
+            response.status not in self._statuses or not response.shareable()
+        ):
+            response = None
+
+        if response is not None:
+            response.expires = monotonic() + self._ttl
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        super().complete(key, response)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Remove a cached response, or every cached response.
+
+        Args:
+            key (Optional[Hashable], optional): The cache key. Defaults to None, removing every response.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Get a cached response that hasn't expired, marking it as recently used.
+        """
+        response = self._entries.get(key)
+        if response is None:
+            return None
+
+        if response.expires <= monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
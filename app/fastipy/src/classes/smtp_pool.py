@@ -0,0 +1,173 @@
+import smtplib, threading, time
+from contextlib import contextmanager
+from collections import deque
+from typing import Callable, Deque, Iterator, Optional, Tuple
+
+
+class SMTPConnectionPool:
+    """
+    A thread-safe pool of persistent SMTP connections.
+
+    Idle connections are kept alive for reuse, checked with NOOP before being handed out
+    again and replaced transparently when the server has dropped them.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        max_size: int = 4,
+        keep_alive: float = 60.0,
+        health_check_interval: float = 5.0,
+    ) -> None:
+        """
+        Initialize the SMTPConnectionPool object.
+
+        Args:
+            connect (Callable[[], smtplib.SMTP]): Function that opens a new, authenticated connection.
+            max_size (int, optional): Maximum number of open connections. Defaults to 4.
+            keep_alive (float, optional): Seconds an idle connection is kept before being closed. Defaults to 60.0.
+            health_check_interval (float, optional): Idle seconds after which a connection is checked with NOOP before reuse. Defaults to 5.0.
+        """
+        self._connect = connect
+        self._max_size = max_size
+        self._keep_alive = keep_alive
+        self._health_check_interval = health_check_interval
+
+        self._idle: Deque[Tuple[smtplib.SMTP, float]] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @property
+    def max_size(self) -> int:
+        """
+        Get the maximum number of open connections.
+        """
+        return self._max_size
+
+    @property
+    def idle(self) -> int:
+        """
+        Get the number of idle connections.
+        """
+        return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> smtplib.SMTP:
+        """
+        Get a healthy connection from the pool, opening a new one if none is idle.
+
+        Args:
+            timeout (Optional[float], optional): Seconds to wait for a free connection. Defaults to None (wait forever).
+
+        Raises:
+            TimeoutError: If no connection is available in time.
+
+        Returns:
+            smtplib.SMTP: The connection.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No SMTP connection available in the pool")
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, last_used = self._idle.pop()
+
+                idle_time = time.monotonic() - last_used
+                if idle_time > self._keep_alive:
+                    self._close(connection)
+                    continue
+
+                if idle_time > self._health_check_interval and not self._is_alive(
+                    connection
+                ):
+                    self._close(connection)
+                    continue
+
+                return connection
+
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: smtplib.SMTP, discard: bool = False) -> None:
+        """
+        Give a connection back to the pool.
+
+        Args:
+            connection (smtplib.SMTP): The connection acquired from the pool.
+            discard (bool, optional): Whether to close the connection instead of keeping it. Defaults to False.
+        """
+        try:
+            if discard or connection.sock is None:
+                self._close(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[smtplib.SMTP]:
+        """
+        Context manager that acquires a connection and releases it afterwards.
+        The connection is discarded if the block raises a connection error.
+
+        Args:
+            timeout (Optional[float], optional): Seconds to wait for a free connection. Defaults to None (wait forever).
+        """
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except BaseException as error:
+            self.release(connection, discard=is_connection_error(error))
+            raise
+        else:
+            self.release(connection)
+
+    def close(self) -> None:
+        """
+        Close all the idle connections.
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _is_alive(self, connection: smtplib.SMTP) -> bool:
+        """
+        Check if a connection is still usable with a NOOP command.
+        """
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _close(self, connection: smtplib.SMTP) -> None:
+        """
+        Close a connection, ignoring errors from an already dropped connection.
+        """
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Check if an error means the SMTP connection can't be reused.
+    Protocol errors (e.g. a refused recipient) leave the connection usable.
+
+    Args:
+        error (BaseException): The error raised while using the connection.
+
+    Returns:
+        bool: True if the connection must be discarded, False otherwise.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return not isinstance(error, smtplib.SMTPException)
@@ -0,0 +1,394 @@
+import asyncio, json, re
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+HEARTBEAT = b": ping\n\n"
+
+# The only line breaks of the event stream format, str.splitlines() knows many more
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+class ServerSentEvent:
+    """
+    A Server-Sent Event, with its optional event type, id and reconnection time.
+    """
+
+    __slots__ = ("data", "event", "id", "retry")
+
+    def __init__(
+        self,
+        data: Any = None,
+        event: Optional[str] = None,
+        id: Optional[str] = None,
+        retry: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the ServerSentEvent object.
+
+        Args:
+            data (Any, optional): The event data, str, bytes or any JSON serializable value. Defaults to None.
+            event (Optional[str], optional): The event type. Defaults to None.
+            id (Optional[str], optional): The event id, sent back by the client in Last-Event-ID when reconnecting. Defaults to None.
+            retry (Optional[int], optional): The client reconnection time in milliseconds. Defaults to None.
+        """
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def encode(self) -> bytes:
+        """
+        Encode the event in the text/event-stream format.
+
+        Returns:
+            bytes: The encoded event.
+        """
+        return encode_event(self.data, self.event, self.id, self.retry)
+
+
+def encode_event(
+    data: Any = None,
+    event: Optional[str] = None,
+    id: Optional[str] = None,
+    retry: Optional[int] = None,
+) -> bytes:
+    """
+    Encode an event in the text/event-stream format.
+
+    Args:
+        data (Any, optional): The event data, str, bytes or any JSON serializable value. Defaults to None.
+        event (Optional[str], optional): The event type. Defaults to None.
+        id (Optional[str], optional): The event id. Defaults to None.
+        retry (Optional[int], optional): The client reconnection time in milliseconds. Defaults to None.
+
+    Returns:
+        bytes: The encoded event.
+    """
+    lines = []
+    if event is not None:
+        lines.append(f"event: {_field(event)}")
+    if id is not None:
+        lines.append(f"id: {_field(id)}")
+    if retry is not None:
+        lines.append(f"retry: {int(retry)}")
+    if data is not None:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        elif not isinstance(data, str):
+            data = json.dumps(data)
+        # Every line of the data is a field, the client joins them back with newlines
+        lines.extend(f"data: {line}" for line in LINE_BREAK.split(data))
+
+    lines.append("\n")
+    return "\n".join(lines).encode("utf-8")
+
+
+def encode_events(
+    source: Union[Iterator[Any], AsyncIterator[Any]],
+) -> Union[Iterator[bytes], AsyncIterator[bytes]]:
+    """
+    Encode the events yielded by a generator, keeping it sync or async.
+
+    ServerSentEvent items are encoded, bytes are sent as already encoded events (like the
+    ones yielded by channel subscriptions), and anything else is the data of an event.
+
+    Args:
+        source (Union[Iterator[Any], AsyncIterator[Any]]): The generator of events.
+
+    Returns:
+        Union[Iterator[bytes], AsyncIterator[bytes]]: The generator of encoded events.
+    """
+    if isinstance(source, EventSubscription):
+        return source
+
+    if hasattr(source, "__anext__"):
+
+        async def encode_async() -> AsyncIterator[bytes]:
+            try:
+                async for item in source:
+                    yield _encode_item(item)
+            finally:
+                if hasattr(source, "aclose"):
+                    await source.aclose()
+
+        return encode_async()
+
+    def encode_sync() -> Iterator[bytes]:
+        try:
+            for item in source:
+                yield _encode_item(item)
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    return encode_sync()
+
+
+class EventSubscription:
+    """
+    The events of an EventChannel received by a subscriber, as an async iterator of
+    encoded events. Created by EventChannel.subscribe().
+
+    Events wait in a bounded queue. A subscriber too slow to keep up is closed instead of
+    slowing the channel down, and can resume from the channel history when it reconnects.
+    """
+
+    __slots__ = ("_channel", "_events", "_queue_size", "_waiter", "_closed")
+
+    def __init__(self, channel: "EventChannel", queue_size: int) -> None:
+        """
+        Initialize the EventSubscription object.
+
+        Args:
+            channel (EventChannel): The channel subscribed to.
+            queue_size (int): Maximum number of events waiting to be sent.
+        """
+        self._channel = channel
+        self._events: Deque[bytes] = deque()
+        self._queue_size = queue_size
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """
+        Check if the subscription is closed.
+        """
+        return self._closed
+
+    def __aiter__(self) -> "EventSubscription":
+        return self
+
+    async def __anext__(self) -> bytes:
+        while not self._events:
+            if self._closed:
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._events.popleft()
+
+    async def next_events(
+        self, timeout: Optional[float] = None
+    ) -> Optional[List[bytes]]:
+        """
+        Wait for events and take every queued one, sending them in a single write.
+
+        Args:
+            timeout (Optional[float], optional): Maximum seconds to wait. Defaults to None.
+
+        Returns:
+            Optional[List[bytes]]: The encoded events, empty on timeout, or None once the subscription is closed.
+        """
+        if not self._events:
+            if self._closed:
+                return None
+
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            timer = (
+                loop.call_later(timeout, self._wake) if timeout is not None else None
+            )
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if timer is not None:
+                    timer.cancel()
+
+            if not self._events:
+                return None if self._closed else []
+
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    async def aclose(self) -> None:
+        """
+        Unsubscribe from the channel.
+        """
+        self._events.clear()
+        self._close()
+
+    def _put(self, event: bytes) -> bool:
+        """
+        Queue an encoded event.
+
+        Returns:
+            bool: False if the queue is full, the subscription is then closed.
+        """
+        if len(self._events) >= self._queue_size:
+            self._closed = True
+            self._wake()
+            return False
+
+        self._events.append(event)
+        self._wake()
+        return True
+
+    def _close(self) -> None:
+        """
+        Close the subscription, the queued events are still sent.
+        """
+        if not self._closed:
+            self._closed = True
+            self._channel._discard(self)
+        self._wake()
+
+    def _wake(self) -> None:
+        """
+        Wake the subscriber up, if it is waiting.
+        """
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+class EventChannel:
+    """
+    Publishes events to many subscribers. An event is encoded once and the same bytes are
+    queued to every subscriber, and the last events are kept in a ring buffer so clients
+    reconnecting with a Last-Event-ID header receive the events they missed.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, history: int = 1000, queue_size: int = 1024) -> None:
+        """
+        Initialize the EventChannel object.
+
+        Args:
+            history (int, optional): Number of events kept to resume subscribers, 0 to disable resuming. Defaults to 1000.
+            queue_size (int, optional): Maximum number of events waiting to be sent to a subscriber before it is disconnected. Defaults to 1024.
+        """
+        self._history: Deque[Tuple[str, bytes]] = deque(maxlen=history)
+        self._queue_size = queue_size
+        self._subscribers: Set[EventSubscription] = set()
+        self._counter = 0
+        self._dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        """
+        Get the number of subscribers.
+        """
+        return len(self._subscribers)
+
+    @property
+    def dropped(self) -> int:
+        """
+        Get the number of subscribers disconnected because their queue was full.
+        """
+        return self._dropped
+
+    def publish(
+        self,
+        data: Any = None,
+        event: Optional[str] = None,
+        id: Optional[str] = None,
+        retry: Optional[int] = None,
+    ) -> str:
+        """
+        Publish an event to every subscriber.
+
+        Args:
+            data (Any, optional): The event data, str, bytes or any JSON serializable value. Defaults to None.
+            event (Optional[str], optional): The event type. Defaults to None.
+            id (Optional[str], optional): The event id. Defaults to a number incremented by each event.
+            retry (Optional[int], optional): The client reconnection time in milliseconds. Defaults to None.
+
+        Returns:
+            str: The event id.
+        """
+        if id is None:
+            self._counter += 1
+            id = str(self._counter)
+
+        encoded = encode_event(data, event, id, retry)
+        if self._history.maxlen:
+            self._history.append((id, encoded))
+
+        overflowed: List[EventSubscription] = []
+        for subscription in self._subscribers:
+            if not subscription._put(encoded):
+                overflowed.append(subscription)
+
+        for subscription in overflowed:
+            self._dropped += 1
+            self._subscribers.discard(subscription)
+
+        return id
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> EventSubscription:
+        """
+        Subscribe to the events published from now on.
+
+        Args:
+            last_event_id (Optional[str], optional): The id of the last event received by the client, the events published after it are sent first. Defaults to None.
+
+        Returns:
+            EventSubscription: The subscription, an async iterator of encoded events.
+        """
+        subscription = EventSubscription(self, self._queue_size)
+        if last_event_id is not None:
+            subscription._events.extend(self._events_after(last_event_id))
+
+        self._subscribers.add(subscription)
+        return subscription
+
+    def close(self) -> None:
+        """
+        Close every subscription, their responses end after the queued events.
+        """
+        for subscription in list(self._subscribers):
+            subscription._close()
+
+    def _events_after(self, last_event_id: str) -> List[bytes]:
+        """
+        Get the encoded events of the history published after an event. When the event
+        isn't in the history anymore, the whole history is returned.
+        """
+        history = self._history
+        for index in range(len(history) - 1, -1, -1):
+            if history[index][0] == last_event_id:
+                return [encoded for _, encoded in list(history)[index + 1 :]]
+
+        return [encoded for _, encoded in history]
+
+    def _discard(self, subscription: EventSubscription) -> None:
+        """
+        Remove a closed subscription.
+        """
+        self._subscribers.discard(subscription)
+
+
+def _encode_item(item: Any) -> bytes:
+    """
+    Encode an item yielded by a generator of events.
+    """
+    if isinstance(item, ServerSentEvent):
+        return item.encode()
+    if isinstance(item, bytes):
+        return item
+    return encode_event(item)
+
+
+def _field(value: Any) -> str:
+    """
+    Remove the line breaks of a field, they would end it.
+    """
+    return str(value).replace("\r", "").replace("\n", "")
@@ -1,6 +1,24 @@
-import os
-from typing import Any, Optional, Dict, Collection
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import os, threading, hashlib
+from typing import (
+    Any,
+    AsyncGenerator,
+    Optional,
+    Dict,
+    Collection,
+    Hashable,
+    List,
+    Tuple,
+)
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+)
+
+_environments: Dict[Hashable, Environment] = {}
+_environments_lock = threading.Lock()
 
 
 def configure_jinja(
@@ -45,6 +63,203 @@ def configure_jinja(
     return env
 
 
+def get_environment(
+    template_dir: str = "templates",
+    encoding: str = "utf-8",
+    follow_links: bool = False,
+    extensions: Collection[str] = ("html", "htm", "xml"),
+    disabled_extensions: Collection[str] = (),
+    default_for_string: bool = True,
+    autoescape_default: bool = False,
+    debug: bool = False,
+    bytecode_cache_dir: Optional[str] = None,
+    **kwargs: Any
+) -> Environment:
+    """
+    Get the shared Jinja2 environment for a configuration, creating it on first use.
+
+    Environments are kept in a process-wide registry keyed by their configuration, so
+    compiled templates survive between renders. Outside debug mode templates are not
+    checked for changes and their bytecode is cached on disk for faster cold starts.
+
+    Args:
+        template_dir (str, optional): Directory containing the template files. Defaults to "templates".
+        encoding (str, optional): Encoding of template files. Defaults to "utf-8".
+        follow_links (bool, optional): Whether to follow symbolic links. Defaults to False.
+        extensions (Collection[str], optional): List of enabled extensions. Defaults to ("html", "htm", "xml").
+        disabled_extensions (Collection[str], optional): List of disabled extensions. Defaults to ().
+        default_for_string (bool, optional): Whether autoescape is enabled by default for all strings. Defaults to True.
+        autoescape_default (bool, optional): Default autoescape setting. Defaults to False.
+        debug (bool, optional): Reload templates when they change on disk and skip the bytecode cache. Defaults to False.
+        bytecode_cache_dir (Optional[str], optional): Directory for the template bytecode cache. If None, uses the system temporary directory. Defaults to None.
+        **kwargs: Additional keyword arguments to pass to Jinja2 Environment.
+
+    Returns:
+        Environment: Jinja2 Environment instance.
+    """
+    key = _environment_key(
+        os.path.abspath(template_dir),
+        encoding,
+        follow_links,
+        tuple(extensions),
+        tuple(disabled_extensions),
+        default_for_string,
+        autoescape_default,
+        debug,
+        bytecode_cache_dir,
+        tuple(sorted(kwargs.items())),
+    )
+
+    env = _environments.get(key)
+    if env is not None:
+        return env
+
+    with _environments_lock:
+        env = _environments.get(key)
+        if env is None:
+            kwargs.setdefault("auto_reload", debug)
+            if not debug and "bytecode_cache" not in kwargs:
+                if bytecode_cache_dir is not None:
+                    os.makedirs(bytecode_cache_dir, exist_ok=True)
+                # Jinja2 only keys the bytecode by template name, so each configuration
+                # gets its own file namespace (sync and async code are not interchangeable)
+                namespace = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+                kwargs["bytecode_cache"] = FileSystemBytecodeCache(
+                    bytecode_cache_dir, f"__fastipy_jinja2_{namespace}_%s.cache"
+                )
+
+            env = configure_jinja(
+                template_dir,
+                encoding,
+                follow_links,
+                extensions,
+                disabled_extensions,
+                default_for_string,
+                autoescape_default,
+                **kwargs
+            )
+            _environments[key] = env
+
+    return env
+
+
+def clear_environments() -> None:
+    """
+    Remove all the shared Jinja2 environments and their compiled templates.
+    """
+    with _environments_lock:
+        _environments.clear()
+
+
+def _environment_key(*values: Any) -> Tuple[Hashable, ...]:
+    """
+    Build a hashable registry key from environment configuration values.
+    """
+    key = []
+    for value in values:
+        if isinstance(value, tuple):
+            key.append(_environment_key(*value))
+            continue
+
+        try:
+            hash(value)
+            key.append(value)
+        except TypeError:
+            key.append(repr(value))
+
+    return tuple(key)
+
+
+def get_template(
+    template_name: str,
+    encoding: str = "utf-8",
+    follow_links: bool = False,
+    extensions: Collection[str] = ("html", "htm", "xml"),
+    disabled_extensions: Collection[str] = (),
+    default_for_string: bool = True,
+    autoescape_default: bool = False,
+    template_dir: Optional[str] = None,
+    debug: bool = False,
+    bytecode_cache_dir: Optional[str] = None,
+    **kwargs: Any
+) -> Template:
+    """
+    Load a compiled Jinja2 template from the shared environment.
+
+    Args:
+        template_name (str): Name of the template file.
+        encoding (str, optional): Encoding of template files. Defaults to "utf-8".
+        follow_links (bool, optional): Whether to follow symbolic links. Defaults to False.
+        extensions (Collection[str], optional): List of enabled extensions. Defaults to ("html", "htm", "xml").
+        disabled_extensions (Collection[str], optional): List of disabled extensions. Defaults to ().
+        default_for_string (bool, optional): Whether autoescape is enabled by default for all strings. Defaults to True.
+        autoescape_default (bool, optional): Default autoescape setting. Defaults to False.
+        template_dir (Optional[str], optional): Directory containing the template files. If None, uses "templates" directory in the same directory as the script. Defaults to None.
+        debug (bool, optional): Reload templates when they change on disk. Defaults to False.
+        bytecode_cache_dir (Optional[str], optional): Directory for the template bytecode cache. Defaults to None.
+        **kwargs: Additional keyword arguments to pass to Jinja2 Environment.
+
+    Returns:
+        Template: The compiled template.
+    """
+    if template_dir is None:
+        template_dir = os.path.join(os.path.dirname(__file__), "templates")
+
+    env = get_environment(
+        template_dir,
+        encoding,
+        follow_links,
+        extensions,
+        disabled_extensions,
+        default_for_string,
+        autoescape_default,
+        debug,
+        bytecode_cache_dir,
+        **kwargs
+    )
+    return env.get_template(template_name)
+
+
+def warmup_templates(
+    template_names: Optional[List[str]] = None,
+    template_dir: Optional[str] = None,
+    extensions: Collection[str] = ("html", "htm", "xml"),
+    enable_async: bool = False,
+    **kwargs: Any
+) -> int:
+    """
+    Compile templates ahead of time so the first requests don't pay for it.
+
+    Args:
+        template_names (Optional[List[str]], optional): Templates to compile. If None, compiles every template in the directory with an enabled extension. Defaults to None.
+        template_dir (Optional[str], optional): Directory containing the template files. Defaults to None.
+        extensions (Collection[str], optional): List of enabled extensions. Defaults to ("html", "htm", "xml").
+        enable_async (bool, optional): Whether to warm up the asynchronous environment. Defaults to False.
+        **kwargs: Additional keyword arguments to pass to get_template.
+
+    Returns:
+        int: Number of compiled templates.
+    """
+    if enable_async:
+        kwargs["enable_async"] = True
+
+    if template_names is None:
+        if template_dir is None:
+            template_dir = os.path.join(os.path.dirname(__file__), "templates")
+        if not os.path.isdir(template_dir):
+            return 0
+
+        env = get_environment(template_dir, extensions=extensions, **kwargs)
+        template_names = env.list_templates(extensions=extensions)
+
+    for template_name in template_names:
+        get_template(
+            template_name, template_dir=template_dir, extensions=extensions, **kwargs
+        )
+
+    return len(template_names)
+
+
 def render_template(
     template_name: str,
     context: Optional[Dict[str, Any]] = {},
@@ -55,6 +270,8 @@ def render_template(
     default_for_string: bool = True,
     autoescape_default: bool = False,
     template_dir: Optional[str] = None,
+    debug: bool = False,
+    bytecode_cache_dir: Optional[str] = None,
     **kwargs: Any
 ) -> str:
     """
@@ -70,23 +287,128 @@ def render_template(
         default_for_string (bool, optional): Whether autoescape is enabled by default for all strings. Defaults to True.
         autoescape_default (bool, optional): Default autoescape setting. Defaults to False.
         template_dir (Optional[str], optional): Directory containing the template files. If None, uses "templates" directory in the same directory as the script. Defaults to None.
+        debug (bool, optional): Reload templates when they change on disk. Defaults to False.
+        bytecode_cache_dir (Optional[str], optional): Directory for the template bytecode cache. Defaults to None.
         **kwargs: Additional keyword arguments to pass to Jinja2 Environment.
 
     Returns:
         str: Rendered template as string.
     """
-    if template_dir is None:
-        template_dir = os.path.join(os.path.dirname(__file__), "templates")
+    template = get_template(
+        template_name,
+        encoding,
+        follow_links,
+        extensions,
+        disabled_extensions,
+        default_for_string,
+        autoescape_default,
+        template_dir,
+        debug,
+        bytecode_cache_dir,
+        **kwargs
+    )
+    return template.render(context)
+
+
+async def render_template_async(
+    template_name: str,
+    context: Optional[Dict[str, Any]] = {},
+    encoding: str = "utf-8",
+    follow_links: bool = False,
+    extensions: Collection[str] = ("html", "htm", "xml"),
+    disabled_extensions: Collection[str] = (),
+    default_for_string: bool = True,
+    autoescape_default: bool = False,
+    template_dir: Optional[str] = None,
+    debug: bool = False,
+    bytecode_cache_dir: Optional[str] = None,
+    **kwargs: Any
+) -> str:
+    """
+    Render a Jinja2 template asynchronously.
+    Async context values (coroutines, async iterables) are awaited while rendering.
+
+    Args:
+        template_name (str): Name of the template file.
+        context (Optional[Dict[str, Any]], optional): Context data for template rendering. Defaults to {}.
+        encoding (str, optional): Encoding of template files. Defaults to "utf-8".
+        follow_links (bool, optional): Whether to follow symbolic links. Defaults to False.
+        extensions (Collection[str], optional): List of enabled extensions. Defaults to ("html", "htm", "xml").
+        disabled_extensions (Collection[str], optional): List of disabled extensions. Defaults to ().
+        default_for_string (bool, optional): Whether autoescape is enabled by default for all strings. Defaults to True.
+        autoescape_default (bool, optional): Default autoescape setting. Defaults to False.
+        template_dir (Optional[str], optional): Directory containing the template files. If None, uses "templates" directory in the same directory as the script. Defaults to None.
+        debug (bool, optional): Reload templates when they change on disk. Defaults to False.
+        bytecode_cache_dir (Optional[str], optional): Directory for the template bytecode cache. Defaults to None.
+        **kwargs: Additional keyword arguments to pass to Jinja2 Environment.
 
-    env = configure_jinja(
+    Returns:
+        str: Rendered template as string.
+    """
+    template = get_template(
+        template_name,
+        encoding,
+        follow_links,
+        extensions,
+        disabled_extensions,
+        default_for_string,
+        autoescape_default,
         template_dir,
+        debug,
+        bytecode_cache_dir,
+        enable_async=True,
+        **kwargs
+    )
+    return await template.render_async(context)
+
+
+def stream_template(
+    template_name: str,
+    context: Optional[Dict[str, Any]] = {},
+    encoding: str = "utf-8",
+    follow_links: bool = False,
+    extensions: Collection[str] = ("html", "htm", "xml"),
+    disabled_extensions: Collection[str] = (),
+    default_for_string: bool = True,
+    autoescape_default: bool = False,
+    template_dir: Optional[str] = None,
+    debug: bool = False,
+    bytecode_cache_dir: Optional[str] = None,
+    **kwargs: Any
+) -> AsyncGenerator[str, None]:
+    """
+    Render a Jinja2 template asynchronously, chunk by chunk.
+    The page is never held in memory as a whole, which suits large pages and reports.
+
+    Args:
+        template_name (str): Name of the template file.
+        context (Optional[Dict[str, Any]], optional): Context data for template rendering. Defaults to {}.
+        encoding (str, optional): Encoding of template files. Defaults to "utf-8".
+        follow_links (bool, optional): Whether to follow symbolic links. Defaults to False.
+        extensions (Collection[str], optional): List of enabled extensions. Defaults to ("html", "htm", "xml").
+        disabled_extensions (Collection[str], optional): List of disabled extensions. Defaults to ().
+        default_for_string (bool, optional): Whether autoescape is enabled by default for all strings. Defaults to True.
+        autoescape_default (bool, optional): Default autoescape setting. Defaults to False.
+        template_dir (Optional[str], optional): Directory containing the template files. If None, uses "templates" directory in the same directory as the script. Defaults to None.
+        debug (bool, optional): Reload templates when they change on disk. Defaults to False.
+        bytecode_cache_dir (Optional[str], optional): Directory for the template bytecode cache. Defaults to None.
+        **kwargs: Additional keyword arguments to pass to Jinja2 Environment.
+
+    Returns:
+        AsyncGenerator[str, None]: Generator of rendered template chunks.
+    """
+    template = get_template(
+        template_name,
         encoding,
         follow_links,
         extensions,
         disabled_extensions,
         default_for_string,
         autoescape_default,
+        template_dir,
+        debug,
+        bytecode_cache_dir,
+        enable_async=True,
         **kwargs
     )
-    template = env.get_template(template_name)
-    return template.render(context)
+    return template.generate_async(context)
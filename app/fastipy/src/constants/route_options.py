@@ -0,0 +1 @@
+ROUTE_OPTIONS = ["cache", "coalesce", "etag", "concurrency", "timeout", "rate_limit"]
@@ -1,11 +1,14 @@
-import re, copy, click, nest_asyncio
-from typing import Callable, Dict, List, Optional, Self, Union
+import re, asyncio, click, hmac, logging
+from collections import ChainMap
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Self, Tuple, Type, Union, Unpack
 from uvicorn.main import logger
 
 from ..constants.hooks import HOOKS, hookType
 from ..constants.http_methods import HTTP_METHODS, httpMethodType
 from ..constants.decorators import DECORATORS
 from ..constants.events import EVENTS, eventType
+from ..constants.route_options import ROUTE_OPTIONS
 from ..constants.serializers import SERIALIZERS
 
 from ..types.plugins import PluginOptions
@@ -14,22 +17,35 @@ from ..types.routes import (
     PrintTreeOptionsType,
     RouteHookType,
     RouteMiddlewareType,
+    RouteOptionsType,
 )
 from ..types.fastipy import FastipyOptions
 
 from ..exceptions import (
     InvalidPathException,
+    InvalidRouteOptionException,
     DuplicateRouteException,
     NoHookTypeException,
     NoHTTPMethodException,
     DecoratorAlreadyExistsException,
     NoEventTypeException,
     PluginException,
+    ProfilerException,
 )
 
-from ..helpers.async_sync_helpers import run_sync_or_async
+from ..helpers.async_sync_helpers import run_async_or_sync
+from ..helpers.etag import ETAG_MAX_SIZE
 
-from ..classes.decorators_base import DecoratorsBase
+from ..classes.template_render import warmup_templates
+from ..classes.allocations import AllocationTracker
+from ..classes.concurrency_limiter import ConcurrencyLimiter
+from ..classes.disconnect import DisconnectMonitor
+from ..classes.metrics import MetricsRegistry
+from ..classes.profiler import Profiler
+from ..classes.rate_limiter import RateLimiter
+from ..classes.response_cache import RequestCoalescer, ResponseCache
+
+from ..classes.decorators_base import DecoratorsBase, decorated_class
 from .request_handler import RequestHandler
 
 from .request import Request
@@ -40,6 +56,10 @@ from ..routes.plugin_tree import PluginTree, PluginNode
 
 from ..middlewares.cors import CORSGenerator
 
+PATH_PATTERN = re.compile(r"^(\/:?[_a-zA-Z0-9]+)*$|^\/$")
+INVALID_PARAM_PATTERN = re.compile(r":(\d)\w+")
+PARAM_PATTERN = re.compile(r":(\w+)")
+
 
 class Fastipy(RequestHandler, DecoratorsBase):
     """
@@ -62,16 +82,61 @@ class Fastipy(RequestHandler, DecoratorsBase):
         self._options = options
         self._static_path = static_path
         self._error_handler = None
+        self._parent = None
+        self._metrics = MetricsRegistry() if options.get("metrics", False) else None
+        self._profiler = (
+            Profiler(**options["profiler"]) if options.get("profiler") else None
+        )
+        disconnect_watch_delay = options.get("disconnect_watch_delay", 0.1)
+        self._disconnects = (
+            DisconnectMonitor(disconnect_watch_delay)
+            if disconnect_watch_delay is not None
+            else None
+        )
+        self._concurrency = (
+            ConcurrencyLimiter(**options["concurrency"])
+            if options.get("concurrency")
+            else None
+        )
+        self._rate_limit = (
+            RateLimiter(**options["rate_limit"]) if options.get("rate_limit") else None
+        )
+        allocations = options.get("allocations")
+        self._allocations = (
+            AllocationTracker(**(allocations if isinstance(allocations, dict) else {}))
+            if allocations
+            else None
+        )
 
         self._decorators = {decorator: {} for decorator in DECORATORS}
-        self._hooks = {hook_type: [] for hook_type in HOOKS}
-        self._middlewares = []
+        self._hooks = {hook_type: () for hook_type in HOOKS}
+        self._middlewares = ()
+        self._hooks_snapshot = None
         self._events = {event_type: [] for event_type in EVENTS}
         self._serializers = SERIALIZERS
 
         self._instance_decorators = self._decorators["app"]
+        # Incremented by every request or reply decoration, in any scope, so each scope
+        # knows when its generated Request and Reply classes are stale
+        self._decorators_generation = [0]
+        self._decorated = None
+        # Shared by every scope, like the decorators generation
+        self._aborted_requests = [0]
+        self._response_caches = {}
+        self._request_coalescers = {}
+        self._concurrency_limiters = (
+            {"*": self._concurrency} if self._concurrency is not None else {}
+        )
+        self._rate_limiters = (
+            {"*": self._rate_limit} if self._rate_limit is not None else {}
+        )
 
-        nest_asyncio.apply()
+        self._pending_plugins = []
+        self._loaded_plugins = set()
+        self._ready_lock = None
+
+        if self._profiler is not None and options["profiler"].get("dump_dir"):
+            self._events["shutdown"].append(self._profiler.dump)
 
     @property
     def prefix(self) -> str:
@@ -129,6 +194,88 @@ class Fastipy(RequestHandler, DecoratorsBase):
         """
         return self._static_path
 
+    @property
+    def metrics(self) -> Optional[MetricsRegistry]:
+        """
+        Get the request metrics of the application.
+
+        Returns:
+            Optional[MetricsRegistry]: The metrics registry, or None if the "metrics" option is disabled.
+        """
+        return self._metrics
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        """
+        Get the request profiler of the application.
+
+        Returns:
+            Optional[Profiler]: The profiler, or None if the "profiler" option is not set.
+        """
+        return self._profiler
+
+    @property
+    def allocations(self) -> Optional[AllocationTracker]:
+        """
+        Get the allocation tracker of the application.
+
+        Returns:
+            Optional[AllocationTracker]: The tracker, or None if the "allocations" option is not set.
+        """
+        return self._allocations
+
+    @property
+    def aborted_requests(self) -> int:
+        """
+        Get the number of requests aborted because the client disconnected before the response was sent.
+
+        Returns:
+            int: Number of aborted requests.
+        """
+        return self._aborted_requests[0]
+
+    @property
+    def response_caches(self) -> Dict[str, ResponseCache]:
+        """
+        Get the response caches of the routes with the `cache` option, by route (e.g. "GET /users").
+
+        Returns:
+            Dict[str, ResponseCache]: The caches, with their `stats` and `invalidate()`.
+        """
+        return self._response_caches
+
+    @property
+    def request_coalescers(self) -> Dict[str, RequestCoalescer]:
+        """
+        Get the request coalescers of the routes with the `coalesce` option, by route (e.g. "GET /users").
+
+        Returns:
+            Dict[str, RequestCoalescer]: The coalescers, with their `stats`.
+        """
+        return self._request_coalescers
+
+    @property
+    def concurrency_limiters(self) -> Dict[str, ConcurrencyLimiter]:
+        """
+        Get the concurrency limiters of the application ("*", with the "concurrency" option)
+        and of the routes with the `concurrency` option, by route (e.g. "GET /users").
+
+        Returns:
+            Dict[str, ConcurrencyLimiter]: The limiters, with their `stats`.
+        """
+        return self._concurrency_limiters
+
+    @property
+    def rate_limiters(self) -> Dict[str, RateLimiter]:
+        """
+        Get the rate limiters of the application ("*", with the "rate_limit" option)
+        and of the routes with the `rate_limit` option, by route (e.g. "GET /users").
+
+        Returns:
+            Dict[str, RateLimiter]: The limiters, with their `stats`.
+        """
+        return self._rate_limiters
+
     def set_name(self, name: str) -> None:
         """
         Set the name of the instance. Most used for plugins.
@@ -192,6 +339,112 @@ class Fastipy(RequestHandler, DecoratorsBase):
 
         return internal
 
+    def warmup_templates(self, template_names: Optional[List[str]] = None) -> Self:
+        """
+        Compile the application templates at lifespan startup, so the first requests don't pay for it.
+        Both the synchronous and the streaming (async) environments are warmed up.
+
+        Args:
+            template_names (Optional[List[str]], optional): Templates to compile. If None, compiles every template in the template directory. Defaults to None.
+        """
+
+        def startup() -> None:
+            template_dir = self._options.get("template_dir", None)
+            debug = self._options.get("debug", False)
+
+            for enable_async in (False, True):
+                count = warmup_templates(
+                    template_names,
+                    template_dir,
+                    enable_async=enable_async,
+                    debug=debug,
+                )
+            logger.debug(f"Templates warmed up ({count})")
+
+        self.add_event("startup", startup)
+        return self
+
+    def expose_metrics(self, path: str = "/metrics") -> Self:
+        """
+        Add a GET route serving the request metrics in the Prometheus text format.
+        Metrics are only collected when the application has the "metrics" option enabled.
+
+        Args:
+            path (str, optional): Path of the route. Defaults to "/metrics".
+        """
+        if self._metrics is None:
+            logger.warning(
+                f"Metrics exposed at '{path}' but not collected >> Enable the 'metrics' option"
+            )
+
+        async def metrics_handler(request: Request, reply: Reply) -> None:
+            content = self._metrics.render() if self._metrics is not None else ""
+            await reply.type("text/plain; version=0.0.4; charset=utf-8").send(content)
+
+        self.add_route("GET", path, metrics_handler)
+        return self
+
+    def expose_profiler(
+        self,
+        path: str = "/profiler",
+        token: Optional[str] = None,
+        route_hooks: RouteHookType = {},
+    ) -> Self:
+        """
+        Add a protected GET route serving the profiler report.
+        The query parameters "route" and "limit" filter the report, and "dump" writes the stats to the "dump_dir" option.
+
+        Args:
+            path (str, optional): Path of the route. Defaults to "/profiler".
+            token (Optional[str], optional): Token required in the "Authorization: Bearer <token>" header. Defaults to None.
+            route_hooks (RouteHookType, optional): Route hooks, e.g. to plug a custom authentication. Defaults to {}.
+
+        Raises:
+            ProfilerException: If neither a token nor route hooks protect the route.
+        """
+        if token is None and not route_hooks:
+            raise ProfilerException(
+                f"Failed to expose profiler at '{path}' >> Set a token or route hooks to protect it",
+                logger.error,
+            )
+
+        expected = f"Bearer {token}".encode("utf-8") if token is not None else None
+
+        async def profiler_handler(request: Request, reply: Reply) -> None:
+            if expected is not None and not hmac.compare_digest(
+                request.headers.get("authorization", "").encode("utf-8"), expected
+            ):
+                await reply.code(401).send({"error": "Unauthorized"})
+                return
+
+            if self._profiler is None:
+                await reply.code(404).send({"error": "Profiler is not enabled"})
+                return
+
+            if "dump" in request.query:
+                try:
+                    # Only the configured directory, the caller can't choose the path
+                    files = self._profiler.dump()
+                except ValueError as e:
+                    await reply.code(400).send({"error": str(e)})
+                    return
+
+                await reply.send({"files": files})
+                return
+
+            limit = request.query.get("limit", "30")
+            if not limit.isdecimal():
+                await reply.code(400).send(
+                    {"error": "limit must be a non-negative integer"}
+                )
+                return
+
+            report = self._profiler.report(request.query.get("route", None), int(limit))
+            await reply.type("text/plain; charset=utf-8").send(report)
+
+        self.add_route("GET", path, profiler_handler, route_hooks)
+        return self
+
     def add_event(self, event_type: eventType, event: FunctionType) -> None:
         """
         Add an lifespan event handler to the application.
@@ -221,39 +474,220 @@ class Fastipy(RequestHandler, DecoratorsBase):
         """
         Register a plugin with the application.
 
+        Synchronous plugins without dependencies are loaded immediately. Asynchronous plugins
+        and plugins with dependencies are loaded by `ready()`, concurrently when they don't
+        depend on each other. `ready()` runs at lifespan startup, or before the first request.
+
         Args:
             plugin (FunctionType): Plugin function.
             options (PluginOptions, optional): Options for the plugin. Defaults to {}.
         """
+        encapsulate = options.get("encapsulate", True)
         instance = FastipyInstance()
 
         instance._router = self._router
         instance._options = self._options
+        instance._metrics = self._metrics
+        instance._profiler = self._profiler
+        instance._allocations = self._allocations
+        instance._disconnects = self._disconnects
         instance._static_path = self._static_path
-        instance._plugins = PluginNode(plugin.__name__)
-        instance._decorators = self._decorators
-        instance._hooks = self._hooks
-        instance._middlewares = self._middlewares
         instance._events = self._events
-        instance._instance_decorators = self._instance_decorators
+        instance._pending_plugins = self._pending_plugins
+        instance._loaded_plugins = self._loaded_plugins
+        instance._decorators_generation = self._decorators_generation
+        instance._aborted_requests = self._aborted_requests
+        instance._response_caches = self._response_caches
+        instance._request_coalescers = self._request_coalescers
+        instance._concurrency = self._concurrency
+        instance._concurrency_limiters = self._concurrency_limiters
+        instance._rate_limit = self._rate_limit
+        instance._rate_limiters = self._rate_limiters
+        instance._parent = self
+
+        # An encapsulated plugin works on a child scope: it starts from the hooks,
+        # middlewares and decorators of its parent, and what it adds stays in its scope
+        if encapsulate:
+            instance._hooks = dict(self._hooks)
+            instance._decorators = {
+                decorator: ChainMap({}, decorators)
+                for decorator, decorators in self._decorators.items()
+            }
+        else:
+            instance._hooks = self._hooks
+            instance._decorators = self._decorators
+        instance._middlewares = self._middlewares
+        instance._instance_decorators = instance._decorators["app"]
+
+        instance._plugins = PluginNode(plugin.__name__, instance, encapsulate)
+        self._plugins.add_child(instance._plugins)
+
+        prefix = options.get("prefix", "/")
+        if self._prefix != "/":
+            prefix = f"{self._prefix}{prefix if prefix != '/' else ''}"
+        instance._prefix = prefix
+
+        entry = {
+            "plugin": plugin,
+            "options": options,
+            "instance": instance,
+            "middlewares": self._middlewares,
+            "dependencies": options.get("dependencies", []),
+            "timeout": options.get(
+                "timeout", self._options.get("plugin_timeout", None)
+            ),
+        }
+
+        if asyncio.iscoroutinefunction(plugin) or entry["dependencies"]:
+            self._pending_plugins.append(entry)
+            return self
+
+        start = perf_counter()
+        plugin(instance, options)
+        self._finish_plugin(entry, perf_counter() - start)
+
+        return self
+
+    async def ready(self) -> Self:
+        """
+        Load the plugins waiting to be loaded, including the ones they register.
+        Plugins are loaded concurrently, each one after the plugins it depends on.
+        Called automatically at lifespan startup and before the first request.
+
+        Raises:
+            PluginException: If a plugin times out, fails or has a missing or circular dependency.
+        """
+        root = self
+        while root._parent is not None:
+            root = root._parent
+
+        if root._ready_lock is None:
+            root._ready_lock = asyncio.Lock()
+
+        async with root._ready_lock:
+            while root._pending_plugins:
+                entries = list(root._pending_plugins)
+                root._pending_plugins.clear()
+                await self._load_plugins(entries)
+
+        return self
+
+    async def _load_plugins(self, entries: List[dict]) -> None:
+        """
+        Load plugins concurrently, each one waiting for its dependencies.
+
+        Args:
+            entries (List[dict]): The plugins waiting to be loaded.
+        """
+        by_name: Dict[str, List[dict]] = {}
+        for entry in entries:
+            by_name.setdefault(entry["plugin"].__name__, []).append(entry)
+
+        for entry in entries:
+            for dependency in entry["dependencies"]:
+                if dependency not in by_name and dependency not in self._loaded_plugins:
+                    raise PluginException(
+                        f"Failed to register plugin '{entry['plugin'].__name__}' >> Missing dependency '{dependency}'",
+                        logger.error,
+                    )
+
+        visiting, visited = set(), set()
+
+        def check_cycle(name: str) -> None:
+            if name in visited or name not in by_name:
+                return
+            if name in visiting:
+                raise PluginException(
+                    f"Failed to register plugin '{name}' >> Circular dependency",
+                    logger.error,
+                )
+
+            visiting.add(name)
+            for entry in by_name[name]:
+                for dependency in entry["dependencies"]:
+                    check_cycle(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in by_name:
+            check_cycle(name)
+
+        tasks: Dict[int, asyncio.Task] = {}
+
+        async def load(entry: dict) -> None:
+            for dependency in entry["dependencies"]:
+                for dependency_entry in by_name.get(dependency, []):
+                    await tasks[id(dependency_entry)]
+
+            await self._load_plugin(entry)
+
+        for entry in entries:
+            tasks[id(entry)] = asyncio.ensure_future(load(entry))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+    async def _load_plugin(self, entry: dict) -> None:
+        """
+        Load a plugin, applying its timeout.
+
+        Args:
+            entry (dict): The plugin waiting to be loaded.
 
-        instance._prefix = options.get("prefix", "/")
+        Raises:
+            PluginException: If the plugin times out or fails.
+        """
+        plugin = entry["plugin"]
 
-        timeout = self._options.get("plugin_timeout", None)
-        error = run_sync_or_async(plugin, timeout, instance, options)
-        if error:
+        start = perf_counter()
+        try:
+            await asyncio.wait_for(
+                run_async_or_sync(plugin, entry["instance"], entry["options"]),
+                timeout=entry["timeout"],
+            )
+        except asyncio.TimeoutError:
             raise PluginException(
                 f"Failed to register plugin '{plugin.__name__}' >> Plugin timed out",
                 logger.error,
             )
+        except PluginException:
+            raise
+        except Exception as e:
+            raise PluginException(
+                f"Failed to register plugin '{plugin.__name__}' >> {e}",
+                logger.error,
+            ) from e
 
-        self._error_handler = instance._error_handler
+        self._finish_plugin(entry, perf_counter() - start)
+
+    def _finish_plugin(self, entry: dict, load_time: float) -> None:
+        """
+        Record a loaded plugin, sharing what it added with its parent if it isn't encapsulated.
+
+        Args:
+            entry (dict): The loaded plugin.
+            load_time (float): The time the plugin took to load, in seconds.
+        """
+        instance = entry["instance"]
+        parent = instance._parent
+        node = instance._plugins
+
+        if not node.encapsulated:
+            middlewares = instance._middlewares[len(entry["middlewares"]) :]
+            parent._middlewares = (*parent._middlewares, *middlewares)
+            if instance._error_handler is not None:
+                parent._error_handler = instance._error_handler
 
         if instance._name is not None:
-            instance._plugins.name = instance._name
-        self._plugins.add_child(instance._plugins)
+            node.name = instance._name
+        node.load_time = load_time
 
-        return self
+        self._loaded_plugins.add(entry["plugin"].__name__)
 
     def cors(
         self,
@@ -322,6 +756,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
             )
 
         self._decorators["request"][name] = value
+        self._decorators_generation[0] += 1
 
     def decorate_reply(self, name: str, value: any) -> None:
         """
@@ -338,6 +773,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
             )
 
         self._decorators["reply"][name] = value
+        self._decorators_generation[0] += 1
 
     def has_decorator(self, name: str) -> bool:
         """
@@ -389,7 +825,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
                 logger.error,
             )
 
-        self._hooks[hook_type].append(hook)
+        self._hooks[hook_type] = (*self._hooks[hook_type], hook)
 
     def hook(self, hook_type: hookType) -> FunctionType:
         """
@@ -415,7 +851,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         Args:
             middleware (FunctionType): Middleware function.
         """
-        self._middlewares.append(middleware)
+        self._middlewares = (*self._middlewares, middleware)
 
     def use(self) -> FunctionType:
         """Decorator to add a middleware to the application."""
@@ -447,6 +883,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         handler: FunctionType,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> None:
         """
         Add a route to the application.
@@ -457,19 +894,93 @@ class Fastipy(RequestHandler, DecoratorsBase):
             handler (FunctionType): Route handler function.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
         """
-        if self.prefix != "/":
-            path = f"{self.prefix}{path if path != '/' else ''}"
         if method not in HTTP_METHODS:
             raise NoHTTPMethodException(
                 f"Failed to register route [{method}] '{path}' >> Method not supported",
                 logger.error,
             )
 
+        self._register_route(
+            method, path, handler, route_hooks, route_middlewares, route_options
+        )
+
+    def add_websocket_route(
+        self,
+        path: str,
+        handler: FunctionType,
+        route_hooks: RouteHookType = {},
+        route_middlewares: RouteMiddlewareType = [],
+    ) -> None:
+        """
+        Add a WebSocket route to the application. The handler, hooks and middlewares
+        receive the Request and the WebSocket, in place of the Reply.
+
+        Args:
+            path (str): Path of the route.
+            handler (FunctionType): Route handler function.
+            route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
+            route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+        """
+        self._register_route(
+            "WEBSOCKET", path, handler, route_hooks, route_middlewares, {}
+        )
+
+    def _check_shared_response_option(
+        self, method: str, path: str, option: str, value: Any
+    ) -> None:
+        """
+        Check that a route option sharing responses between requests can tell requests
+        apart. The default key ignores the body, so a route that isn't GET or HEAD needs
+        an explicit `key`.
+
+        Args:
+            method (str): HTTP method of the route.
+            path (str): Path of the route.
+            option (str): Name of the option.
+            value (Any): Value of the option.
+        """
+        if method in ("GET", "HEAD"):
+            return
+        if isinstance(value, dict) and value.get("key") is not None:
+            return
+
+        raise InvalidRouteOptionException(
+            f"Failed to register route [{method}] '{path}' >> Option '{option}' needs a 'key' on {method} routes, the default key ignores the body",
+            logger.error,
+        )
+
+    def _register_route(
+        self,
+        method: str,
+        path: str,
+        handler: FunctionType,
+        route_hooks: RouteHookType,
+        route_middlewares: RouteMiddlewareType,
+        route_options: RouteOptionsType,
+    ) -> None:
+        """
+        Add a route to the router, with the hooks and middlewares of this scope.
+
+        Args:
+            method (str): HTTP method, or "WEBSOCKET".
+            path (str): Path of the route.
+            handler (FunctionType): Route handler function.
+            route_hooks (RouteHookType): Route hooks.
+            route_middlewares (RouteMiddlewareType): Route middlewares.
+            route_options (RouteOptionsType): Route options.
+        """
+        start = perf_counter()
+
+        if self.prefix != "/":
+            path = f"{self.prefix}{path if path != '/' else ''}"
+
+        params = PARAM_PATTERN.findall(path)
         if (
-            not re.fullmatch(r"^(\/:?[_a-zA-Z0-9]+)*$|^\/$", path)
-            or re.search(r":(\d)\w+", path)
-            or len(re.findall(r":(\w+)", path)) != len(set(re.findall(r":(\w+)", path)))
+            not PATH_PATTERN.fullmatch(path)
+            or INVALID_PARAM_PATTERN.search(path)
+            or len(params) != len(set(params))
         ):
             raise InvalidPathException(
                 f"Failed to register route [{method}] '{path}' >> Invalid path",
@@ -483,11 +994,70 @@ class Fastipy(RequestHandler, DecoratorsBase):
                 logger.error,
             )
 
-        hooks = copy.deepcopy(self._hooks)
-        hooks.update(route_hooks)
+        for option in route_options:
+            if option not in ROUTE_OPTIONS:
+                raise InvalidRouteOptionException(
+                    f"Failed to register route [{method}] '{path}' >> Unknown option '{option}'",
+                    logger.error,
+                )
+
+        hooks, middlewares = self._scope_hooks(), self._middlewares
+        if route_hooks:
+            hooks = {
+                **hooks,
+                **{
+                    hook_type: tuple(functions)
+                    for hook_type, functions in route_hooks.items()
+                },
+            }
+        if route_middlewares:
+            middlewares = (*middlewares, *route_middlewares)
+
+        cache = None
+        if route_options.get("cache") is not None:
+            self._check_shared_response_option(
+                method, path, "cache", route_options["cache"]
+            )
+            cache = self._response_caches[f"{method} {path}"] = ResponseCache(
+                **route_options["cache"]
+            )
 
-        middlewares = copy.deepcopy(self._middlewares)
-        middlewares.extend(route_middlewares)
+        # The route option overrides the application option
+        etag = route_options.get("etag", self._options.get("etag", False))
+        if etag:
+            etag = (
+                etag.get("max_size", ETAG_MAX_SIZE)
+                if isinstance(etag, dict)
+                else ETAG_MAX_SIZE
+            )
+        else:
+            etag = None
+
+        # Requests take a slot of the route limiter first, so the requests waiting for a
+        # saturated route don't hold slots of the application limiter
+        limiters = ()
+        if route_options.get("concurrency"):
+            limiters = (ConcurrencyLimiter(**route_options["concurrency"]),)
+            self._concurrency_limiters[f"{method} {path}"] = limiters[0]
+        if self._concurrency is not None:
+            limiters = (*limiters, self._concurrency)
+
+        # Requests take a token from the route bucket, then from the application bucket
+        rate_limiters = ()
+        if route_options.get("rate_limit"):
+            rate_limiters = (RateLimiter(**route_options["rate_limit"]),)
+            self._rate_limiters[f"{method} {path}"] = rate_limiters[0]
+        if self._rate_limit is not None:
+            rate_limiters = (*rate_limiters, self._rate_limit)
+
+        coalesce = route_options.get("coalesce")
+        if coalesce:
+            self._check_shared_response_option(method, path, "coalesce", coalesce)
+            coalesce = self._request_coalescers[f"{method} {path}"] = RequestCoalescer(
+                **(coalesce if isinstance(coalesce, dict) else {})
+            )
+        else:
+            coalesce = None
 
         self._router.add_route(
             method,
@@ -496,20 +1066,83 @@ class Fastipy(RequestHandler, DecoratorsBase):
                 "handler": handler,
                 "hooks": hooks,
                 "middlewares": middlewares,
+                "scope": self,
                 "raw_path": path,
+                "cache": cache,
+                "coalesce": coalesce,
+                "etag": etag,
+                "limiters": limiters,
+                "rate_limiters": rate_limiters,
+                # The route option overrides the application option, None disables it
+                "timeout": route_options.get(
+                    "timeout", self._options.get("request_timeout")
+                ),
             },
         )
-        message = f"Route registered [%s] '{path}'"
-        color_message = (
-            "Route registered [" + click.style("%s", fg="cyan") + f"] '{path}'"
-        )
-        logger.debug(message, method, extra={"color_message": color_message})
+        self._router.registration_time += perf_counter() - start
+
+        if logger.isEnabledFor(logging.DEBUG):
+            message = f"Route registered [%s] '{path}'"
+            color_message = (
+                "Route registered [" + click.style("%s", fg="cyan") + f"] '{path}'"
+            )
+            logger.debug(message, method, extra={"color_message": color_message})
+
+    def _scope_hooks(self) -> Dict[str, Tuple[FunctionType, ...]]:
+        """
+        Get the hooks applied to the routes registered now in this scope.
+        Hooks are immutable tuples, so routes registered while they don't change
+        share the same snapshot instead of copying them.
+
+        Returns:
+            Dict[str, Tuple[FunctionType, ...]]: The hooks by type.
+        """
+        hooks = self._hooks_snapshot
+        if hooks is None or any(
+            hooks[hook_type] is not self._hooks[hook_type] for hook_type in HOOKS
+        ):
+            hooks = self._hooks_snapshot = dict(self._hooks)
+
+        return hooks
+
+    def _decorated_classes(self) -> Tuple[Type[Request], Type[Reply]]:
+        """
+        Get the Request and Reply classes of this scope, with its request and reply decorators
+        as class attributes. They are generated again only after a new decoration.
+
+        Returns:
+            Tuple[Type[Request], Type[Reply]]: The Request and Reply classes.
+        """
+        decorated = self._decorated
+        if decorated is None or decorated[0] != self._decorators_generation[0]:
+            decorated = self._decorated = (
+                self._decorators_generation[0],
+                decorated_class(Request, self._decorators["request"]),
+                decorated_class(Reply, self._decorators["reply"]),
+            )
+
+        return decorated[1], decorated[2]
+
+    def _resolve_error_handler(self) -> Optional[FunctionType]:
+        """
+        Get the error handler of this scope, or the closest one set by a parent scope.
+
+        Returns:
+            Optional[FunctionType]: The error handler, or None if no scope has one.
+        """
+        scope = self
+        while scope is not None:
+            if scope._error_handler is not None:
+                return scope._error_handler
+            scope = scope._parent
+        return None
 
     def get(
         self,
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a GET route to the application.
@@ -518,13 +1151,16 @@ class Fastipy(RequestHandler, DecoratorsBase):
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
 
         Returns:
             FunctionType: Route handler function.
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("GET", path, handler, route_hooks, route_middlewares)
+            self.add_route(
+                "GET", path, handler, route_hooks, route_middlewares, **route_options
+            )
             return handler
 
         return internal
@@ -534,6 +1170,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a POST route to the application.
@@ -542,13 +1179,16 @@ class Fastipy(RequestHandler, DecoratorsBase):
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
 
         Returns:
             FunctionType: Route handler function.
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("POST", path, handler, route_hooks, route_middlewares)
+            self.add_route(
+                "POST", path, handler, route_hooks, route_middlewares, **route_options
+            )
             return handler
 
         return internal
@@ -558,6 +1198,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a PUT route to the application.
@@ -566,13 +1207,16 @@ class Fastipy(RequestHandler, DecoratorsBase):
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
 
         Returns:
             FunctionType: Route handler function.
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("PUT", path, handler, route_hooks, route_middlewares)
+            self.add_route(
+                "PUT", path, handler, route_hooks, route_middlewares, **route_options
+            )
             return handler
 
         return internal
@@ -582,6 +1226,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a PATCH route to the application.
@@ -590,13 +1235,16 @@ class Fastipy(RequestHandler, DecoratorsBase):
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
 
         Returns:
             FunctionType: Route handler function.
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("PATCH", path, handler, route_hooks, route_middlewares)
+            self.add_route(
+                "PATCH", path, handler, route_hooks, route_middlewares, **route_options
+            )
             return handler
 
         return internal
@@ -606,6 +1254,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a DELETE route to the application.
@@ -614,13 +1263,16 @@ class Fastipy(RequestHandler, DecoratorsBase):
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
             route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
 
         Returns:
             FunctionType: Route handler function.
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("DELETE", path, handler, route_hooks, route_middlewares)
+            self.add_route(
+                "DELETE", path, handler, route_hooks, route_middlewares, **route_options
+            )
             return handler
 
         return internal
@@ -630,10 +1282,38 @@ class Fastipy(RequestHandler, DecoratorsBase):
         path: str,
         route_hooks: RouteHookType = {},
         route_middlewares: RouteMiddlewareType = [],
+        **route_options: Unpack[RouteOptionsType],
     ) -> FunctionType:
         """
         Decorator to add a HEAD route to the application.
 
+        Args:
+            path (str): Path of the route.
+            route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
+            route_middlewares (RouteMiddlewareType, optional): Route middlewares. Defaults to [].
+            **route_options (RouteOptionsType): Route options, like `cache`, `timeout` or `rate_limit` (see RouteOptionsType).
+
+        Returns:
+            FunctionType: Route handler function.
+        """
+
+        def internal(handler: FunctionType) -> FunctionType:
+            self.add_route(
+                "HEAD", path, handler, route_hooks, route_middlewares, **route_options
+            )
+            return handler
+
+        return internal
+
+    def websocket(
+        self,
+        path: str,
+        route_hooks: RouteHookType = {},
+        route_middlewares: RouteMiddlewareType = [],
+    ) -> FunctionType:
+        """
+        Decorator to add a WebSocket route to the application.
+
         Args:
             path (str): Path of the route.
             route_hooks (RouteHookType, optional): Route hooks. Defaults to {}.
@@ -644,7 +1324,7 @@ class Fastipy(RequestHandler, DecoratorsBase):
         """
 
         def internal(handler: FunctionType) -> FunctionType:
-            self.add_route("HEAD", path, handler, route_hooks, route_middlewares)
+            self.add_websocket_route(path, handler, route_hooks, route_middlewares)
             return handler
 
         return internal
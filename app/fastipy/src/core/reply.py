@@ -1,11 +1,11 @@
 import json
 import os, io
 from typing import (
-    AsyncGenerator,
+    Any,
+    AsyncIterator,
     Callable,
     Coroutine,
     Dict,
-    Generator,
     Iterator,
     List,
     Self,
@@ -18,31 +18,65 @@ from time import perf_counter
 from uvicorn.main import logger
 
 from ..types.routes import FunctionType
+from ..types.fastipy import FastipyOptions
 
 from ..exceptions import FileException, ReplyException
 
-from ..classes.decorators_base import DecoratorsBase
+from ..classes.decorators_base import AppAttributes
+from ..classes.template_render import render_template, stream_template
+from ..classes.page_cache import page_cache
+from ..classes.metrics import PhaseTimer
+from ..classes.chunk_stream import ChunkStream
+from ..classes.sse import HEARTBEAT, EventChannel, encode_event, encode_events
 
 from ..helpers.route_helpers import handler_hooks, serializer_handler
 from ..helpers.content_type import get_content_type
+from ..helpers.etag import etag_matches, generate_weak_etag
 
 from .request import Request
 
 
-class Reply(DecoratorsBase):
+class Reply(AppAttributes):
     """
     Represents the HTTP response object for handling responses in a Fastipy application.
+
+    Reply decorators are class attributes of a subclass generated per scope (see
+    `decorated_class`), and attributes set by hooks are stored in the instance __dict__,
+    only created when used. An attribute set as "app_<name>" is also read as `<name>`.
     """
 
+    __slots__ = (
+        "__send",
+        "__request",
+        "__on_response_hooks",
+        "_cors",
+        "_static_path",
+        "_headers",
+        "_status_code",
+        "_content",
+        "_cookies",
+        "_response_time",
+        "_headers_sent",
+        "_response_sent",
+        "_serializers",
+        "_app_options",
+        "_timer",
+        "_stream",
+        "_etag_max_size",
+        "__dict__",
+    )
+
     def __init__(
         self,
         send: Coroutine,
         request: Request = None,
         cors: Dict = {},
         static_path: Union[str, None] = None,
-        decorators: Dict[str, List[FunctionType]] = {},
         hooks: Dict[str, List[FunctionType]] = {},
         serializers: List[Dict[str, Callable[[any], Union[bool, any]]]] = [],
+        options: FastipyOptions = {},
+        timer: Optional[PhaseTimer] = None,
+        etag_max_size: Optional[int] = None,
     ) -> None:
         """
         Initialize the Reply object.
@@ -52,9 +86,11 @@ class Reply(DecoratorsBase):
             request (Request, Optional): The Request object. Defaults to None.
             cors (Dict, Optional): The CORS headers. Defaults to {}.
             static_path (Union[str, None], Optional): The static path for the application. Defaults to None.
-            decorators (Dict[str, List[FunctionType]], Optional): The decorators for the application. Defaults to {}.
             hooks (Dict[str, List[FunctionType]], Optional): The hooks for the application. Defaults to {}.
             serializers (List[Dict[str, Callable[[any], Union[bool, any]]]], Optional): The serializers for the application. Defaults to [].
+            options (FastipyOptions, Optional): The options of the application. Defaults to {}.
+            timer (Optional[PhaseTimer], Optional): The timer measuring the request phases, when metrics are enabled. Defaults to None.
+            etag_max_size (Optional[int], Optional): Maximum size of the responses sent with an ETag, None to send them without. Defaults to None.
         """
         self.__send = send
         self.__request = request
@@ -65,12 +101,15 @@ class Reply(DecoratorsBase):
         self._headers = {}
         self._status_code = 200
         self._content = None
-        self._cookies = SimpleCookie()
+        self._cookies = None
         self._response_time = perf_counter()
+        self._headers_sent = False
         self._response_sent = False
         self._serializers = reversed(serializers)
-
-        self._instance_decorators = decorators.get("reply", [])
+        self._app_options = options
+        self._timer = timer
+        self._stream = None
+        self._etag_max_size = etag_max_size
 
     @property
     def status_code(self) -> int:
@@ -136,8 +175,21 @@ class Reply(DecoratorsBase):
         Returns:
             SimpleCookie: The cookies set in the response.
         """
+        # Created on first use, most replies don't set cookies
+        if self._cookies is None:
+            self._cookies = SimpleCookie()
         return self._cookies
 
+    @property
+    def timer(self) -> Optional[PhaseTimer]:
+        """
+        Get the timer measuring the request phases.
+
+        Returns:
+            Optional[PhaseTimer]: The timer, or None if metrics are disabled.
+        """
+        return self._timer
+
     @property
     def headers(self) -> Dict[str, str]:
         """
@@ -225,15 +277,16 @@ class Reply(DecoratorsBase):
             secure (bool, optional): Whether the cookie is secure. Defaults to False.
             http_only (bool, optional): Whether the cookie is HTTP only. Defaults to False.
         """
-        self._cookies[name] = value
-        self._cookies[name]["path"] = path
-        self._cookies[name]["secure"] = secure
-        self._cookies[name]["httpOnly"] = http_only
+        cookies = self.cookies
+        cookies[name] = value
+        cookies[name]["path"] = path
+        cookies[name]["secure"] = secure
+        cookies[name]["httpOnly"] = http_only
 
         if expires is not None:
-            self._cookies[name]["expires"] = expires
+            cookies[name]["expires"] = expires
         if domain is not None:
-            self._cookies[name]["domain"] = domain
+            cookies[name]["domain"] = domain
         return self
 
     def get_response_time(self) -> float:
@@ -249,6 +302,7 @@ class Reply(DecoratorsBase):
         """
         Send the response with optional content.
         This function will serialize the value and define the content type if not set.
+        Without a value, the content set previously (e.g. by render_page) is sent.
 
         Args:
             value (any, optional): The content to send in the response.
@@ -256,20 +310,67 @@ class Reply(DecoratorsBase):
         if self._response_sent:
             raise ReplyException("Reply already sent", logger.error)
 
-        content_type, serialized_value = serializer_handler(self._serializers, value)
+        self._lap("handler")
+
+        if value is None and self._content is not None:
+            content_type, serialized_value = None, self._content
+        else:
+            content_type, serialized_value = serializer_handler(
+                self._serializers, value
+            )
+
         if not self.content_type and content_type:
             self.content_type = content_type
 
-        if isinstance(serialized_value, (Generator, AsyncGenerator)):
-            return await self.__stream(serialized_value)
+        if isinstance(serialized_value, (Iterator, AsyncIterator)):
+            self._lap("serialization")
+            return await self.stream(serialized_value)
 
         self._content = serialized_value
 
+        if (
+            self._etag_max_size is not None
+            and serialized_value
+            and self._status_code == 200
+            and self.__set_etag()
+        ):
+            # The client already has the current version of the response
+            self._status_code = 304
+            serialized_value = None
+
+        # Hashing the content for the ETag is part of the serialization
+        self._lap("serialization")
+
         await self._send_headers()
         await self._send_body(send_blank=False if serialized_value else True)
 
         await self.__on_response_sent()
 
+    def __set_etag(self) -> bool:
+        """
+        Set a weak ETag computed from the encoded content, unless the response already has
+        one or is too large.
+
+        Returns:
+            bool: True if the ETag matches the If-None-Match header of a GET or HEAD request.
+        """
+        if "ETag" in self._headers:
+            return False
+
+        content = self._content
+        if isinstance(content, str):
+            content = self._content = content.encode("utf-8")
+        if not isinstance(content, bytes) or len(content) > self._etag_max_size:
+            return False
+
+        etag = self._headers["ETag"] = generate_weak_etag(content)
+        request = self.__request
+        return (
+            request is not None
+            and request.method in ("GET", "HEAD")
+            and etag_matches(request.headers.get("if-none-match"), etag)
+        )
+
     async def send_code(self, code: int) -> None:
         """
         Send the response with the specified status code.
@@ -296,7 +397,7 @@ class Reply(DecoratorsBase):
 
         headers = [
             [b"Set-Cookie", cookie.OutputString().decode("utf-8")]
-            for cookie in self._cookies.values()
+            for cookie in self.cookies.values()
         ]
 
         await self._send_headers(headers)
@@ -373,40 +474,156 @@ class Reply(DecoratorsBase):
 
         await self.__on_response_sent()
 
-    async def __stream(self, stream: Iterator[str]) -> None:
+    async def stream(
+        self,
+        source: Union[Iterator[Union[str, bytes]], AsyncIterator[Union[str, bytes]]],
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        """
+        Stream the chunks of a generator as the response.
+        Small chunks are coalesced into larger body messages, and sync generators are iterated
+        in a worker thread so they don't block the event loop. Call flush() from the generator
+        to send the buffered chunks immediately.
+
+        Args:
+            source (Union[Iterator[Union[str, bytes]], AsyncIterator[Union[str, bytes]]]): The generator, yielding str or bytes.
+            buffer_size (Optional[int], optional): Bytes buffered before sending them, 0 sends every chunk as soon as possible. Defaults to the "stream_buffer_size" option (16384).
+            flush_interval (Optional[float], optional): Maximum seconds a chunk is buffered. Defaults to the "stream_flush_interval" option (0.05).
+        """
         if self._response_sent:
             raise ReplyException("Reply already sent", logger.error)
 
-        if not isinstance(stream, (AsyncGenerator, Generator)):
+        if not isinstance(source, (Iterator, AsyncIterator)):
             raise ReplyException(
                 "Stream must be an async generator or generator", logger.error
             )
 
-        headers = self._parse_headers()
-        await self._send_headers(headers=headers)
+        await self.__stream(
+            source,
+            (
+                buffer_size
+                if buffer_size is not None
+                else self._app_options.get("stream_buffer_size", 16384)
+            ),
+            (
+                flush_interval
+                if flush_interval is not None
+                else self._app_options.get("stream_flush_interval", 0.05)
+            ),
+        )
 
-        if isinstance(stream, AsyncGenerator):
-            while True:
-                try:
-                    chunk = await anext(stream)
-                except StopAsyncIteration:
-                    break
+    async def sse(
+        self,
+        source: Union[EventChannel, Iterator[Any], AsyncIterator[Any]],
+        heartbeat: Optional[float] = 15.0,
+        retry: Optional[int] = None,
+    ) -> None:
+        """
+        Send Server-Sent Events, each one as soon as it is yielded or published.
 
-                self._content = chunk
-                await self._send_body(more_body=True)
-        else:
+        The source is an EventChannel, subscribed to from the Last-Event-ID header of the
+        request so a reconnecting client receives the events it missed, or a generator
+        yielding ServerSentEvent objects, or the data of each event.
+
+        Args:
+            source (Union[EventChannel, Iterator[Any], AsyncIterator[Any]]): The events.
+            heartbeat (Optional[float], optional): Seconds without events before a comment is sent to keep the connection open, None to disable. Defaults to 15.0.
+            retry (Optional[int], optional): The client reconnection time in milliseconds. Defaults to None.
+        """
+        if self._response_sent:
+            raise ReplyException("Reply already sent", logger.error)
+
+        if not isinstance(source, (EventChannel, Iterator, AsyncIterator)):
+            raise ReplyException(
+                "SSE source must be an EventChannel, an async generator or generator",
+                logger.error,
+            )
+
+        self._headers["Content-Type"] = "text/event-stream"
+        self._headers["Cache-Control"] = "no-cache"
+        # Proxies like nginx would buffer the events otherwise
+        self._headers["X-Accel-Buffering"] = "no"
+        preamble = encode_event(retry=retry) if retry is not None else None
+
+        if not isinstance(source, EventChannel):
+            return await self.__stream(
+                encode_events(source), 0, None, heartbeat=heartbeat, preamble=preamble
+            )
+
+        subscription = source.subscribe(
+            self.__request.headers.get("last-event-id")
+            if self.__request is not None
+            else None
+        )
+        try:
+            await self.__start_stream(preamble)
+
+            # The events are already encoded, the ones queued meanwhile are sent at once
             while True:
-                try:
-                    chunk = next(stream)
-                except StopIteration:
+                events = await subscription.next_events(heartbeat)
+                if events is None:
                     break
+                await self.__write_chunk(b"".join(events) if events else HEARTBEAT)
+        finally:
+            await subscription.aclose()
+
+        await self.__end_stream()
+
+    async def __stream(
+        self,
+        source: Union[Iterator[Union[str, bytes]], AsyncIterator[Union[str, bytes]]],
+        buffer_size: int,
+        flush_interval: Optional[float],
+        heartbeat: Optional[float] = None,
+        preamble: Optional[bytes] = None,
+    ) -> None:
+        await self.__start_stream(preamble)
+
+        self._stream = ChunkStream(
+            source,
+            self.__write_chunk,
+            buffer_size,
+            flush_interval,
+            heartbeat=heartbeat,
+            heartbeat_chunk=HEARTBEAT,
+        )
+        try:
+            await self._stream.run()
+        finally:
+            self._stream = None
+
+        await self.__end_stream()
+
+    async def __start_stream(self, preamble: Optional[bytes] = None) -> None:
+        headers = self._parse_headers()
+        await self._send_headers(headers=headers)
 
-                self._content = chunk
-                await self._send_body(more_body=True)
+        # Streams are long, the request is cancelled as soon as the client disconnects
+        if self.__request is not None and self.__request._disconnect.armed:
+            self.__request._disconnect.watch()
 
+        if preamble is not None:
+            await self.__write_chunk(preamble)
+
+    async def __end_stream(self) -> None:
         await self._send_body(send_blank=True)
         await self.__on_response_sent()
 
+    def flush(self) -> None:
+        """
+        Send the chunks buffered by the current stream as soon as possible.
+        Safe to call from a sync generator running in the stream worker thread.
+        """
+        stream = self._stream
+        if stream is not None:
+            stream.flush()
+
+    async def __write_chunk(self, chunk: bytes) -> None:
+        await self.__send(
+            {"type": "http.response.body", "body": chunk, "more_body": True}
+        )
+
     async def redirect(
         self,
         location: str,
@@ -440,6 +657,12 @@ class Reply(DecoratorsBase):
     def render_page(self, path: str) -> Self:
         """
         Render an HTML page as the response content.
+        Pages are cached in memory already encoded and reloaded when the file changes,
+        unless the application runs in debug mode. If the client already has the current
+        version of the page on a GET or HEAD request, the response becomes a 304 Not Modified.
+
+        Example:
+            await reply.render_page("index.html").send()
 
         Args:
             path (str): The path to the HTML page file. If a static path is set, the path will be relative to the static path.
@@ -453,16 +676,70 @@ class Reply(DecoratorsBase):
             path = f"{self._static_path}/{path}"
 
         try:
-            with io.open(f"{path}", "r") as file:
-                self._content = file.read()
-            self._headers["Content-Type"] = "text/html"
+            page = page_cache.get(
+                path, use_cache=not self._app_options.get("debug", False)
+            )
         except FileNotFoundError:
             raise FileException(
                 f"Failed to render page '{path}' >> File not found", logger.error
             )
 
+        self._headers["Content-Type"] = "text/html"
+        self._headers["ETag"] = page.etag
+
+        request = self.__request
+        if (
+            request is not None
+            and request.method in ("GET", "HEAD")
+            and etag_matches(request.headers.get("if-none-match"), page.etag)
+        ):
+            self._status_code = 304
+            self._content = b""
+        else:
+            self._headers["Content-Length"] = str(page.length)
+            self._content = page.content
+
         return self
 
+    async def render(
+        self,
+        template_name: str,
+        context: Optional[Dict[str, any]] = {},
+        stream: bool = False,
+        **kwargs,
+    ) -> None:
+        """
+        Render a Jinja2 template and send it as the response.
+        The template environment is shared between requests, so templates are only compiled once.
+
+        Args:
+            template_name (str): Name of the template file, relative to the application template directory.
+            context (Optional[Dict[str, any]], optional): Context data for template rendering. Defaults to {}.
+            stream (bool, optional): Whether to render asynchronously and stream the page chunk by chunk. Defaults to False.
+            **kwargs: Additional keyword arguments to pass to render_template.
+        """
+        if self._response_sent:
+            raise ReplyException("Reply already sent", logger.error)
+
+        kwargs.setdefault("template_dir", self._app_options.get("template_dir", None))
+        kwargs.setdefault("debug", self._app_options.get("debug", False))
+
+        if not self.content_type:
+            self.content_type = "text/html"
+
+        self._lap("handler")
+
+        if stream:
+            return await self.stream(stream_template(template_name, context, **kwargs))
+
+        self._content = render_template(template_name, context, **kwargs)
+        self._lap("serialization")
+
+        await self._send_headers()
+        await self._send_body()
+
+        await self.__on_response_sent()
+
     async def _options(self, allowed_methods: List[str]) -> None:
         """
         Handle an OPTIONS request.
@@ -496,6 +773,9 @@ class Reply(DecoratorsBase):
         Args:
             headers (List[bytes], optional): Additional headers to send in the response.
         """
+        self._lap("handler")
+
+        self._headers_sent = True
         await self.__send(
             {
                 "type": "http.response.start",
@@ -546,7 +826,7 @@ class Reply(DecoratorsBase):
         ]
         for header, value in self._cors.items():
             headers.append((header.encode("utf-8"), value.encode("utf-8")))
-        for cookie in self._cookies.values():
+        for cookie in self._cookies.values() if self._cookies else ():
             headers.append((b"Set-Cookie", cookie.OutputString().encode("utf-8")))
 
         return headers
@@ -583,18 +863,27 @@ class Reply(DecoratorsBase):
         Set the response_sent flag to True and call the onResponse hooks.
         """
         self._response_sent = True
+        if self.__request is not None:
+            self.__request._disconnect.stop()
+        self._lap("send")
+
         await handler_hooks(
             self.__on_response_hooks,
             self.__request,
             RestrictReply(self),
             check_response_sent=False,
         )
+        self._lap("onResponse")
 
-    def __getattr__(self, name) -> any:
-        return super().__getattr__(name)
+    def _lap(self, phase: str) -> None:
+        """
+        End a request phase in the metrics timer, if metrics are enabled.
 
-    def __setattr__(self, name, value) -> None:
-        return super().__setattr__(name, value)
+        Args:
+            phase (str): The phase that just ended.
+        """
+        if self._timer is not None:
+            self._timer.lap(phase)
 
 
 class RestrictReply:
@@ -820,6 +1109,42 @@ class RestrictReply:
             ReplyException('Function "redirect" is not allowed in this context')
         )
 
+    async def stream(
+        self,
+        source: Union[Iterator[Union[str, bytes]], AsyncIterator[Union[str, bytes]]],
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        """
+        Stream the chunks of a generator as the response.
+
+        Args:
+            source (Union[Iterator[Union[str, bytes]], AsyncIterator[Union[str, bytes]]]): The generator, yielding str or bytes.
+            buffer_size (Optional[int], optional): Bytes buffered before sending them. Defaults to the "stream_buffer_size" option.
+            flush_interval (Optional[float], optional): Maximum seconds a chunk is buffered. Defaults to the "stream_flush_interval" option.
+        """
+        self._reply._log.warn(
+            ReplyException('Function "stream" is not allowed in this context')
+        )
+
+    async def sse(
+        self,
+        source: Union[EventChannel, Iterator[Any], AsyncIterator[Any]],
+        heartbeat: Optional[float] = 15.0,
+        retry: Optional[int] = None,
+    ) -> None:
+        """
+        Send Server-Sent Events.
+
+        Args:
+            source (Union[EventChannel, Iterator[Any], AsyncIterator[Any]]): The events.
+            heartbeat (Optional[float], optional): Seconds without events before a comment is sent. Defaults to 15.0.
+            retry (Optional[int], optional): The client reconnection time in milliseconds. Defaults to None.
+        """
+        self._reply._log.warn(
+            ReplyException('Function "sse" is not allowed in this context')
+        )
+
     def render_page(self, path: str) -> Self:
         """
         Render an HTML page as the response content.
@@ -831,6 +1156,26 @@ class RestrictReply:
             ReplyException('Function "render_page" is not allowed in this context')
         )
 
+    async def render(
+        self,
+        template_name: str,
+        context: Optional[Dict[str, any]] = {},
+        stream: bool = False,
+        **kwargs,
+    ) -> None:
+        """
+        Render a Jinja2 template and send it as the response.
+
+        Args:
+            template_name (str): Name of the template file, relative to the application template directory.
+            context (Optional[Dict[str, any]], optional): Context data for template rendering. Defaults to {}.
+            stream (bool, optional): Whether to render asynchronously and stream the page chunk by chunk. Defaults to False.
+            **kwargs: Additional keyword arguments to pass to render_template.
+        """
+        self._reply._log.warn(
+            ReplyException('Function "render" is not allowed in this context')
+        )
+
     def __getattr__(self, name) -> any:
         return super().__getattr__(name)
 
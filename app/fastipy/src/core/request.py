@@ -1,42 +1,49 @@
-from typing import Union, Dict, Tuple, List
+from typing import Union, Dict, Tuple, Optional
 from http.cookies import SimpleCookie
 from urllib.parse import parse_qsl
 
-from ..types.routes import FunctionType
-
-from ..classes.decorators_base import DecoratorsBase
+from ..classes.decorators_base import AppAttributes
+from ..classes.metrics import PhaseTimer
+from ..classes.disconnect import DisconnectWatcher
 
 from ..models.body import Body
 from ..models.form import Form
 
 
-class Request(DecoratorsBase):
+class Request(AppAttributes):
     """
     Represents the HTTP request object for handling incoming requests in a Fastipy application.
+
+    Request decorators are class attributes of a subclass generated per scope (see
+    `decorated_class`), and attributes set by hooks are stored in the instance __dict__,
+    only created when used. An attribute set as "app_<name>" is also read as `<name>`.
     """
 
-    def __init__(
-        self,
-        scope,
-        receive,
-        decorators: Dict[str, List[FunctionType]] = {},
-    ) -> None:
+    __slots__ = (
+        "__scope",
+        "_body",
+        "_query_params",
+        "_cookies",
+        "_disconnect",
+        "__dict__",
+    )
+
+    def __init__(self, scope, receive) -> None:
         """
         Initialize the Request object.
 
         Args:
             scope: The ASGI scope of the request.
             receive: The coroutine function to receive messages from the client.
-            decorators (Dict[str, List[FunctionType]], optional): The decorators for the request. Defaults to {}.
         """
         self.__scope = scope
-        self.__receive = receive
-        self._instance_decorators = decorators.get("request", [])
         self._body = None
 
+        self._cookies = None
+        self._disconnect = DisconnectWatcher(receive)
+
         self.__headers()
         self.__query_params()
-        self._cookies = SimpleCookie(self.__scope["headers"].get("cookie", None))
 
     @property
     def type(self) -> str:
@@ -155,8 +162,27 @@ class Request(DecoratorsBase):
         """
         Returns the cookies sent with the request.
         """
+        # Parsed on first use, most handlers don't read cookies
+        if self._cookies is None:
+            self._cookies = SimpleCookie(self.__scope["headers"].get("cookie", None))
         return self._cookies
 
+    async def is_disconnected(self) -> bool:
+        """
+        Check if the client disconnected. Long running handlers can poll it to stop early.
+
+        Returns:
+            bool: True if the client disconnected.
+        """
+        return await self._disconnect.is_disconnected()
+
+    async def wait_for_disconnect(self) -> None:
+        """
+        Wait until the client disconnects, or until the response is sent.
+        Can be raced against other work, like a cancellation token.
+        """
+        await self._disconnect.wait()
+
     def __query_params(self) -> None:
         """
         Parses the query parameters from the request URL.
@@ -177,16 +203,13 @@ class Request(DecoratorsBase):
             self.__scope["headers"],
         )
 
-    async def _load_body(self) -> None:
+    async def _load_body(self, timer: Optional[PhaseTimer] = None) -> None:
         """
         Loads the request body.
+
+        Args:
+            timer (Optional[PhaseTimer], optional): The timer measuring the request phases. Defaults to None.
         """
         if self._body is None:
-            self._body = Body(self.__scope, self.__receive)
-            await self._body.load()
-
-    def __getattr__(self, name) -> any:
-        return super().__getattr__(name)
-
-    def __setattr__(self, name, value) -> None:
-        return super().__setattr__(name, value)
+            self._body = Body(self.__scope, self._disconnect.receive)
+            await self._body.load(timer)
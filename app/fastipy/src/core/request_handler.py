@@ -1,13 +1,24 @@
-import traceback
-from typing import Coroutine, Dict
+import asyncio, traceback
+from typing import Coroutine, Dict, Optional, Tuple
+from uvicorn.main import logger
 
-from ..exceptions import ExceptionHandler, FastipyException
+from ..exceptions import (
+    ExceptionHandler,
+    FastipyException,
+    RequestTimeoutException,
+    WebSocketDisconnectException,
+)
 
 from ..helpers.route_helpers import handler_hooks, handler_middlewares
-from ..helpers.async_sync_helpers import run_async_or_sync
+from ..helpers.async_sync_helpers import run_async_or_in_thread, run_async_or_sync
+
+from ..classes.concurrency_limiter import ConcurrencyLimiter
+from ..classes.metrics import PhaseTimer
+from ..classes.response_cache import RequestCoalescer
 
 from .request import Request
 from .reply import Reply, RestrictReply
+from .websocket import WebSocket
 
 
 class RequestHandler:
@@ -25,6 +36,9 @@ class RequestHandler:
             send (Coroutine): The coroutine to send messages to the client.
         """
         if scope["type"] == "http":
+            if self._pending_plugins:
+                await self.ready()
+
             cors = self._cors.generate_headers() if self._cors else {}
 
             if scope["method"] in ["POST", "GET", "PUT", "PATCH", "DELETE", "HEAD"]:
@@ -44,6 +58,12 @@ class RequestHandler:
                 {"error": "Method not allowed"}
             ).send()
 
+        elif scope["type"] == "websocket":
+            if self._pending_plugins:
+                await self.ready()
+
+            await self._handle_websocket(scope, receive, send)
+
         elif scope["type"] == "lifespan":
             await self._handle_lifespan(receive, send)
 
@@ -58,6 +78,17 @@ class RequestHandler:
         while True:
             message = await receive()
             if message["type"] == "lifespan.startup":
+                try:
+                    await self.ready()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+
+                logger.debug(
+                    f"{self._router.route_count} routes registered in "
+                    f"{self._router.registration_time * 1000:.1f} ms"
+                )
+
                 for startup_event in self._events["startup"]:
                     await run_async_or_sync(startup_event)
 
@@ -88,6 +119,13 @@ class RequestHandler:
             )
             return
 
+        if self._allocations is not None:
+            timer = self._allocations.probe()
+        elif self._metrics is not None:
+            timer = PhaseTimer()
+        else:
+            timer = None
+
         route, params = self._router.find_route(
             scope["method"], scope["path"], return_params=True
         )
@@ -95,23 +133,306 @@ class RequestHandler:
             await self._handle_route_not_found(send, cors)
             return
 
+        if timer is not None:
+            timer.lap("routing")
+
         scope["params"] = params
-        request = Request(scope, receive, self._decorators)
-        reply = Reply(
+        request_class, reply_class = route["scope"]._decorated_classes()
+        request = request_class(scope, receive)
+
+        for rate_limiter in route["rate_limiters"]:
+            wait = rate_limiter.hit(rate_limiter.key(request))
+            if wait:
+                status = await rate_limiter.reject(send, wait, cors)
+                if self._metrics is not None:
+                    self._metrics.record(
+                        request.method, route["raw_path"], status, timer
+                    )
+                return
+
+        # A cache also coalesces the requests missing it
+        shared = route["cache"] if route["cache"] is not None else route["coalesce"]
+        if shared is not None and shared.shares(request):
+            await self._handle_shared_request(
+                shared, route, request, send, cors, timer
+            )
+        else:
+            await self._handle_route_request(route, request, send, cors, timer)
+
+    async def _handle_shared_request(
+        self,
+        shared: RequestCoalescer,
+        route: dict,
+        request: Request,
+        send: Coroutine,
+        cors: Dict[str, str],
+        timer: Optional[PhaseTimer],
+    ) -> None:
+        """
+        Handles a request of a route with a response cache or request coalescing, served
+        with the cached response or the response of an identical request in flight when
+        possible, before any hook or middleware runs. Only called for requests carrying
+        no credentials the key ignores.
+
+        Args:
+            shared (RequestCoalescer): The response cache or request coalescer of the route.
+            route (dict): The route matched for the request.
+            request (Request): The Request object.
+            send (Coroutine): The coroutine to send messages to the client.
+            cors (Dict[str, str]): CORS headers for the response.
+            timer (Optional[PhaseTimer]): The timer measuring the request phases.
+        """
+        key = shared.key(request)
+
+        response, fill = await shared.lookup(key)
+        if response is not None:
+            status = await response.send(send, request.headers.get("if-none-match"))
+            if self._metrics is not None:
+                self._metrics.record(request.method, route["raw_path"], status, timer)
+            return
+
+        if not fill:
+            await self._handle_route_request(
+                route, request, shared.recorder(send), cors, timer
+            )
+            return
+
+        recorder = shared.recorder(send)
+        try:
+            await self._handle_route_request(route, request, recorder, cors, timer)
+        finally:
+            shared.complete(key, recorder.response())
+
+    async def _handle_route_request(
+        self,
+        route: dict,
+        request: Request,
+        send: Coroutine,
+        cors: Dict[str, str],
+        timer: Optional[PhaseTimer],
+    ) -> None:
+        """
+        Runs the lifecycle of a request of a route, watching for the client disconnecting,
+        once the concurrency limiters of the route admit it.
+
+        Args:
+            route (dict): The route matched for the request.
+            request (Request): The Request object.
+            send (Coroutine): The coroutine to send messages to the client.
+            cors (Dict[str, str]): CORS headers for the response.
+            timer (Optional[PhaseTimer]): The timer measuring the request phases.
+        """
+        limiters = route["limiters"]
+        if limiters and not await self._acquire_limiters(
+            limiters, route, request, send, cors, timer
+        ):
+            return
+
+        reply_class = route["scope"]._decorated_classes()[1]
+        reply = reply_class(
             send,
             request,
             cors,
             self._static_path,
-            self._decorators,
             route["hooks"],
             self._serializers,
+            self._options,
+            timer,
+            route["etag"],
         )
+        if timer is not None:
+            timer.lap("request")
+
+        disconnect = request._disconnect
+        if self._disconnects is not None:
+            self._disconnects.add(disconnect)
 
         try:
-            await self._handle_request_lifecycle(route, request, reply)
+            lifecycle = self._handle_request_lifecycle(route, request, reply)
+            if self._profiler is not None and self._profiler.should_profile(
+                request.method, route["raw_path"], request.headers
+            ):
+                lifecycle = self._profiler.profile(
+                    f"{request.method} {route['raw_path']}", lifecycle
+                )
+
+            if route["timeout"] is not None:
+                await self._run_with_timeout(lifecycle, route, request)
+            else:
+                await lifecycle
+
+        except asyncio.CancelledError:
+            # Cancelled by the disconnect watcher, anything else is a real cancellation
+            if not disconnect.disconnected:
+                raise
+            asyncio.current_task().uncancel()
 
         except Exception as e:
-            await self._handle_exception(route["hooks"], request, reply, e)
+            # The error response is sent even if the client disconnects meanwhile
+            disconnect.stop()
+            if not disconnect.disconnected:
+                await self._handle_exception(route, request, reply, e)
+
+        finally:
+            for limiter in limiters:
+                limiter.release()
+
+            disconnect.stop()
+            if self._disconnects is not None:
+                self._disconnects.discard(disconnect)
+            if disconnect.disconnected:
+                self._aborted_requests[0] += 1
+
+            if self._metrics is not None:
+                self._metrics.record(
+                    request.method,
+                    route["raw_path"],
+                    (
+                        reply.status_code
+                        if reply.is_sent
+                        else 499 if disconnect.disconnected else 500
+                    ),
+                    timer,
+                )
+            if self._allocations is not None:
+                self._allocations.finish(request.method, route["raw_path"], timer)
+
+    async def _run_with_timeout(
+        self, lifecycle: Coroutine, route: dict, request: Request
+    ) -> None:
+        """
+        Run the lifecycle of a request, cancelling it when it runs longer than the
+        timeout of the route.
+
+        Args:
+            lifecycle (Coroutine): The lifecycle of the request.
+            route (dict): The route matched for the request.
+            request (Request): The Request object.
+
+        Raises:
+            RequestTimeoutException: If the lifecycle timed out, answered with a 504.
+        """
+        timeout = asyncio.timeout(route["timeout"])
+        try:
+            async with timeout:
+                await lifecycle
+        except TimeoutError:
+            # A TimeoutError raised by the handler itself isn't a request timeout
+            if not timeout.expired():
+                raise
+            raise RequestTimeoutException(
+                f"Failed to handle request [{request.method}] '{route['raw_path']}' "
+                f">> Timed out after {route['timeout']} seconds",
+                logger.warning,
+            ) from None
+
+    async def _acquire_limiters(
+        self,
+        limiters: Tuple[ConcurrencyLimiter, ...],
+        route: dict,
+        request: Request,
+        send: Coroutine,
+        cors: Dict[str, str],
+        timer: Optional[PhaseTimer],
+    ) -> bool:
+        """
+        Take a slot of each concurrency limiter of a route, or shed the request with a
+        503 Service Unavailable response.
+
+        Args:
+            limiters (Tuple[ConcurrencyLimiter, ...]): The limiters of the route.
+            route (dict): The route matched for the request.
+            request (Request): The Request object.
+            send (Coroutine): The coroutine to send messages to the client.
+            cors (Dict[str, str]): CORS headers for the response.
+            timer (Optional[PhaseTimer]): The timer measuring the request phases.
+
+        Returns:
+            bool: True if the request was admitted.
+        """
+        acquired = 0
+        try:
+            for limiter in limiters:
+                if not (limiter.try_acquire() or await limiter.acquire()):
+                    break
+                acquired += 1
+        except BaseException:
+            for limiter in limiters[:acquired]:
+                limiter.release()
+            raise
+
+        if acquired == len(limiters):
+            return True
+
+        for limiter in limiters[:acquired]:
+            limiter.release()
+
+        status = await limiters[acquired].reject(send, cors)
+        if self._metrics is not None:
+            self._metrics.record(request.method, route["raw_path"], status, timer)
+        return False
+
+    async def _handle_websocket(
+        self, scope: dict, receive: Coroutine, send: Coroutine
+    ) -> None:
+        """
+        Handles incoming WebSocket connections, running the hooks and middlewares of the
+        route with the WebSocket in place of the Reply.
+
+        Args:
+            scope (dict): The ASGI scope of the connection.
+            receive (Coroutine): The coroutine to receive messages from the client.
+            send (Coroutine): The coroutine to send messages to the client.
+        """
+        route, params = self._router.find_route(
+            "WEBSOCKET", scope["path"], return_params=True
+        )
+        if route is None:
+            # Closing before accepting rejects the handshake with a 403
+            await send({"type": "websocket.close", "code": 1000})
+            return
+
+        scope["params"] = params
+        request_class, _ = route["scope"]._decorated_classes()
+        request = request_class(scope, receive)
+        websocket = WebSocket(
+            scope, receive, send, self._options.get("websocket_queue_size", 256)
+        )
+        route_hooks = route["hooks"]
+
+        try:
+            await handler_middlewares(route["middlewares"], request, websocket)
+
+            await handler_hooks(route_hooks["onRequest"], request, websocket)
+            if websocket.is_sent:
+                return
+            await handler_hooks(route_hooks["preHandler"], request, websocket)
+            if websocket.is_sent:
+                return
+
+            await run_async_or_sync(route["handler"], request, websocket)
+
+        except WebSocketDisconnectException:
+            pass
+
+        except Exception as e:
+            await handler_hooks(route_hooks["onError"], request, websocket, e)
+            if not websocket.is_sent:
+                await websocket.close(1011)
+
+            if isinstance(e, FastipyException):
+                logger.exception(e.message)
+            else:
+                raise
+
+        finally:
+            await websocket._finish()
+            await handler_hooks(
+                route_hooks["onResponse"],
+                request,
+                websocket,
+                check_response_sent=False,
+            )
 
     async def _handle_request_lifecycle(
         self, route: dict, request: Request, reply: Reply
@@ -126,29 +447,42 @@ class RequestHandler:
         """
         route_hooks = route["hooks"]
         route_middlewares = route["middlewares"]
+        timer = reply.timer
 
         await handler_middlewares(route_middlewares, request, RestrictReply(reply))
+        if timer is not None:
+            timer.lap("middlewares")
+
         await handler_hooks(route_hooks["onRequest"], request, reply)
         if reply.is_sent:
             return
+        if timer is not None:
+            timer.lap("onRequest")
+
+        await request._load_body(timer)
 
-        await request._load_body()
         await handler_hooks(route_hooks["preHandler"], request, reply)
         if reply.is_sent:
             return
+        if timer is not None:
+            timer.lap("preHandler")
 
-        await run_async_or_sync(route["handler"], request, reply)
+        if route["timeout"] is not None:
+            # A sync handler runs in a thread, so the timeout can interrupt the request
+            await run_async_or_in_thread(route["handler"], request, reply)
+        else:
+            await run_async_or_sync(route["handler"], request, reply)
         if not reply.is_sent:
             await reply.send_code(200)
 
     async def _handle_exception(
-        self, route_hooks: dict, request: Request, reply: Reply, exception: Exception
+        self, route: dict, request: Request, reply: Reply, exception: Exception
     ) -> None:
         """
         Handles exceptions that occur during request processing.
 
         Args:
-            route_hooks (dict): Hooks registered for the route.
+            route (dict): The route matched for the request.
             request (Request): The Request object.
             reply (Reply): The Reply object.
             exception (Exception): The exception that occurred.
@@ -156,17 +490,25 @@ class RequestHandler:
         try:
             exception_handler = ExceptionHandler(exception)
 
-            await handler_hooks(route_hooks["onError"], request, reply, exception)
+            await handler_hooks(route["hooks"]["onError"], request, reply, exception)
             if reply.is_sent:
                 return
-
-            if self._error_handler:
-                await run_async_or_sync(self._error_handler, exception, request, reply)
+            if reply._headers_sent:
+                # A stream failed after its headers were sent, the response can't be
+                # replaced by an error anymore, the server aborts the connection
+                raise exception
+
+            error_handler = route["scope"]._resolve_error_handler()
+            if error_handler:
+                await run_async_or_sync(error_handler, exception, request, reply)
                 if reply.is_sent:
                     return
 
             await self._default_error_handling(exception, reply, exception_handler)
         except Exception as exception:
+            if reply._headers_sent:
+                raise
+
             exception_handler = ExceptionHandler(exception)
 
             await self._default_error_handling(
@@ -189,7 +531,9 @@ class RequestHandler:
             exception_handler (ExceptionHandler): Exception handler object.
             internal (bool, optional): Indicates if the exception is internal. Defaults to False.
         """
-        if internal or issubclass(type(exception), FastipyException):
+        if isinstance(exception, RequestTimeoutException) and not internal:
+            await reply._send_error(message="Request timed out", code=504)
+        elif internal or issubclass(type(exception), FastipyException):
             await reply._send_error(
                 message=f"{exception_handler.type}: "
                 + exception_handler.message.replace('"', "'"),
@@ -0,0 +1,408 @@
+import asyncio, json
+from collections import deque
+from typing import Any, Coroutine, Deque, Dict, List, Optional, Set, Tuple, Union
+from uvicorn.main import logger
+
+from ..exceptions import WebSocketDisconnectException, WebSocketException
+
+CONNECTING, CONNECTED, CLOSED = "connecting", "connected", "closed"
+
+
+def websocket_message(data: Any) -> dict:
+    """
+    Build the ASGI message sending data, str as a text frame, bytes as a binary frame and
+    anything else as JSON in a text frame.
+
+    Args:
+        data (Any): The data to send.
+
+    Returns:
+        dict: The "websocket.send" ASGI message.
+    """
+    if isinstance(data, bytes):
+        return {"type": "websocket.send", "bytes": data}
+    if not isinstance(data, str):
+        data = json.dumps(data)
+    return {"type": "websocket.send", "text": data}
+
+
+class WebSocket:
+    """
+    Represents a WebSocket connection, passed to WebSocket route handlers and hooks in
+    place of the Reply.
+
+    Messages broadcast to the groups the connection joined wait in a bounded queue, sent
+    by a writer task, so a slow client never stalls a broadcast. When the queue is full
+    the connection is closed with code 1013 (try again later).
+    """
+
+    def __init__(
+        self,
+        scope: dict,
+        receive: Coroutine,
+        send: Coroutine,
+        queue_size: int = 256,
+        close_timeout: float = 1.0,
+    ) -> None:
+        """
+        Initialize the WebSocket object.
+
+        Args:
+            scope (dict): The ASGI scope of the connection.
+            receive (Coroutine): The coroutine function to receive messages from the client.
+            send (Coroutine): The coroutine function to send messages to the client.
+            queue_size (int, optional): Maximum number of broadcast messages waiting to be sent. Defaults to 256.
+            close_timeout (float, optional): Seconds the close frame of a connection too slow to keep up can take to be sent, before the writer is cancelled. Defaults to 1.0.
+        """
+        self.__scope = scope
+        self.__receive = receive
+        self.__send = send
+        self._close_timeout = close_timeout
+
+        self._loop = asyncio.get_running_loop()
+        self._state = CONNECTING
+        self._close_code: Optional[int] = None
+        self._queue: Deque[dict] = deque()
+        self._queue_size = queue_size
+        self._waiter: Optional[asyncio.Future] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._groups: Set["BroadcastGroup"] = set()
+
+    @property
+    def state(self) -> str:
+        """
+        Get the state of the connection: "connecting", "connected" or "closed".
+        """
+        return self._state
+
+    @property
+    def is_sent(self) -> bool:
+        """
+        Check if the connection is closed, hooks closing it stop the request lifecycle.
+        """
+        return self._state == CLOSED
+
+    @property
+    def close_code(self) -> Optional[int]:
+        """
+        Get the close code of the connection, once closed.
+        """
+        return self._close_code
+
+    @property
+    def subprotocols(self) -> List[str]:
+        """
+        Get the subprotocols requested by the client.
+        """
+        return self.__scope.get("subprotocols", [])
+
+    @property
+    def groups(self) -> Set["BroadcastGroup"]:
+        """
+        Get the broadcast groups the connection joined.
+        """
+        return self._groups
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: Dict[str, str] = {},
+    ) -> None:
+        """
+        Accept the connection.
+
+        Args:
+            subprotocol (Optional[str], optional): The subprotocol chosen from the ones requested. Defaults to None.
+            headers (Dict[str, str], optional): Additional headers of the handshake response. Defaults to {}.
+        """
+        if self._state != CONNECTING:
+            raise WebSocketException(
+                "Failed to accept WebSocket >> Connection already accepted or closed",
+                logger.error,
+            )
+
+        message = await self.__receive()
+        if message["type"] == "websocket.disconnect":
+            self._closed(message.get("code", 1000))
+            raise WebSocketDisconnectException(
+                "Failed to accept WebSocket >> Client disconnected",
+                message.get("code", 1000),
+                logger.debug,
+            )
+
+        await self.__send(
+            {
+                "type": "websocket.accept",
+                "subprotocol": subprotocol,
+                "headers": [
+                    (key.lower().encode("utf-8"), value.encode("utf-8"))
+                    for key, value in headers.items()
+                ],
+            }
+        )
+        self._state = CONNECTED
+
+    async def receive(self) -> Union[str, bytes]:
+        """
+        Receive a message.
+
+        Raises:
+            WebSocketDisconnectException: If the client closed the connection.
+
+        Returns:
+            Union[str, bytes]: The text or binary message.
+        """
+        if self._state == CONNECTING:
+            raise WebSocketException(
+                "Failed to receive >> WebSocket not accepted", logger.error
+            )
+        if self._state == CLOSED:
+            raise WebSocketDisconnectException(
+                "Failed to receive >> WebSocket closed", self._close_code, logger.debug
+            )
+
+        message = await self.__receive()
+        if message["type"] == "websocket.disconnect":
+            self._closed(message.get("code", 1000))
+            raise WebSocketDisconnectException(
+                "Failed to receive >> Client disconnected",
+                self._close_code,
+                logger.debug,
+            )
+
+        text = message.get("text")
+        return text if text is not None else message.get("bytes")
+
+    async def receive_json(self) -> Any:
+        """
+        Receive a JSON message.
+
+        Returns:
+            Any: The decoded message.
+        """
+        return json.loads(await self.receive())
+
+    def __aiter__(self) -> "WebSocket":
+        return self
+
+    async def __anext__(self) -> Union[str, bytes]:
+        try:
+            return await self.receive()
+        except WebSocketDisconnectException:
+            raise StopAsyncIteration
+
+    async def send(self, data: Any) -> None:
+        """
+        Send a message, str as a text frame, bytes as a binary frame and anything else as JSON.
+
+        Args:
+            data (Any): The data to send.
+        """
+        if self._state != CONNECTED:
+            raise WebSocketException(
+                "Failed to send >> WebSocket not accepted or closed", logger.error
+            )
+
+        await self.__send(websocket_message(data))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Close the connection. Before it is accepted, the handshake is rejected with a 403.
+
+        Args:
+            code (int, optional): The close code. Defaults to 1000.
+            reason (str, optional): The close reason. Defaults to "".
+        """
+        if self._state == CLOSED:
+            return
+
+        self._closed(code)
+        await self.__send({"type": "websocket.close", "code": code, "reason": reason})
+
+    def _offer(self, message: dict) -> bool:
+        """
+        Queue a broadcast message, without waiting.
+
+        Args:
+            message (dict): The "websocket.send" ASGI message, shared by every member.
+
+        Returns:
+            bool: False if the connection is closed or its queue was full.
+        """
+        if self._state != CONNECTED:
+            return False
+
+        if len(self._queue) >= self._queue_size:
+            # Too slow to keep up, the client can reconnect
+            self._queue.clear()
+            self._queue.append(
+                {"type": "websocket.close", "code": 1013, "reason": "Too slow"}
+            )
+            self._closed(1013)
+        else:
+            self._queue.append(message)
+
+        if self._writer is None:
+            self._writer = self._loop.create_task(self._write())
+        elif self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        return self._state == CONNECTED
+
+    async def _write(self) -> None:
+        """
+        Send the queued broadcast messages, in the writer task.
+        """
+        queue = self._queue
+        try:
+            while True:
+                while queue:
+                    await self.__send(queue.popleft())
+
+                if self._state == CLOSED:
+                    return
+
+                self._waiter = self._loop.create_future()
+                try:
+                    await self._waiter
+                finally:
+                    self._waiter = None
+        except Exception:
+            # The client is gone, the handler sees it on its next receive
+            queue.clear()
+            self._closed(1006)
+        finally:
+            self._writer = None
+
+    def _closed(self, code: int) -> None:
+        """
+        Mark the connection as closed and leave its groups.
+        """
+        if self._state == CLOSED:
+            return
+
+        self._state = CLOSED
+        self._close_code = code
+        for group in self._groups:
+            group._members.discard(self)
+        self._groups.clear()
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _finish(self) -> None:
+        """
+        Close the connection if the handler didn't, and stop the writer.
+        """
+        writer = self._writer
+        if writer is not None:
+            if self._state == CLOSED:
+                # The writer is sending the close frame of a connection too slow to keep
+                # up, a client not reading at all would block it forever
+                try:
+                    await asyncio.wait_for(writer, self._close_timeout)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                writer.cancel()
+        await self.close()
+
+
+class BroadcastGroup:
+    """
+    A group of WebSocket connections (a room) receiving the same messages.
+
+    A message is serialized into a single ASGI message shared by every member, and queued
+    to each member without waiting, so the broadcast costs the same whatever the speed of
+    the clients. Connections leave their groups when they close. Broadcasting from another
+    thread is safe, the messages are queued by the loop of each connection.
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        """
+        Initialize the BroadcastGroup object.
+
+        Args:
+            name (Optional[str], optional): Name of the group. Defaults to None.
+        """
+        self.name = name
+        self._members: Set[WebSocket] = set()
+        self._dropped = 0
+
+    @property
+    def members(self) -> Tuple[WebSocket, ...]:
+        """
+        Get the connections of the group.
+        """
+        return tuple(self._members)
+
+    @property
+    def dropped(self) -> int:
+        """
+        Get the number of connections closed because they were too slow to keep up.
+        """
+        return self._dropped
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return websocket in self._members
+
+    def join(self, websocket: WebSocket) -> None:
+        """
+        Add a connection to the group.
+
+        Args:
+            websocket (WebSocket): An accepted connection.
+        """
+        if websocket.state == CLOSED:
+            raise WebSocketException(
+                f"Failed to join group '{self.name}' >> WebSocket closed", logger.error
+            )
+
+        self._members.add(websocket)
+        websocket._groups.add(self)
+
+    def leave(self, websocket: WebSocket) -> None:
+        """
+        Remove a connection from the group.
+
+        Args:
+            websocket (WebSocket): The connection.
+        """
+        self._members.discard(websocket)
+        websocket._groups.discard(self)
+
+    def broadcast(self, data: Any, exclude: Optional[WebSocket] = None) -> int:
+        """
+        Send a message to every member, str as a text frame, bytes as a binary frame and
+        anything else as JSON. Returns without waiting for the messages to be sent.
+
+        Args:
+            data (Any): The data to send.
+            exclude (Optional[WebSocket], optional): A member not receiving the message, usually its sender. Defaults to None.
+
+        Returns:
+            int: Number of members the message was queued to.
+        """
+        message = websocket_message(data)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        queued = 0
+        for websocket in tuple(self._members):
+            if websocket is exclude:
+                continue
+
+            if websocket._loop is not loop:
+                # Broadcast from another thread, or a connection served by another loop
+                websocket._loop.call_soon_threadsafe(websocket._offer, message)
+                queued += 1
+            elif websocket._offer(message):
+                queued += 1
+            elif websocket.close_code == 1013:
+                self._dropped += 1
+
+        return queued
@@ -1,25 +1,39 @@
+from .client_disconnected_exception import ClientDisconnectedException
 from .decorator_already_exists_exception import DecoratorAlreadyExistsException
 from .duplicate_route_exception import DuplicateRouteException
 from .exception_handler import ExceptionHandler
 from .fastipy_exception import FastipyException
 from .file_exception import FileException
 from .invalid_path_exception import InvalidPathException
+from .invalid_route_option_exception import InvalidRouteOptionException
+from .mail_queue_full_exception import MailQueueFullException
 from .no_event_type import NoEventTypeException
 from .no_hook_type import NoHookTypeException
 from .no_http_method_exception import NoHTTPMethodException
 from .plugin_exception import PluginException
+from .profiler_exception import ProfilerException
 from .reply_exception import ReplyException
+from .request_timeout_exception import RequestTimeoutException
+from .websocket_disconnect_exception import WebSocketDisconnectException
+from .websocket_exception import WebSocketException
 
 __all__ = [
+    "ClientDisconnectedException",
     "DecoratorAlreadyExistsException",
     "DuplicateRouteException",
     "ExceptionHandler",
     "FastipyException",
     "FileException",
     "InvalidPathException",
+    "InvalidRouteOptionException",
+    "MailQueueFullException",
     "NoEventTypeException",
     "NoHookTypeException",
     "NoHTTPMethodException",
     "PluginException",
+    "ProfilerException",
     "ReplyException",
+    "RequestTimeoutException",
+    "WebSocketDisconnectException",
+    "WebSocketException",
 ]
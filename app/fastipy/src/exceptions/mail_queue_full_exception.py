@@ -0,0 +1,5 @@
+from .fastipy_exception import FastipyException
+
+
+class MailQueueFullException(FastipyException):
+    pass
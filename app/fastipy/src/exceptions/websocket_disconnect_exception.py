@@ -0,0 +1,21 @@
+from typing import Callable
+
+from .fastipy_exception import FastipyException
+
+
+class WebSocketDisconnectException(FastipyException):
+    """
+    Raised when receiving from a WebSocket closed by the client.
+    """
+
+    def __init__(self, message: str, code: int = 1000, logger: Callable = None):
+        """
+        Initialize the WebSocketDisconnectException.
+
+        Args:
+            message (str): The error message.
+            code (int, optional): The close code sent by the client. Defaults to 1000.
+            logger (Callable, optional): A logger function to log the error. Defaults to None.
+        """
+        super().__init__(message, logger)
+        self.code = code
@@ -1,46 +1,45 @@
 import asyncio
-from typing import Optional
+from typing import Any
 
 from ..types.routes import FunctionType
 
 
-def run_sync_or_async(
-    function: FunctionType, timeout: Optional[float] = None, *args, **kwargs
-) -> Optional[Exception]:
+async def run_async_or_sync(function: FunctionType, *args, **kwargs) -> Any:
     """
-    Run a function synchronously or asynchronously.
+    Run a function asynchronously or synchronously, inside the running event loop.
+
+    Synchronous functions are called directly and coroutine functions are awaited, so
+    no nested event loop is ever needed.
 
     Args:
         function (FunctionType): The function to be executed.
-        timeout (Optional[float], optional): Timeout duration for asynchronous functions. Defaults to None.
         *args: Variable length argument list.
         **kwargs: Arbitrary keyword arguments.
 
     Returns:
-        Exception or None: If an error occurs during execution, returns the exception; otherwise, returns None.
+        Any: The value returned by the function.
     """
     if asyncio.iscoroutinefunction(function):
-        loop = asyncio.get_event_loop()
-        try:
-            loop.run_until_complete(
-                asyncio.wait_for(function(*args, **kwargs), timeout=timeout)
-            )
-        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
-            return error
-    else:
-        function(*args, **kwargs)
-
-
-async def run_async_or_sync(function: FunctionType, *args, **kwargs) -> None:
+        return await function(*args, **kwargs)
+    return function(*args, **kwargs)
+
+
+async def run_async_or_in_thread(function: FunctionType, *args, **kwargs) -> Any:
     """
-    Run a function asynchronously or synchronously.
+    Run a function asynchronously, or synchronously in a worker thread.
+
+    Used when the caller can be cancelled (e.g. by a timeout): a synchronous function
+    called directly would block the event loop until it returns. Once cancelled, the
+    thread is abandoned, it runs to completion and its result is discarded.
 
     Args:
         function (FunctionType): The function to be executed.
         *args: Variable length argument list.
         **kwargs: Arbitrary keyword arguments.
+
+    Returns:
+        Any: The value returned by the function.
     """
     if asyncio.iscoroutinefunction(function):
-        await function(*args, **kwargs)
-    else:
-        function(*args, **kwargs)
+        return await function(*args, **kwargs)
+    return await asyncio.to_thread(function, *args, **kwargs)
@@ -0,0 +1,59 @@
+import hashlib, zlib
+from typing import Optional
+
+# Larger responses are sent without an ETag, see the "etag" option
+ETAG_MAX_SIZE = 4 * 1024 * 1024
+
+
+def generate_etag(content: bytes, weak: bool = False) -> str:
+    """
+    Generate an entity tag for the given content.
+
+    Args:
+        content (bytes): The encoded content.
+        weak (bool, optional): Whether to generate a weak validator. Defaults to False.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    return f"W/{etag}" if weak else etag
+
+
+def generate_weak_etag(content: bytes) -> str:
+    """
+    Generate a weak entity tag for a dynamic response, from the length and the CRC-32 of
+    the content, several times faster to compute than a cryptographic hash.
+
+    Args:
+        content (bytes): The encoded content.
+
+    Returns:
+        str: The weak entity tag.
+    """
+    return f'W/"{len(content):x}-{zlib.crc32(content):08x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check if an If-None-Match header matches an entity tag, using weak comparison.
+
+    Args:
+        if_none_match (Optional[str]): The If-None-Match header value.
+        etag (str): The entity tag of the current representation.
+
+    Returns:
+        bool: True if the client representation is still valid, False otherwise.
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == etag:
+            return True
+
+    return False
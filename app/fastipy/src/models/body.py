@@ -1,5 +1,9 @@
-from typing import Union
+from typing import Optional, Union
 import json
+from uvicorn.main import logger
+
+from ..classes.metrics import PhaseTimer
+from ..exceptions import ClientDisconnectedException
 
 from .form import Form
 
@@ -86,16 +90,24 @@ class Body:
         """
         return self._form
 
-    async def load(self):
+    async def load(self, timer: Optional[PhaseTimer] = None):
         """
         Load the body content.
-        """
-        content = await self.__receive()
-        self._raw_content = content["body"]
 
-        while content.get("more_body"):
+        Args:
+            timer (Optional[PhaseTimer], optional): The timer measuring the request phases, ending the "body" and "form" phases. Defaults to None.
+        """
+        self._raw_content = b""
+        while True:
             content = await self.__receive()
-            self._raw_content += content["body"]
+            if content["type"] == "http.disconnect":
+                raise ClientDisconnectedException(
+                    "Failed to load body >> Client disconnected", logger.debug
+                )
+
+            self._raw_content += content.get("body", b"")
+            if not content.get("more_body"):
+                break
 
         try:
             self._content = self._raw_content.decode()
@@ -103,8 +115,12 @@ class Body:
             pass
 
         self.__json()
+        if timer is not None:
+            timer.lap("body")
 
         self._form = Form(self)
+        if timer is not None:
+            timer.lap("form")
 
     def __json(self) -> None:
         """
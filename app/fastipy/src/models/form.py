@@ -20,11 +20,12 @@ class Form:
         Args:
             body (Body): The Body object containing the form data.
         """
-        self._body = body
         self._fields = {}
         self._files = {}
 
-        self.__get_variables()
+        # The body isn't stored: it references the form, and a cycle would keep both
+        # alive until the garbage collector runs
+        self.__get_variables(body)
 
     @property
     def fields(self) -> Dict[str, str]:
@@ -46,15 +47,18 @@ class Form:
         """
         return self._files
 
-    def __get_variables(self) -> None:
+    def __get_variables(self, body: "Body") -> None:
         """
         Parse the form data and extract variables.
+
+        Args:
+            body (Body): The Body object containing the form data.
         """
-        if self._body.type is None:
+        if body.type is None:
             return
 
-        if "multipart/form-data" in self._body.type:
-            body_parts = self._body.raw_content.split(
+        if "multipart/form-data" in body.type:
+            body_parts = body.raw_content.split(
                 b'Content-Disposition: form-data; name="'
             )
             for i in range(1, len(body_parts)):
@@ -77,8 +81,8 @@ class Form:
                 else:
                     self._fields[name] = raw_content.decode()
 
-        elif "application/x-www-form-urlencoded" in self._body.type:
-            body_parts = self._body.raw_content.split(b"&")
+        elif "application/x-www-form-urlencoded" in body.type:
+            body_parts = body.raw_content.split(b"&")
             for i in body_parts:
                 name = i.split(b"=")[0].decode()
                 value = i.split(b"=")[1].decode()
@@ -1,4 +1,7 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from ..core.fastipy import FastipyInstance
 
 
 class PluginNode:
@@ -6,14 +9,24 @@ class PluginNode:
     Represents a node in a plugin tree, used to organize plugins into a hierarchical structure.
     """
 
-    def __init__(self, name: str = "") -> None:
+    def __init__(
+        self,
+        name: str = "",
+        scope: Optional["FastipyInstance"] = None,
+        encapsulated: bool = True,
+    ) -> None:
         """
         Initializes a PluginNode object with a name and an empty list of children.
 
         Args:
             name (str, optional): The name of the node. Defaults to "".
+            scope (Optional[FastipyInstance], optional): The instance the plugin was registered with, holding its hooks, middlewares and decorators. Defaults to None.
+            encapsulated (bool, optional): Whether the plugin has its own scope or shares its parent's. Defaults to True.
         """
         self.name = name
+        self.scope = scope
+        self.encapsulated = encapsulated
+        self.load_time: Optional[float] = None
         self.children: List["PluginNode"] = []
 
     def add_child(self, child: "PluginNode") -> None:
@@ -39,10 +52,16 @@ class PluginNode:
         for idx, child in enumerate(node.children):
             symbol = "└──" if idx == len(node.children) - 1 else "├──"
 
+            load_time = (
+                f" ({child.load_time * 1000:.1f} ms)"
+                if child.load_time is not None
+                else ""
+            )
+
             if not child.children:
-                print(f"{indent}{symbol} {child.name}")
+                print(f"{indent}{symbol} {child.name}{load_time}")
             else:
-                print(f"{indent}{symbol} {child.name}")
+                print(f"{indent}{symbol} {child.name}{load_time}")
                 self.print_tree(child, indent + ("    " if symbol == "└──" else "│   "))
 
 
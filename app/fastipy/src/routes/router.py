@@ -14,6 +14,7 @@ class RouteNode:
         """
         self.children: Dict[str, "RouteNode"] = {}
         self.handlers: Dict[str, any] = {}
+        self.param_child: Optional[str] = None
 
     def __print_functions(
         self,
@@ -95,6 +96,14 @@ class Router(RouteNode):
     Represents a router for managing routes and handlers.
     """
 
+    def __init__(self):
+        """
+        Initializes a Router object with an empty tree and registration counters.
+        """
+        super().__init__()
+        self.route_count = 0
+        self.registration_time = 0.0
+
     def add_route(
         self,
         method: Literal["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD"],
@@ -115,9 +124,12 @@ class Router(RouteNode):
         for part in parts:
             if part not in node.children:
                 node.children[part] = RouteNode()
+                if part.startswith(":") and node.param_child is None:
+                    node.param_child = part
             node = node.children[part]
 
         node.handlers[method] = route
+        self.route_count += 1
 
     def find_route(
         self,
@@ -142,19 +154,16 @@ class Router(RouteNode):
         params = {}
 
         for part in parts:
-            if part in node.children:
-                node = node.children[part]
+            child = node.children.get(part)
+            if child is not None:
+                node = child
+            elif node.param_child is not None:
+                params[node.param_child[1:]] = part
+                node = node.children[node.param_child]
             else:
-                children = next(
-                    (key for key in node.children.keys() if key.startswith(":")), None
-                )
-                if children:
-                    node = node.children[children]
-                    params[children[1:]] = part
-                else:
-                    if return_params:
-                        return None, None
-                    return None
+                if return_params:
+                    return None, None
+                return None
 
         if return_params:
             return node.handlers.get(method, None), params
@@ -174,15 +183,15 @@ class Router(RouteNode):
         node = self
 
         for part in parts:
-            if part in node.children:
-                node = node.children[part]
+            child = node.children.get(part)
+            if child is not None:
+                node = child
+            elif node.param_child is not None:
+                node = node.children[node.param_child]
             else:
-                children = next(
-                    (key for key in node.children.keys() if key.startswith(":")), None
-                )
-                if children:
-                    node = node.children[children]
-                else:
-                    return []
-
-        return list(node.handlers.keys()) + ["OPTIONS"]
+                return []
+
+        # WebSocket routes are registered as the "WEBSOCKET" method, which isn't an HTTP method
+        return [method for method in node.handlers if method != "WEBSOCKET"] + [
+            "OPTIONS"
+        ]
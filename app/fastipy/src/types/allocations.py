@@ -0,0 +1,11 @@
+import sys
+
+if sys.version_info < (3, 11):
+    from typing_extensions import TypedDict, NotRequired
+else:
+    from typing import TypedDict, NotRequired
+
+
+class AllocationTrackerOptions(TypedDict):
+    frames: NotRequired[int]
+    snapshot_every: NotRequired[int]
@@ -1,11 +1,28 @@
 import sys
-from typing import Optional
+from typing import Optional, Union
 
 if sys.version_info < (3, 11):
     from typing_extensions import TypedDict, NotRequired
 else:
     from typing import TypedDict, NotRequired
 
+from .allocations import AllocationTrackerOptions
+from .profiler import ProfilerOptions
+from .routes import ConcurrencyLimitOptions, EtagOptions, RateLimitOptions
+
 
 class FastipyOptions(TypedDict):
     plugin_timeout: NotRequired[Optional[float]]
+    debug: NotRequired[bool]
+    template_dir: NotRequired[Optional[str]]
+    metrics: NotRequired[bool]
+    profiler: NotRequired[ProfilerOptions]
+    allocations: NotRequired[Union[bool, AllocationTrackerOptions]]
+    stream_buffer_size: NotRequired[int]
+    stream_flush_interval: NotRequired[Optional[float]]
+    disconnect_watch_delay: NotRequired[Optional[float]]
+    websocket_queue_size: NotRequired[int]
+    etag: NotRequired[Union[bool, EtagOptions]]
+    concurrency: NotRequired[ConcurrencyLimitOptions]
+    request_timeout: NotRequired[Optional[float]]
+    rate_limit: NotRequired[RateLimitOptions]
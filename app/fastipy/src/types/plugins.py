@@ -1,4 +1,5 @@
 import sys
+from typing import List, Optional
 
 if sys.version_info < (3, 11):
     from typing_extensions import TypedDict, NotRequired
@@ -8,3 +9,6 @@ else:
 
 class PluginOptions(TypedDict):
     prefix: NotRequired[str]
+    encapsulate: NotRequired[bool]
+    dependencies: NotRequired[List[str]]
+    timeout: NotRequired[Optional[float]]
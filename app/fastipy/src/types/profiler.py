@@ -0,0 +1,18 @@
+import sys
+from typing import List, Literal, Optional
+
+if sys.version_info < (3, 11):
+    from typing_extensions import TypedDict, NotRequired
+else:
+    from typing import TypedDict, NotRequired
+
+profilerModeType = Literal["cprofile", "wall"]
+
+
+class ProfilerOptions(TypedDict):
+    sample_rate: NotRequired[float]
+    routes: NotRequired[List[str]]
+    header: NotRequired[Optional[str]]
+    mode: NotRequired[profilerModeType]
+    interval: NotRequired[float]
+    dump_dir: NotRequired[Optional[str]]
@@ -1,4 +1,4 @@
-from typing import Callable, Coroutine, Union
+from typing import Callable, Coroutine, Hashable, Optional, Union
 import sys
 
 if sys.version_info < (3, 11):
@@ -22,3 +22,46 @@ class PrintTreeOptionsType(TypedDict):
 
 
 RouteMiddlewareType = List[FunctionType]
+
+
+class ResponseCacheOptions(TypedDict):
+    ttl: NotRequired[float]
+    vary: NotRequired[List[str]]
+    key: NotRequired[Callable[..., Hashable]]
+    max_entries: NotRequired[int]
+    max_size: NotRequired[int]
+    statuses: NotRequired[List[int]]
+
+
+class RequestCoalescerOptions(TypedDict):
+    key: NotRequired[Callable[..., Hashable]]
+    max_size: NotRequired[int]
+
+
+class EtagOptions(TypedDict):
+    max_size: NotRequired[int]
+
+
+class ConcurrencyLimitOptions(TypedDict):
+    max_in_flight: int
+    max_queue: NotRequired[int]
+    queue_timeout: NotRequired[Optional[float]]
+    retry_after: NotRequired[int]
+
+
+class RateLimitOptions(TypedDict):
+    rate: float
+    burst: NotRequired[int]
+    key: NotRequired[Callable[..., Hashable]]
+    header: NotRequired[str]
+    max_keys: NotRequired[int]
+    sweep_interval: NotRequired[float]
+
+
+class RouteOptionsType(TypedDict):
+    cache: NotRequired[ResponseCacheOptions]
+    coalesce: NotRequired[Union[bool, RequestCoalescerOptions]]
+    etag: NotRequired[Union[bool, EtagOptions]]
+    concurrency: NotRequired[ConcurrencyLimitOptions]
+    timeout: NotRequired[Optional[float]]
+    rate_limit: NotRequired[RateLimitOptions]
@@ -0,0 +1,90 @@
+"""
+Compare two result files written by benchmarks/suite.py.
+
+Prints the change of every metric per scenario and exits with status 1 when a
+scenario regressed by more than the threshold, so it can gate a CI job.
+
+    python benchmarks/compare.py results/1.5.2.json results/1.5.3.json --threshold 10
+"""
+
+import argparse, json, sys
+
+# metric -> True when higher is better
+METRICS = {
+    "rps": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "alloc_peak_bytes": False,
+    "retained_bytes": False,
+}
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="regression threshold in percent (default: 10)",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="+",
+        choices=list(METRICS),
+        default=["rps", "p99_ms", "alloc_peak_bytes"],
+        help="metrics checked against the threshold",
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    for label, data in (("baseline", baseline), ("candidate", candidate)):
+        meta = data["meta"]
+        print(
+            f"{label:<10} fastipy {meta['fastipy']} ({meta.get('commit') or '-'})"
+            f"  {meta['mode']} / {meta['loop']}  python {meta['python']}"
+        )
+    if baseline["meta"]["mode"] != candidate["meta"]["mode"]:
+        print("warning: the results were measured in different modes")
+    print()
+
+    regressions = []
+    print(f"{'scenario':<12} {'metric':<17} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name, before in baseline["results"].items():
+        after = candidate["results"].get(name)
+        if after is None:
+            print(f"{name:<12} missing from the candidate")
+            continue
+
+        for metric, higher_is_better in METRICS.items():
+            if metric not in before or metric not in after:
+                continue
+
+            old, new = before[metric], after[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            regression = -change if higher_is_better else change
+
+            marker = ""
+            if metric in args.metrics and regression > args.threshold:
+                marker = "  REGRESSION"
+                regressions.append(f"{name} {metric}")
+
+            print(
+                f"{name:<12} {metric:<17} {old:>12.3f} {new:>12.3f}"
+                f" {change:>+8.1f}%{marker}"
+            )
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold}%: "
+              + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
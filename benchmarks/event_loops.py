@@ -0,0 +1,186 @@
+"""
+Event loop benchmark.
+
+Serves the same application on the default asyncio loop, on an asyncio loop patched
+by nest_asyncio (what Fastipy used to do on import) and on uvloop, and reports the
+requests per second of each one. Every loop runs in its own process, so the global
+patch applied by nest_asyncio can't leak into the other runs.
+
+    python benchmarks/event_loops.py --requests 20000 --concurrency 50
+    python benchmarks/event_loops.py --http   # through uvicorn and TCP connections
+
+Loops whose package is not installed are skipped. nest_asyncio is no longer a Fastipy
+dependency, install it to compare against the patched loop:
+
+    pip install nest_asyncio
+"""
+
+import argparse, asyncio, importlib.util, json, logging, os, subprocess, sys, time
+
+from fastipy import Fastipy, Reply, Request
+
+LOOPS = ("asyncio", "nest_asyncio", "uvloop")
+
+
+def build_app() -> Fastipy:
+    app = Fastipy()
+
+    @app.hook("onRequest")
+    def on_request(request: Request, reply: Reply) -> None:
+        pass
+
+    async def plugin(instance: Fastipy, options: dict) -> None:
+        @instance.get("/users/:id")
+        async def user(request: Request, reply: Reply) -> None:
+            # Yield to the loop once, like a handler awaiting a database would
+            await asyncio.sleep(0)
+            await reply.send({"id": request.params["id"]})
+
+    app.register(plugin, {"prefix": "/api"})
+    return app
+
+
+def install_loop(name: str) -> None:
+    if name == "uvloop":
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    elif name == "nest_asyncio":
+        import nest_asyncio
+
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        nest_asyncio.apply()
+
+
+async def run_asgi(app: Fastipy, requests: int, concurrency: int) -> float:
+    """
+    Drive the application directly through the ASGI interface.
+    """
+    await app.ready()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def worker(index: int) -> None:
+        for number in range(index, requests, concurrency):
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": f"/api/users/{number}",
+                "query_string": b"",
+                "headers": [(b"host", b"localhost")],
+                "client": ("127.0.0.1", 50000),
+            }
+            await app(scope, receive, send)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_http(app: Fastipy, requests: int, concurrency: int, port: int) -> float:
+    """
+    Serve the application with uvicorn and query it over keep-alive TCP connections.
+    """
+    import uvicorn
+
+    config = uvicorn.Config(
+        app, port=port, loop="none", lifespan="on", log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    async def worker(index: int) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for number in range(index, requests, concurrency):
+            writer.write(
+                f"GET /api/users/{number} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+            )
+            headers = await reader.readuntil(b"\r\n\r\n")
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    await reader.readexactly(int(line.split(b":")[1]))
+        writer.close()
+        await writer.wait_closed()
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        return time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def child(args: argparse.Namespace) -> None:
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+    install_loop(args.loop)
+
+    app = build_app()
+    if args.http:
+        coroutine = run_http(app, args.requests, args.concurrency, args.port)
+    else:
+        coroutine = run_asgi(app, args.requests, args.concurrency)
+
+    if args.loop == "nest_asyncio":
+        elapsed = asyncio.get_event_loop().run_until_complete(coroutine)
+    else:
+        elapsed = asyncio.run(coroutine)
+
+    print(json.dumps({"loop": args.loop, "rps": args.requests / elapsed}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--http", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--loops", nargs="+", choices=LOOPS, default=list(LOOPS))
+    parser.add_argument("--loop", choices=LOOPS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.loop is not None:
+        child(args)
+        return
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency},"
+        f" {'uvicorn over TCP' if args.http else 'direct ASGI calls'}"
+    )
+
+    baseline = None
+    for loop in args.loops:
+        if loop != "asyncio" and importlib.util.find_spec(loop) is None:
+            print(f"{loop:<14} skipped (not installed, pip install {loop})")
+            continue
+
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--loop", loop,
+            "--requests", str(args.requests),
+            "--concurrency", str(args.concurrency),
+            "--port", str(args.port),
+        ]
+        if args.http:
+            command.append("--http")
+
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            reason = result.stderr.strip().splitlines()[-1:] or ["failed"]
+            print(f"{loop:<14} skipped ({reason[0]})")
+            continue
+
+        rps = json.loads(result.stdout.strip().splitlines()[-1])["rps"]
+        baseline = baseline or rps
+        print(f"{loop:<14} {rps:>10.0f} requests/s  ({rps / baseline:>5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
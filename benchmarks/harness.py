@@ -0,0 +1,288 @@
+"""
+Drivers shared by the benchmark suite.
+
+`AsgiClient` calls the application directly with an in-process fake `receive` and
+`send`, so the numbers only contain the framework itself. `HttpClient` talks to a
+uvicorn server over keep-alive TCP connections, adding the server and the network
+stack to the picture.
+"""
+
+import asyncio, gc, statistics, time, tracemalloc
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (method, path, headers, body)
+RequestSpec = Tuple[str, str, List[Tuple[bytes, bytes]], bytes]
+
+
+class AsgiClient:
+    """
+    Sends requests to an ASGI application without any network involved.
+    """
+
+    def __init__(self, app, chunk_size: int = 16384) -> None:
+        self._app = app
+        self._chunk_size = chunk_size
+
+    async def startup(self) -> None:
+        """
+        Run the lifespan startup, loading the plugins and the startup events.
+        """
+        self._lifespan = asyncio.Queue()
+        self._lifespan_sent = asyncio.Queue()
+        self._lifespan_task = asyncio.create_task(
+            self._app(
+                {"type": "lifespan", "asgi": {"version": "3.0"}},
+                self._lifespan.get,
+                self._lifespan_sent.put,
+            )
+        )
+
+        await self._lifespan.put({"type": "lifespan.startup"})
+        message = await self._lifespan_sent.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Application failed to start: {message}")
+
+    async def close(self) -> None:
+        """
+        Run the lifespan shutdown.
+        """
+        await self._lifespan.put({"type": "lifespan.shutdown"})
+        await self._lifespan_task
+
+    async def request(self, spec: RequestSpec) -> int:
+        """
+        Send a request and return the response status code.
+        """
+        method, path, headers, body = spec
+        path, _, query = path.partition("?")
+        chunks = [
+            body[index : index + self._chunk_size]
+            for index in range(0, len(body), self._chunk_size)
+        ] or [b""]
+        position = 0
+        status = 0
+        # Like a real client, the disconnect only comes once the response is sent
+        response_sent = asyncio.Event()
+
+        async def receive() -> dict:
+            nonlocal position
+            if position >= len(chunks):
+                await response_sent.wait()
+                return {"type": "http.disconnect"}
+            chunk = chunks[position]
+            position += 1
+            return {
+                "type": "http.request",
+                "body": chunk,
+                "more_body": position < len(chunks),
+            }
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_sent.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [
+                (b"host", b"localhost"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        await self._app(scope, receive, send)
+        return status
+
+
+class HttpClient:
+    """
+    Sends HTTP/1.1 requests over a pool of keep-alive connections.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self._host = host
+        self._port = port
+        self._connections: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def startup(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        for _, writer in self._connections:
+            writer.close()
+        self._connections.clear()
+
+    async def request(self, spec: RequestSpec) -> int:
+        """
+        Send a request and return the response status code.
+        """
+        if self._connections:
+            reader, writer = self._connections.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self._host, self._port)
+
+        method, path, headers, body = spec
+        head = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+        head += [f"{name.decode()}: {value.decode()}" for name, value in headers]
+        head.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+
+        response = await reader.readuntil(b"\r\n\r\n")
+        lines = response.split(b"\r\n")
+        status = int(lines[0].split(b" ")[1])
+        fields = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(b":")
+                fields[name.strip().lower()] = value.strip().lower()
+
+        if method == "HEAD" or status in (204, 304):
+            pass
+        elif b"content-length" in fields:
+            await reader.readexactly(int(fields[b"content-length"]))
+        elif fields.get(b"transfer-encoding") == b"chunked":
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+
+        if fields.get(b"connection") == b"close":
+            writer.close()
+        else:
+            self._connections.append((reader, writer))
+        return status
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Get a percentile of an already sorted list with the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+async def measure_throughput(
+    client, requests: Callable[[int], RequestSpec], count: int, concurrency: int
+) -> Dict[str, float]:
+    """
+    Send `count` requests from `concurrency` concurrent workers.
+
+    Returns:
+        Dict[str, float]: Requests per second, latency percentiles in milliseconds and
+        the number of responses by status class.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    clock = time.perf_counter
+
+    async def worker(offset: int) -> None:
+        for index in range(offset, count, concurrency):
+            spec = requests(index)
+            start = clock()
+            status = await client.request(spec)
+            latencies.append(clock() - start)
+            key = f"{status // 100}xx"
+            statuses[key] = statuses.get(key, 0) + 1
+
+    start = clock()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = clock() - start
+
+    latencies.sort()
+    return {
+        "requests": count,
+        "seconds": elapsed,
+        "rps": count / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "statuses": statuses,
+    }
+
+
+async def measure_allocations(
+    client, requests: Callable[[int], RequestSpec], count: int
+) -> Dict[str, float]:
+    """
+    Send `count` sequential requests under tracemalloc.
+
+    Measured in a separate pass, tracemalloc slows everything down and would distort
+    the throughput numbers.
+
+    Returns:
+        Dict[str, float]: The mean peak of memory allocated while handling a request,
+        and the memory and blocks still allocated after the requests (leak indicator),
+        divided by the number of requests.
+    """
+    # Warm the caches (routes, templates, serializers) before measuring
+    for index in range(min(count, 50)):
+        await client.request(requests(index))
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = 0
+        before, _ = tracemalloc.get_traced_memory()
+        for index in range(count):
+            spec = requests(index)
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            await client.request(spec)
+            peaks += tracemalloc.get_traced_memory()[1] - current
+
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "alloc_peak_bytes": peaks / count,
+        "retained_bytes": max(0, after - before) / count,
+    }
+
+
+async def wait_for_port(host: str, port: int, timeout: float = 10.0) -> None:
+    """
+    Wait until a TCP server accepts connections.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+        else:
+            writer.close()
+            return
+
+
+def run(coroutine: Awaitable, loop: Optional[str] = None):
+    """
+    Run a coroutine on the default asyncio loop or on uvloop.
+    """
+    if loop == "uvloop":
+        import uvloop
+
+        return uvloop.run(coroutine)
+    return asyncio.run(coroutine)
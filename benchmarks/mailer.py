@@ -0,0 +1,99 @@
+"""
+Mailer throughput benchmark against a local stub SMTP server.
+
+Sends 1k messages without connection reuse (a new connection, handshake and login per
+message, like Mailer used to) and over the connection pool, synchronously and with the
+async API.
+
+    python benchmarks/mailer.py --messages 1000 --connect-latency 0.01
+"""
+
+import argparse, asyncio, smtplib, time
+
+from fastipy import Mailer, create_message
+
+from smtp_stub import StubSMTPServer
+
+
+class StubMailer(Mailer):
+    """Mailer connecting in plain text, as the stub server doesn't speak TLS."""
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp_conn.login(self._auth_user, self._auth_password)
+        return smtp_conn
+
+
+def build_messages(count: int) -> list:
+    return [
+        create_message(
+            subject=f"Message {i}",
+            body="Hello from the Fastipy mailer benchmark",
+            from_email="bench@example.com",
+            to_email=f"user{i}@example.com",
+        )
+        for i in range(count)
+    ]
+
+
+def run_sync(mailer: Mailer, messages: list) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        mailer.send_email(message, raise_exceptions=True)
+    return time.perf_counter() - start
+
+
+def run_async(mailer: Mailer, messages: list) -> float:
+    async def main() -> None:
+        await asyncio.gather(
+            *(mailer.send_email_async(message, True) for message in messages)
+        )
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.005,
+        help="simulated handshake + login latency per connection, in seconds",
+    )
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages)
+
+    with StubSMTPServer(connect_latency=args.connect_latency) as server:
+        scenarios = [
+            ("new connection per message", StubMailer, {"keep_alive": 0}, run_sync),
+            ("pooled, sync", StubMailer, {}, run_sync),
+            ("pooled, async", StubMailer, {}, run_async),
+        ]
+
+        for name, mailer_class, options, runner in scenarios:
+            connections = server.connections
+            mailer = mailer_class(
+                server.host,
+                server.port,
+                "user",
+                "password",
+                ssl=False,
+                pool_size=args.pool_size,
+                **options,
+            )
+            elapsed = runner(mailer, messages)
+            mailer.close()
+
+            print(
+                f"{name:<28} {len(messages) / elapsed:>9.1f} msg/s"
+                f"  {server.connections - connections:>5} connections"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Request and Reply construction benchmark.
+
+Measures the time and the memory needed to build the Request and Reply objects of a
+request, with and without request/reply decorators, and the cost of reading core
+attributes and decorators in a handler.
+
+    python benchmarks/objects.py --iterations 200000
+"""
+
+import argparse, gc, logging, sys, time, timeit, tracemalloc
+
+from fastipy import Fastipy
+
+
+def build_app(decorated: bool) -> Fastipy:
+    app = Fastipy()
+    if decorated:
+        app.decorate_request("user", None)
+        app.decorate_request("load_user", lambda request: None)
+        app.decorate_reply("render_user", lambda reply: None)
+
+    @app.get("/users/:id")
+    async def handler(request, reply) -> None:
+        pass
+
+    return app
+
+
+def objects_factory(app: Fastipy):
+    """
+    Return a function building the Request and Reply of a request, like the RequestHandler.
+    """
+    route, params = app._router.find_route("GET", "/users/1", return_params=True)
+    request_class, reply_class = route["scope"]._decorated_classes()
+
+    headers = [
+        (b"host", b"localhost"),
+        (b"user-agent", b"benchmark"),
+        (b"accept", b"application/json"),
+        (b"cookie", b"session=abc"),
+    ]
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    def build():
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/users/1",
+            "query_string": b"full=1",
+            "headers": list(headers),
+            "params": params,
+        }
+        request = request_class(scope, receive)
+        reply = reply_class(
+            send,
+            request,
+            {},
+            None,
+            route["hooks"],
+            app._serializers,
+            app._options,
+            None,
+        )
+        return request, reply
+
+    return build
+
+
+def measure(label: str, build, iterations: int) -> None:
+    for _ in range(1000):
+        build()
+
+    gc.collect()
+    elapsed = min(timeit.repeat(build, number=iterations, repeat=3))
+
+    tracemalloc.start()
+    objects = [build() for _ in range(1000)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    request, reply = objects[0]
+    print(
+        f"{label:<28} {elapsed / iterations * 1e6:>7.2f} us/request"
+        f"  {size / len(objects):>7.0f} B retained by Request + Reply"
+        f"  (request {sys.getsizeof(request)} B, reply {sys.getsizeof(reply)} B"
+        f", __dict__: {hasattr(request, '__dict__') and bool(vars(request))})"
+    )
+
+
+def measure_access(label: str, build, iterations: int) -> None:
+    request, reply = build()
+    decorated = "user" in dir(type(request))
+
+    def access():
+        request.params
+        request.headers
+        reply.status_code
+        reply.is_sent
+        if decorated:
+            request.user
+            request.load_user
+            reply.render_user
+
+    elapsed = min(timeit.repeat(access, number=iterations, repeat=3))
+    print(f"{label:<28} {elapsed / iterations * 1e9:>7.0f} ns per handler access")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    for decorated in (False, True):
+        label = "with decorators" if decorated else "without decorators"
+        build = objects_factory(build_app(decorated))
+        measure(f"construction {label}", build, args.iterations)
+        measure_access(f"access {label}", build, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
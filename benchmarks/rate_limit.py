@@ -0,0 +1,152 @@
+"""
+Rate limiter benchmark.
+
+Measures the cost of a token bucket check with one client and with many clients, the
+overhead added to a request by the application rate limiter (every request allowed),
+the cost of a request answered with a 429, and the memory used by the buckets when
+clients spray keys. Every application is warmed up first, and the request scenarios are
+measured in interleaved rounds, keeping the best one.
+
+    python benchmarks/rate_limit.py --requests 50000
+"""
+
+import argparse, gc, logging, os, sys, timeit, tracemalloc
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastipy import Fastipy
+from fastipy.src.classes.rate_limiter import RateLimiter
+
+from harness import AsgiClient, measure_throughput, run
+
+
+def build_app(rate_limit: dict = None) -> Fastipy:
+    app = Fastipy({"rate_limit": rate_limit} if rate_limit else {})
+
+    @app.get("/users/:id")
+    async def user(request, reply) -> None:
+        await reply.send({"id": request.params["id"]})
+
+    return app
+
+
+def measure_checks(iterations: int) -> None:
+    limiter = RateLimiter(rate=1e9)
+    elapsed = min(
+        timeit.repeat(lambda: limiter.hit("127.0.0.1"), number=iterations, repeat=3)
+    )
+    print(f"check, 1 client            {elapsed / iterations * 1e9:>8.0f} ns")
+
+    limiter = RateLimiter(rate=1e9, max_keys=100_000)
+    keys = [f"10.0.{index // 256}.{index % 256}" for index in range(50_000)]
+    position = iter(range(10**9))
+
+    def check() -> None:
+        limiter.hit(keys[next(position) % 50_000])
+
+    elapsed = min(timeit.repeat(check, number=iterations, repeat=3))
+    print(f"check, 50000 clients       {elapsed / iterations * 1e9:>8.0f} ns")
+
+    limiter = RateLimiter(rate=1e9, max_keys=100_000)
+    elapsed = min(
+        timeit.repeat(lambda: limiter.hit(object()), number=iterations, repeat=3)
+    )
+    print(
+        f"check, new client each time {elapsed / iterations * 1e9:>7.0f} ns"
+        f"  ({limiter.stats['evicted']} evicted)"
+    )
+
+
+def measure_memory(keys: int, max_keys: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    limiter = RateLimiter(rate=10, max_keys=max_keys)
+    for index in range(keys):
+        limiter.hit(f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{keys} sprayed keys, max_keys {max_keys}"
+        f"  {limiter.stats['keys']} tracked"
+        f"  {current / 1024 / 1024:.1f} MiB"
+        f" ({current / limiter.stats['keys']:.0f} bytes per client)"
+        f"  peak {peak / 1024 / 1024:.1f} MiB"
+    )
+
+
+async def measure_requests(count: int, concurrency: int, rounds: int) -> None:
+    scenarios = {
+        "no rate limit": (build_app(), []),
+        "rate limit, allowed": (build_app({"rate": 1e9}), []),
+        "rate limit, header key": (
+            build_app({"rate": 1e9, "header": "x-api-key"}),
+            [(b"x-api-key", b"key")],
+        ),
+        "rate limit, 429": (build_app({"rate": 0.001, "burst": 1}), []),
+    }
+
+    # Every application is warmed up before any measure, then the scenarios take turns
+    # so a drift of the machine affects all of them, and the best round is kept
+    clients = {}
+    for label, (app, headers) in scenarios.items():
+        client = clients[label] = AsgiClient(app)
+        await client.startup()
+        spec = ("GET", "/users/1", headers, b"")
+        await measure_throughput(client, lambda index: spec, 2000, concurrency)
+
+    best: Dict[str, float] = {}
+    statuses: Dict[str, dict] = {}
+    per_round = max(1, count // rounds)
+    for _ in range(rounds):
+        for label, (_, headers) in scenarios.items():
+            spec = ("GET", "/users/1", headers, b"")
+            result = await measure_throughput(
+                clients[label], lambda index: spec, per_round, concurrency
+            )
+            per_request = result["seconds"] / per_round * 1e6
+            best[label] = min(per_request, best.get(label, per_request))
+            statuses[label] = result["statuses"]
+
+    for client in clients.values():
+        await client.close()
+
+    baseline = best["no rate limit"]
+    for label, per_request in best.items():
+        print(
+            f"{label:<24} {1e6 / per_request:>9.0f} req/s"
+            f"  {per_request:>6.2f} us/request"
+            f"  {per_request - baseline:>+6.2f} us  {statuses[label]}"
+        )
+
+
+async def main_async(
+    requests: int, concurrency: int, rounds: int, iterations: int
+) -> None:
+    measure_checks(iterations)
+    measure_memory(1_000_000, 100_000)
+    await measure_requests(requests, concurrency, rounds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    run(
+        main_async(args.requests, args.concurrency, args.rounds, args.iterations),
+        args.loop,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Route registration benchmark.
+
+Registers 5k routes spread over plugins, each plugin adding its own hooks and
+middlewares, and reports the time spent registering them and looking them up.
+
+    python benchmarks/registration.py --routes 5000 --plugins 50
+"""
+
+import argparse, logging, time
+
+from fastipy import Fastipy
+
+
+async def handler(request, reply) -> None:
+    await reply.send_code(200)
+
+
+def on_request(request, reply) -> None:
+    pass
+
+
+def middleware(request, reply) -> None:
+    pass
+
+
+def build_app(routes: int, plugins: int) -> Fastipy:
+    app = Fastipy()
+    app.add_hook("onRequest", on_request)
+    app.add_middleware(middleware)
+
+    per_plugin = routes // plugins
+
+    def plugin(instance: Fastipy, options: dict) -> None:
+        instance.add_hook("preHandler", on_request)
+        instance.add_middleware(middleware)
+
+        for index in range(per_plugin):
+            instance.add_route("GET", f"/resource{index}/:id", handler)
+            instance.add_route(
+                "POST",
+                f"/resource{index}/:id/items",
+                handler,
+                {"onResponse": [on_request]},
+            )
+
+    for index in range(plugins):
+        plugin.__name__ = f"plugin{index}"
+        app.register(plugin, {"prefix": f"/plugin{index}"})
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=5000)
+    parser.add_argument("--plugins", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    app = build_app(args.routes // 2, args.plugins)
+    elapsed = time.perf_counter() - start
+
+    registered = (args.routes // 2 // args.plugins) * args.plugins * 2
+    print(
+        f"registration  {registered} routes in {elapsed * 1000:>8.1f} ms"
+        f"  ({registered / elapsed:>9.0f} routes/s)"
+    )
+
+    paths = [
+        f"/plugin{index % args.plugins}/resource{index % (registered // 2 // args.plugins)}/{index}"
+        for index in range(1000)
+    ]
+    router = app._router
+
+    start = time.perf_counter()
+    for index in range(args.lookups):
+        router.find_route("GET", paths[index % 1000], return_params=True)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"lookup        {args.lookups} lookups in {elapsed * 1000:>8.1f} ms"
+        f"  ({args.lookups / elapsed:>9.0f} lookups/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
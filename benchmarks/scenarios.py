@@ -0,0 +1,186 @@
+"""
+Benchmark scenarios.
+
+Each scenario builds its own application and a function returning the N-th request
+to send, so the same scenario can be served in-process or by a uvicorn process.
+"""
+
+import json, os, tempfile
+from typing import Callable, Dict, Tuple
+
+from fastipy import Fastipy, Reply, Request
+
+from harness import RequestSpec
+
+Scenario = Callable[[], Tuple[Fastipy, Callable[[int], RequestSpec]]]
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(function: Scenario) -> Scenario:
+    SCENARIOS[function.__name__] = function
+    return function
+
+
+@scenario
+def routing() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    1000 parametric routes spread over 20 plugins, requests hit all of them.
+    """
+    app = Fastipy()
+    plugins, per_plugin = 20, 50
+
+    async def handler(request: Request, reply: Reply) -> None:
+        await reply.send_code(200)
+
+    def plugin(instance: Fastipy, options: dict) -> None:
+        for index in range(per_plugin):
+            instance.add_route("GET", f"/resource{index}/:id", handler)
+            instance.add_route("POST", f"/resource{index}/:id/items", handler)
+
+    for index in range(plugins):
+        plugin.__name__ = f"plugin{index}"
+        app.register(plugin, {"prefix": f"/plugin{index}"})
+
+    def request(index: int) -> RequestSpec:
+        path = f"/plugin{index % plugins}/resource{index % per_plugin}/{index}"
+        return ("GET", path, [], b"")
+
+    return app, request
+
+
+@scenario
+def json_echo() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    POST of a 1 KiB JSON document sent back as JSON.
+    """
+    app = Fastipy()
+
+    @app.post("/echo")
+    async def echo(request: Request, reply: Reply) -> None:
+        await reply.send(request.body.json)
+
+    body = json.dumps(
+        {"items": [{"id": index, "name": f"item {index}"} for index in range(40)]}
+    ).encode()
+    headers = [(b"content-type", b"application/json")]
+
+    return app, lambda index: ("POST", "/echo", headers, body)
+
+
+@scenario
+def multipart() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    Multipart upload of a text field and a 64 KiB file, sent in 16 KiB body chunks.
+    """
+    app = Fastipy()
+
+    @app.post("/upload")
+    async def upload(request: Request, reply: Reply) -> None:
+        file = request.form.files["file"]
+        await reply.send({"name": file.filename, "size": file.size})
+
+    boundary = b"----fastipybenchmark"
+    body = b"".join(
+        [
+            b"--" + boundary + b"\r\n",
+            b'Content-Disposition: form-data; name="title"\r\n\r\n',
+            b"benchmark\r\n",
+            b"--" + boundary + b"\r\n",
+            b'Content-Disposition: form-data; name="file"; filename="data.bin"\r\n',
+            b"Content-Type: application/octet-stream\r\n\r\n",
+            os.urandom(64 * 1024).replace(b"\r\n--", b"\n\n--"),
+            b"\r\n--" + boundary + b"--\r\n",
+        ]
+    )
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + boundary)]
+
+    return app, lambda index: ("POST", "/upload", headers, body)
+
+
+@scenario
+def static_file() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    16 KiB file served from the static directory.
+    """
+    directory = tempfile.mkdtemp(prefix="fastipy-benchmark-")
+    with open(os.path.join(directory, "style.css"), "wb") as file:
+        file.write(b"body { margin: 0 }\n" * 862)
+
+    app = Fastipy(static_path=directory)
+
+    return app, lambda index: ("GET", "/style.css", [], b"")
+
+
+@scenario
+def streaming() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    Reply streamed from an async generator in 32 chunks of 1 KiB.
+    """
+    app = Fastipy()
+    chunk = "x" * 1024
+
+    @app.get("/stream")
+    async def stream(request: Request, reply: Reply) -> None:
+        async def generator():
+            for _ in range(32):
+                yield chunk
+
+        await reply.send(generator())
+
+    return app, lambda index: ("GET", "/stream", [], b"")
+
+
+@scenario
+def hooks() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    Route with 5 middlewares, 10 onRequest, 10 preHandler and 5 onResponse hooks.
+    """
+    app = Fastipy()
+
+    def hook(request: Request, reply: Reply) -> None:
+        pass
+
+    async def async_hook(request: Request, reply: Reply) -> None:
+        pass
+
+    for index in range(5):
+        app.add_middleware(hook)
+        app.add_hook("onResponse", async_hook if index % 2 else hook)
+    for index in range(10):
+        app.add_hook("onRequest", async_hook if index % 2 else hook)
+        app.add_hook("preHandler", async_hook if index % 2 else hook)
+
+    @app.get("/hooks/:id")
+    async def handler(request: Request, reply: Reply) -> None:
+        await reply.send({"id": request.params["id"]})
+
+    return app, lambda index: ("GET", f"/hooks/{index}", [], b"")
+
+
+@scenario
+def errors() -> Tuple[Fastipy, Callable[[int], RequestSpec]]:
+    """
+    Alternates between unknown routes (404) and handlers raising an exception caught
+    by the onError hook and the error handler (500).
+    """
+    app = Fastipy()
+
+    @app.hook("onError")
+    def on_error(error: Exception, request: Request, reply: Reply) -> None:
+        pass
+
+    @app.error_handler()
+    async def error_handler(error: Exception, request: Request, reply: Reply) -> None:
+        await reply.code(500).send({"error": str(error)})
+
+    @app.get("/fail/:id")
+    async def fail(request: Request, reply: Reply) -> None:
+        raise ValueError(f"Item {request.params['id']} is broken")
+
+    def request(index: int) -> RequestSpec:
+        if index % 2:
+            return ("GET", f"/missing/{index}", [], b"")
+        return ("GET", f"/fail/{index}", [], b"")
+
+    return app, request
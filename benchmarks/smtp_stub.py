@@ -0,0 +1,106 @@
+"""
+Minimal local SMTP server for benchmarks.
+
+It speaks just enough SMTP for smtplib (EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT),
+accepts every message and can simulate the latency of opening a connection
+(TCP + TLS handshake + login) with `connect_latency`.
+"""
+
+import asyncio, threading
+from typing import Optional
+
+
+class StubSMTPServer:
+    """SMTP server running on its own event loop in a background thread."""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, connect_latency: float = 0.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.connect_latency = connect_latency
+
+        self.connections = 0
+        self.messages = 0
+        self.received_bytes = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: dict = {}
+
+    def __enter__(self) -> "StubSMTPServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        started = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(
+                    self._handle, self.host, self.port, limit=64 * 1024 * 1024
+                )
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self) -> None:
+        async def shutdown() -> None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.transport.abort()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._connections[asyncio.current_task()] = writer
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+
+        writer.write(b"220 stub ESMTP\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    writer.write(b"250-stub\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                elif command == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    self.received_bytes += len(data)
+                    self.messages += 1
+                    writer.write(b"250 OK\r\n")
+                elif command == b"AUTH":
+                    writer.write(b"235 Authentication successful\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
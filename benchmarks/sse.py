@@ -0,0 +1,102 @@
+"""
+Server-Sent Events fan-out benchmark.
+
+Subscribes many clients to an EventChannel through the ASGI callable, publishes events
+and reports how long it takes until every subscriber received every event.
+
+    python benchmarks/sse.py --subscribers 10000 --events 100
+"""
+
+import argparse, asyncio, logging, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastipy import EventChannel, Fastipy
+
+from harness import run
+
+
+def build_app(channel: EventChannel) -> Fastipy:
+    app = Fastipy()
+
+    @app.get("/events")
+    async def events(request, reply) -> None:
+        await reply.sse(channel, heartbeat=None)
+
+    return app
+
+
+async def main_async(subscribers: int, events: int) -> None:
+    channel = EventChannel(history=events, queue_size=events)
+    app = build_app(channel)
+
+    received = [0]
+    everything = asyncio.Event()
+    expected = subscribers * events
+
+    def receiver():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive() -> dict:
+            if messages:
+                return messages.pop()
+            # The clients never disconnect
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            received[0] += message.get("body", b"").count(b"\n\n")
+            if received[0] >= expected:
+                everything.set()
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/events",
+        "query_string": b"",
+        "headers": [],
+    }
+
+    start = time.perf_counter()
+    tasks = []
+    for _ in range(subscribers):
+        tasks.append(asyncio.create_task(app(dict(scope), receiver(), send)))
+    while channel.subscribers < subscribers:
+        await asyncio.sleep(0.01)
+    print(f"{subscribers} subscribers connected in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    for index in range(events):
+        channel.publish({"index": index, "message": "hello"}, event="message")
+        await asyncio.sleep(0)
+    await everything.wait()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{events} events to {subscribers} subscribers in {elapsed:.2f} s"
+        f"  {expected / elapsed:>10.0f} deliveries/s"
+        f"  {elapsed / events * 1000:>7.2f} ms per published event"
+    )
+
+    channel.close()
+    await asyncio.gather(*tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    run(main_async(args.subscribers, args.events), args.loop)
+
+
+if __name__ == "__main__":
+    main()
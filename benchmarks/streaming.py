@@ -0,0 +1,123 @@
+"""
+Streaming benchmark.
+
+Streams small rows from sync and async generators through the ASGI callable, with the
+chunks coalesced into the default buffer and with every chunk flushed as soon as it
+is produced (buffer size 0, a sync generator still batches the chunks its thread
+produced meanwhile), and reports the rows per second, the body messages sent and
+the longest event loop stall while a slow sync generator is iterated.
+
+    python benchmarks/streaming.py --rows 1000000
+"""
+
+import argparse, asyncio, logging, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastipy import Fastipy
+
+from harness import run
+
+
+def build_app(rows: int) -> Fastipy:
+    app = Fastipy()
+
+    def sync_rows():
+        for index in range(rows):
+            yield f"{index},row-{index}\n"
+
+    async def async_rows():
+        for index in range(rows):
+            yield f"{index},row-{index}\n"
+
+    def slow_rows():
+        # Blocking work between rows, like a database cursor
+        for index in range(50):
+            time.sleep(0.002)
+            yield f"{index},row-{index}\n"
+
+    sources = {"sync": sync_rows, "async": async_rows, "slow": slow_rows}
+
+    @app.get("/:source/:buffer")
+    async def stream(request, reply) -> None:
+        source = sources[request.params["source"]]()
+        await reply.stream(source, buffer_size=int(request.params["buffer"]))
+
+    return app
+
+
+async def lag_monitor(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(0.001)
+        lags.append(loop.time() - start - 0.001)
+
+
+async def stream(app: Fastipy, source: str, buffer_size: int) -> dict:
+    messages, size = 0, 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal messages, size
+        if message["type"] == "http.response.body":
+            messages += 1
+            size += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": f"/{source}/{buffer_size}",
+        "query_string": b"",
+        "headers": [],
+    }
+
+    lags, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(lag_monitor(lags, stop))
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    return {
+        "seconds": elapsed,
+        "messages": messages,
+        "bytes": size,
+        "max_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+async def main_async(rows: int) -> None:
+    app = build_app(rows)
+
+    for source in ("sync", "async", "slow"):
+        for buffer_size in (16384, 0):
+            result = await stream(app, source, buffer_size)
+            count = 50 if source == "slow" else rows
+            print(
+                f"{source:<6} buffer {buffer_size:>6}"
+                f"  {count / result['seconds']:>10.0f} rows/s"
+                f"  {result['messages']:>8} messages"
+                f"  {result['bytes'] / 1024:>8.0f} KiB"
+                f"  max loop lag {result['max_lag_ms']:>6.1f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    run(main_async(args.rows), args.loop)
+
+
+if __name__ == "__main__":
+    main()
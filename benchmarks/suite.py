@@ -0,0 +1,184 @@
+"""
+Fastipy benchmark suite.
+
+Runs every scenario (or the selected ones) against the ASGI callable directly, with
+an in-process fake receive/send, or through a local uvicorn process, and reports the
+requests per second, the latency percentiles and the memory allocated per request.
+
+    python benchmarks/suite.py                          # every scenario, in-process
+    python benchmarks/suite.py routing hooks -n 50000   # selected scenarios
+    python benchmarks/suite.py --http --loop uvloop     # through uvicorn
+    python benchmarks/suite.py --output results/1.5.3.json
+
+Results written with --output can be compared with benchmarks/compare.py.
+"""
+
+import argparse, datetime, json, logging, os, platform, socket, subprocess, sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fastipy
+
+from harness import (
+    AsgiClient,
+    HttpClient,
+    measure_allocations,
+    measure_throughput,
+    run,
+    wait_for_port,
+)
+from scenarios import SCENARIOS
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    app, requests = SCENARIOS[name]()
+
+    if args.http:
+        return await run_http_scenario(name, requests, args)
+
+    client = AsgiClient(app)
+    await client.startup()
+    try:
+        for index in range(args.warmup):
+            await client.request(requests(index))
+
+        result = await measure_throughput(
+            client, requests, args.requests, args.concurrency
+        )
+        if args.allocations:
+            result.update(
+                await measure_allocations(client, requests, args.allocations)
+            )
+        return result
+    finally:
+        await client.close()
+
+
+async def run_http_scenario(name: str, requests, args: argparse.Namespace) -> dict:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            *(f"-W{option}" for option in sys.warnoptions),
+            os.path.abspath(__file__),
+            "--serve", name,
+            "--port", str(port),
+            "--loop", args.loop,
+        ]
+    )
+    client = HttpClient("127.0.0.1", port)
+    try:
+        await wait_for_port("127.0.0.1", port)
+        for index in range(args.warmup):
+            await client.request(requests(index))
+
+        # Allocations are only measured in-process, the server is another process
+        return await measure_throughput(
+            client, requests, args.requests, args.concurrency
+        )
+    finally:
+        await client.close()
+        server.terminate()
+        server.wait()
+
+
+def serve(name: str, port: int, loop: str) -> None:
+    import uvicorn
+
+    app, _ = SCENARIOS[name]()
+    uvicorn.run(
+        app,
+        host="127.0.0.1",
+        port=port,
+        loop=loop,
+        log_level="warning",
+        access_log=False,
+    )
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {
+        "fastipy": fastipy.__version__,
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "mode": "http" if args.http else "asgi",
+        "loop": args.loop,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def print_result(name: str, result: dict) -> None:
+    allocations = ""
+    if "alloc_peak_bytes" in result:
+        allocations = (
+            f"  {result['alloc_peak_bytes'] / 1024:>8.1f} KiB/req"
+            f"  {result['retained_bytes']:>7.0f} B retained/req"
+        )
+    print(
+        f"{name:<12} {result['rps']:>9.0f} req/s"
+        f"  p50 {result['p50_ms']:>7.3f} ms  p99 {result['p99_ms']:>7.3f} ms"
+        f"{allocations}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("scenarios", nargs="*", choices=[[], *SCENARIOS])
+    parser.add_argument("-n", "--requests", type=int, default=10_000)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument(
+        "--allocations",
+        type=int,
+        default=500,
+        help="requests measured under tracemalloc, 0 to disable",
+    )
+    parser.add_argument("--http", action="store_true", help="go through uvicorn")
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--serve", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    if args.serve:
+        serve(args.serve, args.port, args.loop)
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    results = {}
+    for name in names:
+        results[name] = run(run_scenario(name, args), args.loop)
+        print_result(name, results[name])
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"meta": metadata(args), "results": results}, file, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
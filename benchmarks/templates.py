@@ -0,0 +1,150 @@
+"""
+Template rendering benchmark.
+
+Measures the renders per second of a medium template (a base layout extended by a page
+with a 50-row table), building a new Jinja2 environment on every render as
+render_template used to do, and through the shared environments. Also measures the
+cold start of the first render, compiling the template or loading its bytecode from
+the disk cache.
+
+    python benchmarks/templates.py --renders 2000
+"""
+
+import argparse, os, sys, tempfile, time
+
+from fastipy.src.classes.template_render import (
+    clear_environments,
+    configure_jinja,
+    render_template,
+)
+
+BASE = """<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8">
+    <title>{% block title %}{% endblock %}</title>
+  </head>
+  <body>
+    <nav>{% for link in links %}<a href="{{ link.href }}">{{ link.label }}</a>{% endfor %}</nav>
+    <main>{% block content %}{% endblock %}</main>
+    <footer>{{ footer }}</footer>
+  </body>
+</html>
+"""
+
+PAGE = """{% extends "base.html" %}
+{% block title %}{{ title }}{% endblock %}
+{% block content %}
+<h1>{{ title }}</h1>
+<table>
+  <thead><tr><th>#</th><th>Name</th><th>Email</th><th>Balance</th><th>Status</th></tr></thead>
+  <tbody>
+  {% for row in rows %}
+    <tr class="{{ loop.cycle('odd', 'even') }}">
+      <td>{{ row.id }}</td>
+      <td>{{ row.name | title }}</td>
+      <td>{{ row.email }}</td>
+      <td>{{ "%.2f" | format(row.balance) }}</td>
+      <td>{% if row.active %}active{% else %}inactive{% endif %}</td>
+    </tr>
+  {% endfor %}
+  </tbody>
+</table>
+{% endblock %}
+"""
+
+CONTEXT = {
+    "title": "Customers",
+    "footer": "Generated by the template benchmark",
+    "links": [
+        {"href": f"/section/{index}", "label": f"Section {index}"} for index in range(5)
+    ],
+    "rows": [
+        {
+            "id": index,
+            "name": f"customer <{index}>",
+            "email": f"customer{index}@example.com",
+            "balance": index * 12.5,
+            "active": index % 3 != 0,
+        }
+        for index in range(50)
+    ],
+}
+
+
+def render_uncached(template_dir: str) -> str:
+    """
+    Render the page like render_template used to: a new loader and environment per
+    render, so the template is read and compiled again every time.
+    """
+    env = configure_jinja(template_dir)
+    return env.get_template("page.html").render(CONTEXT)
+
+
+def measure(label: str, render, renders: int) -> float:
+    render()
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - start
+
+    rate = renders / elapsed
+    print(
+        f"{label:<28} {rate:>9.0f} renders/s"
+        f"  {elapsed / renders * 1e6:>8.1f} us/render"
+    )
+    return rate
+
+
+def measure_cold_start(template_dir: str, cache_dir: str) -> None:
+    for label in ("cold start, compiled", "cold start, bytecode cache"):
+        # Compiled templates are kept by the environments, only the disk cache survives
+        clear_environments()
+        start = time.perf_counter()
+        render_template(
+            "page.html",
+            CONTEXT,
+            template_dir=template_dir,
+            bytecode_cache_dir=cache_dir,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {elapsed * 1000:>9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        template_dir = os.path.join(directory, "templates")
+        cache_dir = os.path.join(directory, "cache")
+        os.makedirs(template_dir)
+        for name, source in (("base.html", BASE), ("page.html", PAGE)):
+            with open(os.path.join(template_dir, name), "w", encoding="utf-8") as file:
+                file.write(source)
+
+        if render_uncached(template_dir) != render_template(
+            "page.html", CONTEXT, template_dir=template_dir
+        ):
+            sys.exit("The renders differ")
+
+        before = measure(
+            "new environment per render",
+            lambda: render_uncached(template_dir),
+            args.renders,
+        )
+        after = measure(
+            "shared environment",
+            lambda: render_template("page.html", CONTEXT, template_dir=template_dir),
+            args.renders,
+        )
+        print(f"{'speedup':<28} {after / before:>9.1f}x")
+
+        measure_cold_start(template_dir, cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+WebSocket broadcast benchmark.
+
+Connects many clients to a BroadcastGroup through the ASGI callable, broadcasts messages
+and reports how long it takes until every client received every message. One of the
+clients is stalled and never reads, to show it doesn't slow the broadcast down and is
+closed once its send queue is full.
+
+    python benchmarks/websocket.py --connections 10000 --messages 100
+"""
+
+import argparse, asyncio, logging, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastipy import BroadcastGroup, Fastipy
+
+from harness import run
+
+
+def build_app(room: BroadcastGroup, queue_size: int) -> Fastipy:
+    app = Fastipy({"websocket_queue_size": queue_size})
+
+    @app.websocket("/room")
+    async def join(request, websocket) -> None:
+        await websocket.accept()
+        room.join(websocket)
+        async for _ in websocket:
+            pass
+
+    return app
+
+
+async def main_async(connections: int, messages: int, queue_size: int) -> None:
+    room = BroadcastGroup("room")
+    app = build_app(room, queue_size)
+
+    received = [0]
+    everything = asyncio.Event()
+    expected = (connections - 1) * messages
+
+    def client(stalled: bool):
+        incoming = [{"type": "websocket.connect"}]
+        closed = asyncio.Event()
+
+        async def receive() -> dict:
+            if incoming:
+                return incoming.pop()
+            await closed.wait()
+            return {"type": "websocket.disconnect", "code": 1000}
+
+        async def send(message: dict) -> None:
+            if message["type"] != "websocket.send":
+                return
+            if stalled:
+                # Never reads, like a client on a congested network
+                await asyncio.Event().wait()
+            else:
+                received[0] += 1
+                if received[0] >= expected:
+                    everything.set()
+
+        return receive, send, closed
+
+    scope = {"type": "websocket", "path": "/room", "query_string": b"", "headers": []}
+
+    start = time.perf_counter()
+    tasks, clients = [], []
+    for index in range(connections):
+        receive, send, closed = client(stalled=index == 0)
+        clients.append(closed)
+        tasks.append(asyncio.create_task(app(dict(scope), receive, send)))
+    while len(room) < connections:
+        await asyncio.sleep(0.01)
+    print(f"{connections} connections joined in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    broadcast = 0.0
+    for index in range(messages):
+        started = time.perf_counter()
+        room.broadcast({"index": index, "message": "hello"})
+        broadcast += time.perf_counter() - started
+        await asyncio.sleep(0)
+    await everything.wait()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{messages} messages to {connections} connections in {elapsed:.2f} s"
+        f"  {expected / elapsed:>10.0f} deliveries/s"
+        f"  {broadcast / messages * 1000:>7.2f} ms per broadcast call"
+    )
+    print(f"stalled clients closed: {room.dropped}")
+
+    for closed in clients:
+        closed.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    args = parser.parse_args()
+
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    run(main_async(args.connections, args.messages, args.queue_size), args.loop)
+
+
+if __name__ == "__main__":
+    main()
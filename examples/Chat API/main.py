@@ -1,10 +1,19 @@
-from fastipy import Fastipy, Request, Reply
+from fastipy import Fastipy, Request, Reply, EventChannel
 
 import json
 import datetime
 
 app = Fastipy().cors()
 
+# One channel per chat, messages are pushed to the connected clients instead of polled
+channels = {}
+
+
+def get_channel(chat_id: str) -> EventChannel:
+    if chat_id not in channels:
+        channels[chat_id] = EventChannel(history=100)
+    return channels[chat_id]
+
 
 @app.get("/")
 async def index(_, reply: Reply):
@@ -30,6 +39,12 @@ async def index(req: Request, reply: Reply):
     await reply.send_code(404)
 
 
+@app.get("/chat/:chat_id/events")
+async def index(req: Request, reply: Reply):
+    # Clients reconnecting with Last-Event-ID receive the messages they missed
+    await reply.sse(get_channel(req.params["chat_id"]))
+
+
 @app.post("/chat")
 async def index(req: Request, reply: Reply):
     with open("chat.json", "r") as file:
@@ -67,6 +82,8 @@ async def index(req: Request, reply: Reply):
 
             with open("chat.json", "w") as file:
                 json.dump(data, file)
+
+            get_channel(req.params["chat_id"]).publish(message, event="message")
             return
 
     await reply.send_code(404)
@@ -32,7 +32,6 @@ setup(
     install_requires=[
         "uvicorn[standard]",
         "starlette",
-        "nest-asyncio",
         "Jinja2",
     ],
     python_requires=">=3.10",
@@ -0,0 +1,4 @@
+import os, sys
+
+# Run the tests against the sources, without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
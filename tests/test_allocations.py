@@ -0,0 +1,26 @@
+import pytest
+
+from fastipy import Fastipy, Reply, Request, assert_allocations
+
+
+def build_app() -> Fastipy:
+    app = Fastipy()
+
+    @app.get("/users/:id")
+    async def user(request: Request, reply: Reply) -> None:
+        await reply.send({"id": request.params["id"]})
+
+    return app
+
+
+def test_simple_route_stays_under_budget():
+    allocations = assert_allocations(
+        build_app(), "GET", "/users/1", max_bytes=64 * 1024, max_retained=1024
+    )
+
+    assert allocations.mean() > 0
+
+
+def test_exceeded_budget_fails_with_the_report():
+    with pytest.raises(AssertionError, match=r"GET /users/1: .* allocated per request"):
+        assert_allocations(build_app(), "GET", "/users/1", max_bytes=1)
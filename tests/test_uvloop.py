@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+uvloop = pytest.importorskip("uvloop")
+httpx = pytest.importorskip("httpx")
+
+from fastipy import Fastipy, Reply, Request
+
+
+def test_request_on_uvloop():
+    app = Fastipy()
+
+    @app.get("/users/:id")
+    async def user(request: Request, reply: Reply) -> None:
+        await asyncio.sleep(0)
+        await reply.send(
+            {
+                "id": request.params["id"],
+                "uvloop": isinstance(asyncio.get_running_loop(), uvloop.Loop),
+            }
+        )
+
+    async def main() -> httpx.Response:
+        await app.ready()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/users/1")
+
+    loop = uvloop.new_event_loop()
+    try:
+        response = loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    assert response.status_code == 200
+    assert response.json() == {"id": "1", "uvloop": True}